@@ -0,0 +1,357 @@
+"""
+Générateur déterministe du corpus synthétique des benchmarks
+
+Pour une même graine, le contenu textuel des documents est identique d'une
+exécution à l'autre (générateur pseudo-aléatoire seedé, dates figées) : les
+mesures successives portent sur les mêmes documents. Les textes sont du
+pseudo-français mêlant le vocabulaire des catégories de documents et des
+entités (emails, téléphones, dates, montants, SIRET) pour exercer la
+classification et l'extraction d'entités.
+
+Formats générés (cf. FORMATS) à plusieurs tailles (small, medium, large) :
+PDF texte, PDF scanné (pages en images), TIFF multi-pages, DOCX, PPTX,
+XLSX, CSV et TXT.
+
+Usage (depuis docker/document-processor) :
+    python benchmarks/corpus.py --output /tmp/corpus
+    python benchmarks/corpus.py --output /tmp/corpus --formats pdf_text,txt --sizes small,medium
+"""
+import os
+import sys
+import csv
+import json
+import random
+import argparse
+import datetime
+from typing import Any, Callable, Dict, List
+
+DEFAULT_SEED = 42
+
+# Date figée des métadonnées des documents générés
+FIXED_DATE = datetime.datetime(2024, 1, 15, 9, 30, 0)
+
+# Taille de chaque format : unité et valeur par taille
+SIZES: Dict[str, Dict[str, Any]] = {
+    'pdf_text': {'unit': 'pages', 'small': 1, 'medium': 10, 'large': 100},
+    'pdf_scanned': {'unit': 'pages', 'small': 1, 'medium': 5, 'large': 20},
+    'tiff': {'unit': 'pages', 'small': 1, 'medium': 5, 'large': 20},
+    'docx': {'unit': 'paragraphs', 'small': 20, 'medium': 500, 'large': 5000},
+    'pptx': {'unit': 'slides', 'small': 5, 'medium': 50, 'large': 300},
+    'xlsx': {'unit': 'rows', 'small': 100, 'medium': 10000, 'large': 100000},
+    'csv': {'unit': 'rows', 'small': 100, 'medium': 10000, 'large': 200000},
+    'txt': {'unit': 'bytes', 'small': 10_000, 'medium': 1_000_000, 'large': 20_000_000},
+}
+
+# Extension des fichiers et type passé à DocumentProcessor
+FILE_TYPES = {
+    'pdf_text': 'pdf',
+    'pdf_scanned': 'pdf',
+    'tiff': 'tiff',
+    'docx': 'docx',
+    'pptx': 'pptx',
+    'xlsx': 'xlsx',
+    'csv': 'csv',
+    'txt': 'txt',
+}
+
+# Vocabulaire par catégorie, repris des mots-clés du classificateur
+CATEGORY_WORDS = {
+    'invoice': ['facture', 'montant', 'tva', 'total', 'paiement', 'échéance', 'client', 'référence'],
+    'contract': ['contrat', 'partie', 'conditions', 'engagement', 'signature', 'clause', 'durée'],
+    'report': ['rapport', 'analyse', 'résultat', 'conclusion', 'étude', 'indicateur', 'synthèse'],
+    'letter': ['monsieur', 'madame', 'cordialement', 'salutations', 'courrier', 'réponse'],
+    'technical_doc': ['technique', 'manuel', 'guide', 'procédure', 'installation', 'configuration'],
+    'financial_doc': ['budget', 'coût', 'investissement', 'comptable', 'bilan', 'trésorerie'],
+}
+
+COMMON_WORDS = [
+    'le', 'la', 'les', 'un', 'une', 'des', 'du', 'de', 'et', 'pour', 'dans', 'avec',
+    'sur', 'par', 'selon', 'notre', 'votre', 'document', 'service', 'projet', 'dossier',
+    'société', 'période', 'mois', 'année', 'suivi', 'demande', 'objet', 'présent',
+    'ensemble', 'équipe', 'site', 'délai', 'mise', 'place', 'niveau', 'cadre', 'point',
+]
+
+class TextGenerator:
+    """
+    Phrases pseudo-françaises reproductibles pour une graine donnée
+    """
+
+    def __init__(self, seed: int = DEFAULT_SEED, category: str = 'invoice'):
+        self.random = random.Random(seed)
+        self.category_words = CATEGORY_WORDS[category]
+
+    def entity(self) -> str:
+        kind = self.random.randrange(5)
+        if kind == 0:
+            return f"contact{self.random.randrange(1000)}@exemple.fr"
+        if kind == 1:
+            return '0' + str(self.random.randrange(1, 10)) + ''.join(str(self.random.randrange(10)) for _ in range(8))
+        if kind == 2:
+            return f"{self.random.randrange(1, 29):02d}/{self.random.randrange(1, 13):02d}/20{self.random.randrange(18, 26)}"
+        if kind == 3:
+            return f"{self.random.randrange(10, 100000)},{self.random.randrange(100):02d} euros"
+        return ''.join(str(self.random.randrange(10)) for _ in range(14))
+
+    def sentence(self) -> str:
+        words = []
+        for _ in range(self.random.randrange(8, 18)):
+            draw = self.random.random()
+            if draw < 0.2:
+                words.append(self.random.choice(self.category_words))
+            elif draw < 0.25:
+                words.append(self.entity())
+            else:
+                words.append(self.random.choice(COMMON_WORDS))
+        return ' '.join(words).capitalize() + '.'
+
+    def paragraph(self, sentences: int = 5) -> str:
+        return ' '.join(self.sentence() for _ in range(sentences))
+
+    def lines(self, count: int) -> List[str]:
+        return [self.sentence() for _ in range(count)]
+
+def _pdf_escape(line: str) -> bytes:
+    return line.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)').encode('latin-1', 'replace')
+
+def write_text_pdf(path: str, pages: List[List[str]]):
+    """
+    PDF minimal avec une couche texte (Helvetica, WinAnsiEncoding), sans dépendance
+    """
+    # Objets : 1 catalogue, 2 arbre des pages, 3 police, puis page et contenu par page
+    objects: List[bytes] = [b'', b'', b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>']
+    page_ids = []
+    for lines in pages:
+        stream = b'BT /F1 10 Tf 12 TL 50 800 Td\n' + b''.join(b'(' + _pdf_escape(line) + b") '\n" for line in lines) + b'ET'
+        objects.append(b'<< /Length %d >>\nstream\n' % len(stream) + stream + b'\nendstream')
+        content_id = len(objects)
+        objects.append(
+            b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] '
+            b'/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>' % content_id
+        )
+        page_ids.append(len(objects))
+    objects[0] = b'<< /Type /Catalog /Pages 2 0 R >>'
+    objects[1] = b'<< /Type /Pages /Kids [%s] /Count %d >>' % (
+        b' '.join(b'%d 0 R' % page_id for page_id in page_ids), len(page_ids)
+    )
+
+    with open(path, 'wb') as f:
+        f.write(b'%PDF-1.4\n')
+        offsets = []
+        for number, body in enumerate(objects, start=1):
+            offsets.append(f.tell())
+            f.write(b'%d 0 obj\n' % number + body + b'\nendobj\n')
+        xref_offset = f.tell()
+        f.write(b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1))
+        f.write(b''.join(b'%010d 00000 n \n' % offset for offset in offsets))
+        f.write(b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (len(objects) + 1, xref_offset))
+
+def render_page_image(lines: List[str], seed: int):
+    """
+    Page A4 à 150 dpi imitant un scan : texte noir, léger bruit de fond
+    """
+    from PIL import Image, ImageDraw, ImageFont
+
+    try:
+        font = ImageFont.load_default(size=24)
+    except TypeError:
+        font = ImageFont.load_default()
+
+    image = Image.new('L', (1240, 1754), color=255)
+    draw = ImageDraw.Draw(image)
+    for index, line in enumerate(lines):
+        draw.text((90, 100 + index * 36), line, fill=0, font=font)
+
+    noise = random.Random(seed)
+    for _ in range(2000):
+        image.putpixel((noise.randrange(1240), noise.randrange(1754)), noise.randrange(150, 230))
+    return image
+
+def _page_lines(generator: TextGenerator, count: int, width: int = 80) -> List[str]:
+    """
+    Découpe des phrases en lignes d'au plus `width` caractères
+    """
+    lines: List[str] = []
+    current = ''
+    while len(lines) < count:
+        for word in generator.sentence().split():
+            if current and len(current) + len(word) + 1 > width:
+                lines.append(current)
+                current = word
+            else:
+                current = f"{current} {word}".strip()
+    return lines[:count]
+
+def generate_pdf_text(path: str, pages: int, generator: TextGenerator):
+    write_text_pdf(path, [_page_lines(generator, 60, width=95) for _ in range(pages)])
+
+def generate_pdf_scanned(path: str, pages: int, generator: TextGenerator):
+    images = [render_page_image(_page_lines(generator, 40, width=70), seed) for seed in range(pages)]
+    images[0].save(
+        path, 'PDF', save_all=True, append_images=images[1:], resolution=150,
+        creationDate=FIXED_DATE.timetuple(), modDate=FIXED_DATE.timetuple()
+    )
+
+def generate_tiff(path: str, pages: int, generator: TextGenerator):
+    images = [render_page_image(_page_lines(generator, 40, width=70), seed) for seed in range(pages)]
+    images[0].save(path, save_all=True, append_images=images[1:], compression='tiff_lzw', dpi=(150, 150))
+
+def generate_docx(path: str, paragraphs: int, generator: TextGenerator):
+    from docx import Document
+
+    document = Document()
+    document.core_properties.created = FIXED_DATE
+    document.core_properties.modified = FIXED_DATE
+    document.core_properties.title = 'Document synthétique'
+    for index in range(paragraphs):
+        if index % 20 == 0:
+            document.add_heading(generator.sentence()[:60], level=1)
+        document.add_paragraph(generator.paragraph())
+
+    table = document.add_table(rows=10, cols=3)
+    for row in table.rows:
+        for cell in row.cells:
+            cell.text = generator.entity()
+    document.save(path)
+
+def generate_pptx(path: str, slides: int, generator: TextGenerator):
+    from pptx import Presentation
+
+    presentation = Presentation()
+    presentation.core_properties.created = FIXED_DATE
+    presentation.core_properties.modified = FIXED_DATE
+    layout = presentation.slide_layouts[1]
+    for _ in range(slides):
+        slide = presentation.slides.add_slide(layout)
+        slide.shapes.title.text = generator.sentence()[:60]
+        slide.placeholders[1].text = '\n'.join(generator.lines(4))
+    presentation.save(path)
+
+def _table_row(generator: TextGenerator, index: int) -> List[Any]:
+    return [
+        index,
+        f"REF-{generator.random.randrange(100000):05d}",
+        generator.sentence()[:50],
+        generator.random.randrange(1, 50),
+        round(generator.random.uniform(1, 5000), 2),
+        generator.entity()
+    ]
+
+TABLE_HEADER = ['ligne', 'reference', 'designation', 'quantite', 'montant', 'contact']
+
+def generate_xlsx(path: str, rows: int, generator: TextGenerator):
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    workbook.properties.created = FIXED_DATE
+    sheet = workbook.create_sheet('Factures')
+    sheet.append(TABLE_HEADER)
+    for index in range(rows):
+        sheet.append(_table_row(generator, index))
+    workbook.save(path)
+
+def generate_csv(path: str, rows: int, generator: TextGenerator):
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f, delimiter=';')
+        writer.writerow(TABLE_HEADER)
+        for index in range(rows):
+            writer.writerow(_table_row(generator, index))
+
+def generate_txt(path: str, size_bytes: int, generator: TextGenerator):
+    written = 0
+    with open(path, 'w', encoding='utf-8') as f:
+        while written < size_bytes:
+            paragraph = generator.paragraph() + '\n\n'
+            f.write(paragraph)
+            written += len(paragraph.encode('utf-8'))
+
+GENERATORS: Dict[str, Callable[[str, int, TextGenerator], None]] = {
+    'pdf_text': generate_pdf_text,
+    'pdf_scanned': generate_pdf_scanned,
+    'tiff': generate_tiff,
+    'docx': generate_docx,
+    'pptx': generate_pptx,
+    'xlsx': generate_xlsx,
+    'csv': generate_csv,
+    'txt': generate_txt,
+}
+
+FORMATS = list(GENERATORS)
+
+SIZE_NAMES = ['small', 'medium', 'large']
+
+def file_name(document_format: str, size: str) -> str:
+    extension = 'pdf' if document_format.startswith('pdf') else FILE_TYPES[document_format]
+    return f"{document_format}_{size}.{extension}"
+
+def generate_corpus(
+    output_dir: str,
+    formats: List[str] = FORMATS,
+    sizes: List[str] = SIZE_NAMES,
+    seed: int = DEFAULT_SEED,
+    force: bool = False
+) -> List[Dict[str, Any]]:
+    """
+    Génère le corpus dans `output_dir` et retourne son manifeste
+
+    Les fichiers déjà présents pour la même graine sont réutilisés, sauf `force`.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    manifest_path = os.path.join(output_dir, 'manifest.json')
+    previous: Dict[str, Any] = {}
+    if os.path.exists(manifest_path) and not force:
+        with open(manifest_path) as f:
+            previous = {entry['file']: entry for entry in json.load(f)}
+
+    categories = list(CATEGORY_WORDS)
+    manifest = []
+    for document_format in formats:
+        for size in sizes:
+            amount = SIZES[document_format][size]
+            name = file_name(document_format, size)
+            path = os.path.join(output_dir, name)
+            entry = {
+                'file': name,
+                'format': document_format,
+                'file_type': FILE_TYPES[document_format],
+                'size': size,
+                'unit': SIZES[document_format]['unit'],
+                'amount': amount,
+                'seed': seed
+            }
+
+            cached = previous.get(name)
+            if not (cached and cached['seed'] == seed and cached['amount'] == amount and os.path.exists(path)):
+                # Graine propre à chaque document, indépendante des formats et tailles choisis
+                document_seed = seed * 1000 + FORMATS.index(document_format) * 10 + SIZE_NAMES.index(size)
+                category = categories[document_seed % len(categories)]
+                GENERATORS[document_format](path, amount, TextGenerator(document_seed, category))
+
+            entry['bytes'] = os.path.getsize(path)
+            manifest.append(entry)
+
+    with open(manifest_path, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Génère le corpus synthétique des benchmarks')
+    parser.add_argument('--output', required=True, help='Répertoire du corpus')
+    parser.add_argument('--formats', default=','.join(FORMATS), help='Formats (séparés par des virgules)')
+    parser.add_argument('--sizes', default=','.join(SIZE_NAMES), help='Tailles (séparées par des virgules)')
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED, help='Graine du générateur')
+    parser.add_argument('--force', action='store_true', help='Régénère les fichiers existants')
+    args = parser.parse_args()
+
+    formats = [name for name in args.formats.split(',') if name]
+    sizes = [name for name in args.sizes.split(',') if name]
+    unknown = [name for name in formats if name not in GENERATORS] + [name for name in sizes if name not in SIZE_NAMES]
+    if unknown:
+        parser.error(f"Formats ou tailles inconnus: {', '.join(unknown)}")
+
+    manifest = generate_corpus(args.output, formats, sizes, args.seed, args.force)
+    for entry in manifest:
+        print(f"  {entry['bytes'] / 1024:10.1f} KB  {entry['file']}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
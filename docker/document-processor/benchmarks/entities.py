@@ -0,0 +1,154 @@
+"""
+Benchmark de l'extraction d'entités : passage unique contre un finditer par pattern
+
+Les textes sont générés comme le TXT du corpus (benchmarks/corpus.py, même
+graine, tailles SIZES['txt']) en trois variantes :
+- identifiers : texte du corpus (emails, téléphones, dates, montants, SIRET) ;
+- named : le même, avec des personnes, sociétés et adresses intercalées ;
+- plain : sans chiffres ni '@' (les préfiltres écartent les patterns).
+
+Pour chaque texte, les patterns de default_entity_engine() sont appliqués
+d'abord un par un (re.finditer pour chacun, ancienne méthode), puis par
+EntityEngine.extract. Le script rapporte la médiane des durées, le gain, et
+les entités (après dédoublonnage) trouvées par une seule des deux méthodes :
+l'expression combinée ne retourne pas de correspondances chevauchantes.
+Échec (code de sortie 1) si le gain est inférieur à --min-speedup.
+
+Usage (depuis docker/document-processor) :
+    python benchmarks/entities.py
+    python benchmarks/entities.py --sizes small,medium,large --iterations 3
+    python benchmarks/entities.py --variants plain --json
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import statistics
+from typing import Any, Callable, Dict, List, Set, Tuple
+
+SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SERVICE_DIR)
+
+from benchmarks.corpus import SIZES, SIZE_NAMES, DEFAULT_SEED, TextGenerator
+from processors.classifier_tasks import deduplicate_entities
+from processors.entity_engine import EntityEngine, default_entity_engine
+
+# Entités nommées intercalées dans la variante 'named'
+NAMED_ENTITIES = [
+    'Madame Claire Martin', 'Monsieur Paul Bernard', 'M. Jean Durand', 'Mme Sophie Petit',
+    'Dupont Conseil SARL', 'Martin Freres SA', 'Atelier Moreau SAS', 'Garage Leroy EURL',
+    '12, Rue De Paris, 75001 Paris', '8 Avenue Victor Hugo, 69002 Lyon',
+]
+
+def _paragraphs(size_bytes: int, generator: TextGenerator, transform: Callable[[str], str]) -> str:
+    parts: List[str] = []
+    written = 0
+    while written < size_bytes:
+        paragraph = transform(generator.paragraph()) + '\n\n'
+        parts.append(paragraph)
+        written += len(paragraph.encode('utf-8'))
+    return ''.join(parts)
+
+def generate_text(variant: str, size_bytes: int, seed: int = DEFAULT_SEED) -> str:
+    generator = TextGenerator(seed)
+    if variant == 'plain':
+        table = str.maketrans('0123456789@', 'xxxxxxxxxx.')
+        return _paragraphs(size_bytes, generator, lambda paragraph: paragraph.translate(table))
+    if variant == 'named':
+        named = random.Random(seed)
+        return _paragraphs(
+            size_bytes,
+            generator,
+            lambda paragraph: f"{paragraph} {named.choice(NAMED_ENTITIES)}."
+        )
+    return _paragraphs(size_bytes, generator, lambda paragraph: paragraph)
+
+VARIANTS = ['identifiers', 'named', 'plain']
+
+def per_pattern_extract(engine: EntityEngine, text: str) -> List[Dict[str, Any]]:
+    """
+    Ancienne méthode : un parcours complet du texte par pattern
+    """
+    entities = []
+    for entity_pattern in engine.patterns:
+        for match in entity_pattern.regex.finditer(text):
+            entities.append({
+                'type': entity_pattern.entity_type,
+                'value': match.group(),
+                'start': match.start(),
+                'end': match.end(),
+                'confidence': entity_pattern.confidence
+            })
+    return deduplicate_entities(entities)
+
+def single_pass_extract(engine: EntityEngine, text: str) -> List[Dict[str, Any]]:
+    return deduplicate_entities(engine.extract(text))
+
+def measure(fn: Callable[[EntityEngine, str], List[Dict[str, Any]]], engine: EntityEngine, text: str, iterations: int) -> Tuple[float, List[Dict[str, Any]]]:
+    timings = []
+    entities: List[Dict[str, Any]] = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        entities = fn(engine, text)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings), entities
+
+def entity_keys(entities: List[Dict[str, Any]]) -> Set[Tuple[str, str]]:
+    return {(entity['type'], entity['value'].lower()) for entity in entities}
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Extraction d'entités : passage unique contre un passage par pattern")
+    parser.add_argument('--sizes', default='small,medium', help=f"Tailles ({','.join(SIZE_NAMES)})")
+    parser.add_argument('--variants', default=','.join(VARIANTS), help=f"Variantes ({','.join(VARIANTS)})")
+    parser.add_argument('--iterations', type=int, default=5, help='Mesures par texte et par méthode')
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED, help='Graine du générateur de texte')
+    parser.add_argument('--min-speedup', type=float, default=0, help='Gain minimal exigé (0 : aucun)')
+    parser.add_argument('--json', action='store_true', help='Sortie JSON')
+    args = parser.parse_args()
+
+    engine = default_entity_engine()
+    results = []
+    failures: List[str] = []
+    for variant in args.variants.split(','):
+        for size in args.sizes.split(','):
+            text = generate_text(variant, SIZES['txt'][size], args.seed)
+            # Compilation de l'expression combinée hors mesure
+            engine.extract(text[:1000])
+            per_pattern_seconds, per_pattern = measure(per_pattern_extract, engine, text, args.iterations)
+            single_pass_seconds, single_pass = measure(single_pass_extract, engine, text, args.iterations)
+
+            speedup = per_pattern_seconds / single_pass_seconds if single_pass_seconds else 0
+            per_pattern_keys = entity_keys(per_pattern)
+            single_pass_keys = entity_keys(single_pass)
+            results.append({
+                'case': f"{variant}/{size}",
+                'chars': len(text),
+                'per_pattern_seconds': round(per_pattern_seconds, 4),
+                'single_pass_seconds': round(single_pass_seconds, 4),
+                'speedup': round(speedup, 2),
+                'entities': len(single_pass),
+                'only_per_pattern': len(per_pattern_keys - single_pass_keys),
+                'only_single_pass': len(single_pass_keys - per_pattern_keys)
+            })
+            if args.min_speedup and speedup < args.min_speedup:
+                failures.append(f"{variant}/{size} : gain {speedup:.2f}x inférieur à {args.min_speedup:.2f}x")
+
+    if args.json:
+        print(json.dumps({'results': results, 'failures': failures}, indent=2))
+    else:
+        print(f"{'cas':<20} {'caractères':>11} {'par pattern':>12} {'un passage':>11} {'gain':>6} "
+              f"{'entités':>8} {'écarts':>9}")
+        for result in results:
+            print(f"{result['case']:<20} {result['chars']:>11} "
+                  f"{result['per_pattern_seconds'] * 1000:>10.1f}ms {result['single_pass_seconds'] * 1000:>9.1f}ms "
+                  f"{result['speedup']:>5.2f}x {result['entities']:>8} "
+                  f"{result['only_per_pattern']:>4}/{result['only_single_pass']:<4}")
+        for failure in failures:
+            print(f"ÉCHEC : {failure}")
+
+    return 1 if failures else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,176 @@
+"""
+Benchmark du temps de démarrage du service (import de main.py)
+
+Chaque mesure est faite dans un interpréteur neuf avec `python -X importtime` :
+le script rapporte le temps d'import total (médiane sur plusieurs essais), le
+temps propre cumulé par paquet (fastapi, redis, processors...), et échoue (code de sortie 1) si :
+- une bibliothèque lourde est importée au démarrage (HEAVY_MODULES) ;
+- le temps médian dépasse la référence de plus de la tolérance ;
+- le temps médian dépasse --max-seconds.
+
+Usage (depuis docker/document-processor) :
+    python benchmarks/import_time.py
+    python benchmarks/import_time.py --save-baseline
+    python benchmarks/import_time.py --baseline benchmarks/import_time_baseline.json --tolerance 0.2
+"""
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+import tempfile
+from typing import Dict, List, Tuple
+
+SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_BASELINE = os.path.join(SERVICE_DIR, 'benchmarks', 'import_time_baseline.json')
+
+# Bibliothèques qui ne doivent être importées qu'à la première utilisation
+HEAVY_MODULES = [
+    'torch', 'transformers', 'sentence_transformers', 'sklearn', 'nltk',
+    'cv2', 'numpy', 'PIL', 'pytesseract', 'PyPDF2', 'pdfplumber',
+    'docx', 'pptx', 'openpyxl', 'requests'
+]
+
+# Script exécuté dans l'interpréteur mesuré
+CHILD_SCRIPT = """
+import time
+start = time.perf_counter()
+import main
+print(time.perf_counter() - start)
+"""
+
+def child_env(work_dir: str) -> Dict[str, str]:
+    """
+    Environnement isolé : répertoires temporaires et Redis injoignable
+    (connexion refusée immédiatement) pour ne mesurer que les imports
+    """
+    env = dict(os.environ)
+    env.update({
+        'PYTHONPATH': os.pathsep.join(filter(None, [SERVICE_DIR, env.get('PYTHONPATH')])),
+        'TEMP_DIR': work_dir,
+        'OUTPUT_DIR': work_dir,
+        'MODELS_DIR': work_dir,
+        'REDIS_HOST': '127.0.0.1',
+        'REDIS_PORT': env.get('BENCHMARK_REDIS_PORT', '1'),
+    })
+    return env
+
+def parse_importtime(stderr: str) -> Tuple[Dict[str, int], List[str]]:
+    """
+    Analyse la sortie de -X importtime
+
+    Retourne le temps propre (µs) cumulé par paquet racine et la liste de
+    tous les modules importés.
+    """
+    packages: Dict[str, int] = {}
+    imported: List[str] = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, _, name = line[len('import time:'):].split('|', 2)
+        module = name.strip()
+        imported.append(module)
+        package = module.split('.')[0]
+        packages[package] = packages.get(package, 0) + int(self_us)
+    return packages, imported
+
+def measure_once(work_dir: str) -> Tuple[float, Dict[str, int], List[str]]:
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', CHILD_SCRIPT],
+        cwd=SERVICE_DIR,
+        env=child_env(work_dir),
+        capture_output=True,
+        text=True
+    )
+    if result.returncode != 0:
+        sys.stderr.write(result.stderr)
+        raise SystemExit(f"L'import de main.py a échoué (code {result.returncode})")
+
+    elapsed = float(result.stdout.strip().splitlines()[-1])
+    packages, imported = parse_importtime(result.stderr)
+    return elapsed, packages, imported
+
+def heavy_imports(imported: List[str]) -> List[str]:
+    roots = {module.split('.')[0] for module in imported}
+    return [module for module in HEAVY_MODULES if module in roots]
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Temps d'import de main.py")
+    parser.add_argument('--runs', type=int, default=5, help="Nombre d'essais")
+    parser.add_argument('--top', type=int, default=15, help='Nombre de paquets affichés')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='Fichier JSON de référence')
+    parser.add_argument('--save-baseline', action='store_true', help='Enregistre la mesure comme référence')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='Régression tolérée (0.25 = +25 %%)')
+    parser.add_argument('--max-seconds', type=float, default=0, help='Budget absolu (0 : aucun)')
+    parser.add_argument('--json', action='store_true', help='Sortie JSON')
+    args = parser.parse_args()
+
+    timings: List[float] = []
+    package_timings: Dict[str, List[int]] = {}
+    imported: List[str] = []
+    with tempfile.TemporaryDirectory() as work_dir:
+        for _ in range(args.runs):
+            elapsed, packages, imported = measure_once(work_dir)
+            timings.append(elapsed)
+            for package, self_us in packages.items():
+                package_timings.setdefault(package, []).append(self_us)
+
+    median = statistics.median(timings)
+    package_medians = {
+        package: statistics.median(values) / 1_000_000
+        for package, values in package_timings.items()
+    }
+    slowest = sorted(package_medians.items(), key=lambda item: item[1], reverse=True)[:args.top]
+    heavy = heavy_imports(imported)
+
+    report = {
+        'runs': args.runs,
+        'median_seconds': round(median, 4),
+        'min_seconds': round(min(timings), 4),
+        'max_seconds': round(max(timings), 4),
+        'packages': {package: round(seconds, 4) for package, seconds in slowest},
+        'heavy_modules_imported': heavy
+    }
+
+    failures: List[str] = []
+    if heavy:
+        failures.append(f"Bibliothèques lourdes importées au démarrage: {', '.join(heavy)}")
+
+    if args.max_seconds and median > args.max_seconds:
+        failures.append(f"Temps d'import {median:.3f}s supérieur au budget {args.max_seconds:.3f}s")
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump({'median_seconds': report['median_seconds'], 'packages': report['packages']}, f, indent=2)
+    elif os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        limit = baseline['median_seconds'] * (1 + args.tolerance)
+        report['baseline_seconds'] = baseline['median_seconds']
+        if median > limit:
+            failures.append(
+                f"Régression: {median:.3f}s contre {baseline['median_seconds']:.3f}s "
+                f"en référence (limite {limit:.3f}s)"
+            )
+
+    report['failures'] = failures
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"Import de main.py : médiane {median:.3f}s sur {args.runs} essais "
+              f"(min {min(timings):.3f}s, max {max(timings):.3f}s)")
+        if 'baseline_seconds' in report:
+            print(f"Référence : {report['baseline_seconds']:.3f}s")
+        print("Paquets les plus coûteux (temps propre) :")
+        for package, seconds in slowest:
+            print(f"  {seconds * 1000:9.1f} ms  {package}")
+        for failure in failures:
+            print(f"ÉCHEC : {failure}")
+
+    return 1 if failures else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,439 @@
+"""
+Test de charge du service HTTP
+
+Lance localement le service (uvicorn main:app) avec un Redis jetable, puis
+rejoue pour chaque niveau de concurrence (--concurrency 10,50,200) un
+mélange pondéré de requêtes /process (documents du corpus synthétique) et
+/classify-text pendant --duration secondes. Pour chaque niveau, le script
+rapporte :
+- débit (requêtes/s) et latences p50/p90/p99 par type de requête ;
+- taux d'erreurs (codes HTTP >= 400, délais dépassés, connexions refusées) ;
+- latence d'une sonde /health envoyée toutes les 100 ms : elle doit rester
+  de l'ordre de la milliseconde, une sonde lente révèle un blocage de la
+  boucle asyncio ;
+- mémoire résidente du service (processus et workers) au début, au pic et
+  à la fin du niveau.
+
+Redis : redis-server s'il est installé, sinon le substitut en mémoire de
+benchmarks/redis_standin.py (--redis standin), ou aucun (--redis off, cache
+Redis désactivé par le disjoncteur). Par défaut chaque document envoyé est
+rendu unique (suffixe aléatoire) pour ne pas mesurer le cache ;
+--repeat-ratio fixe la part des envois identiques.
+
+Nécessite httpx (pip install httpx).
+
+Usage (depuis docker/document-processor) :
+    python benchmarks/load_test.py
+    python benchmarks/load_test.py --concurrency 10,50 --duration 20 --output load.json
+    python benchmarks/load_test.py --mix "pdf_text/small=3,classify-text=1" --redis off
+"""
+import os
+import sys
+import json
+import math
+import time
+import random
+import shutil
+import socket
+import asyncio
+import argparse
+import platform
+import datetime
+import subprocess
+import tempfile
+from typing import Any, Dict, List, Optional, Tuple
+
+SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SERVICE_DIR)
+
+from benchmarks.corpus import FORMATS, SIZE_NAMES, DEFAULT_SEED, TextGenerator, generate_corpus
+
+# Mélange par défaut : type de requête (format/taille du corpus, ou classify-text) et poids
+DEFAULT_MIX = (
+    'pdf_text/small=25,pdf_text/medium=10,docx/small=15,pptx/small=5,xlsx/small=5,'
+    'csv/small=5,txt/medium=5,pdf_scanned/small=5,tiff/small=5,classify-text=20'
+)
+
+CLASSIFY_TEXT = 'classify-text'
+
+MIME_TYPES = {
+    'pdf': 'application/pdf',
+    'tiff': 'image/tiff',
+    'docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
+    'pptx': 'application/vnd.openxmlformats-officedocument.presentationml.presentation',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    'csv': 'text/csv',
+    'txt': 'text/plain',
+}
+
+# Intervalles de la sonde /health et des relevés mémoire (secondes)
+PROBE_INTERVAL = 0.1
+MEMORY_INTERVAL = 0.5
+
+def parse_mix(spec: str) -> List[Tuple[str, float]]:
+    mix = []
+    for item in spec.split(','):
+        name, _, weight = item.strip().partition('=')
+        if name != CLASSIFY_TEXT:
+            document_format, _, size = name.partition('/')
+            if document_format not in FORMATS or size not in SIZE_NAMES:
+                raise ValueError(f"Requête inconnue dans le mélange: {name}")
+        mix.append((name, float(weight or 1)))
+    return mix
+
+def percentile(values: List[float], rank: float) -> float:
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(rank / 100 * len(ordered)) - 1)]
+
+def latency_stats(values: List[float]) -> Dict[str, float]:
+    if not values:
+        return {}
+    return {
+        'p50': round(percentile(values, 50), 4),
+        'p90': round(percentile(values, 90), 4),
+        'p99': round(percentile(values, 99), 4),
+        'max': round(max(values), 4)
+    }
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def process_tree_rss_mb(pid: int) -> float:
+    """
+    Mémoire résidente d'un processus et de ses descendants (Linux, /proc)
+    """
+    total_kb = 0
+    pending = [pid]
+    while pending:
+        current = pending.pop()
+        try:
+            with open(f"/proc/{current}/status") as f:
+                for line in f:
+                    if line.startswith('VmRSS:'):
+                        total_kb += int(line.split()[1])
+                        break
+            for task in os.listdir(f"/proc/{current}/task"):
+                with open(f"/proc/{current}/task/{task}/children") as f:
+                    pending.extend(int(child) for child in f.read().split())
+        except (FileNotFoundError, ProcessLookupError):
+            continue
+    return round(total_kb / 1024, 1)
+
+def wait_for_port(host: str, port: int, timeout: float) -> bool:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with socket.create_connection((host, port), timeout=0.5):
+                return True
+        except OSError:
+            time.sleep(0.1)
+    return False
+
+def start_redis(mode: str) -> Tuple[str, str, int, Optional[subprocess.Popen]]:
+    """
+    Démarre le Redis du test ; retourne le mode retenu, hôte, port et processus
+    (None si désactivé)
+    """
+    port = free_port()
+    if mode == 'auto':
+        mode = 'server' if shutil.which('redis-server') else 'standin'
+
+    if mode == 'off':
+        # Port libre sans serveur : connexions refusées, cache Redis désactivé
+        return mode, '127.0.0.1', port, None
+
+    if mode == 'server':
+        command = ['redis-server', '--port', str(port), '--bind', '127.0.0.1', '--save', '', '--appendonly', 'no']
+    else:
+        command = [sys.executable, os.path.join(SERVICE_DIR, 'benchmarks', 'redis_standin.py'), '--port', str(port)]
+
+    process = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    if not wait_for_port('127.0.0.1', port, 10):
+        process.kill()
+        raise SystemExit(f"Redis ({mode}) n'a pas démarré")
+    return mode, '127.0.0.1', port, process
+
+def start_service(port: int, redis_host: str, redis_port: int, work_dir: str, log_path: str) -> subprocess.Popen:
+    env = dict(os.environ)
+    env.update({
+        'PYTHONPATH': os.pathsep.join(filter(None, [SERVICE_DIR, env.get('PYTHONPATH')])),
+        'TEMP_DIR': os.path.join(work_dir, 'temp'),
+        'OUTPUT_DIR': os.path.join(work_dir, 'output'),
+        'MODELS_DIR': env.get('MODELS_DIR', os.path.join(work_dir, 'models')),
+        'REDIS_HOST': redis_host,
+        'REDIS_PORT': str(redis_port),
+    })
+    for name in ('temp', 'output'):
+        os.makedirs(os.path.join(work_dir, name), exist_ok=True)
+
+    log_file = open(log_path, 'w')
+    return subprocess.Popen(
+        [sys.executable, '-m', 'uvicorn', 'main:app', '--host', '127.0.0.1', '--port', str(port), '--log-level', 'warning'],
+        cwd=SERVICE_DIR,
+        env=env,
+        stdout=log_file,
+        stderr=subprocess.STDOUT
+    )
+
+def stop_process(process: Optional[subprocess.Popen]):
+    if process is None or process.poll() is not None:
+        return
+    process.terminate()
+    try:
+        process.wait(timeout=15)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+def unique_payload(payload: bytes, file_type: str, nonce: str) -> bytes:
+    """
+    Variante du document à l'empreinte différente (cache manqué), toujours lisible :
+    commentaire après %%EOF pour les PDF, données après la fin de l'archive
+    ou de l'image pour les autres formats
+    """
+    if file_type == 'pdf':
+        return payload + f"\n%{nonce}\n".encode()
+    if file_type in ('txt', 'csv'):
+        return payload + f"\n{nonce}\n".encode()
+    return payload + nonce.encode()
+
+class LoadGenerator:
+    """
+    Envoie le mélange de requêtes au service et collecte les mesures
+    """
+
+    def __init__(self, client, mix: List[Tuple[str, float]], payloads: Dict[str, Any], args: argparse.Namespace):
+        self.client = client
+        self.names = [name for name, _ in mix]
+        self.weights = [weight for _, weight in mix]
+        self.payloads = payloads
+        self.args = args
+
+    async def send(self, name: str, rng: random.Random) -> Tuple[float, str]:
+        """
+        Envoie une requête ; retourne sa durée et son issue ('200', '500', 'timeout'...)
+        """
+        unique = rng.random() >= self.args.repeat_ratio
+        nonce = f"{rng.getrandbits(64):016x}"
+        start_time = time.perf_counter()
+        try:
+            if name == CLASSIFY_TEXT:
+                text = rng.choice(self.payloads[CLASSIFY_TEXT])
+                if unique:
+                    text = f"{text} {nonce}"
+                response = await self.client.post('/classify-text', params={'text': text, 'language': 'fr'})
+            else:
+                file_name, file_type, data = self.payloads[name]
+                if unique:
+                    data = unique_payload(data, file_type, nonce)
+                response = await self.client.post(
+                    '/process',
+                    files={'file': (file_name, data, MIME_TYPES[file_type])},
+                    params={'generate_summary': str(self.args.summary).lower()}
+                )
+            outcome = str(response.status_code)
+        except Exception as e:
+            outcome = 'timeout' if 'Timeout' in type(e).__name__ else type(e).__name__
+        return time.perf_counter() - start_time, outcome
+
+    async def run_level(self, concurrency: int, duration: float, service_pid: int, seed: int) -> Dict[str, Any]:
+        samples: Dict[str, List[Tuple[float, str]]] = {name: [] for name in self.names}
+        probes: List[float] = []
+        memory: List[float] = [process_tree_rss_mb(service_pid)]
+        start_time = time.perf_counter()
+        stop_at = start_time + duration
+
+        async def worker(index: int):
+            rng = random.Random(seed * 1000 + index)
+            while time.perf_counter() < stop_at:
+                name = rng.choices(self.names, self.weights)[0]
+                samples[name].append(await self.send(name, rng))
+
+        async def probe():
+            while time.perf_counter() < stop_at:
+                probe_start = time.perf_counter()
+                try:
+                    await self.client.get('/health')
+                    probes.append(time.perf_counter() - probe_start)
+                except Exception:
+                    probes.append(self.args.timeout)
+                await asyncio.sleep(PROBE_INTERVAL)
+
+        async def sample_memory():
+            while time.perf_counter() < stop_at:
+                await asyncio.sleep(MEMORY_INTERVAL)
+                memory.append(process_tree_rss_mb(service_pid))
+
+        await asyncio.gather(probe(), sample_memory(), *[worker(index) for index in range(concurrency)])
+        elapsed = time.perf_counter() - start_time
+        memory.append(process_tree_rss_mb(service_pid))
+
+        requests: Dict[str, Any] = {}
+        total = errors = 0
+        for name, results in samples.items():
+            latencies = [latency for latency, outcome in results if outcome.startswith('2')]
+            outcomes: Dict[str, int] = {}
+            for _, outcome in results:
+                outcomes[outcome] = outcomes.get(outcome, 0) + 1
+            failed = len(results) - len(latencies)
+            total += len(results)
+            errors += failed
+            requests[name] = {
+                'count': len(results),
+                'errors': failed,
+                'error_rate': round(failed / len(results), 4) if results else 0,
+                'outcomes': outcomes,
+                'latency': latency_stats(latencies)
+            }
+
+        all_latencies = [latency for results in samples.values() for latency, outcome in results if outcome.startswith('2')]
+        return {
+            'concurrency': concurrency,
+            'duration': round(elapsed, 2),
+            'requests': total,
+            'throughput': round(total / elapsed, 3),
+            'successful_throughput': round((total - errors) / elapsed, 3),
+            'error_rate': round(errors / total, 4) if total else 0,
+            'latency': latency_stats(all_latencies),
+            'loop_probe': latency_stats(probes),
+            'memory_mb': {
+                'start': memory[0],
+                'peak': max(memory),
+                'end': memory[-1],
+                'growth': round(memory[-1] - memory[0], 1)
+            },
+            'by_request': requests
+        }
+
+def load_payloads(mix: List[Tuple[str, float]], corpus_dir: str, seed: int) -> Dict[str, Any]:
+    cases = [name for name, _ in mix if name != CLASSIFY_TEXT]
+    formats = sorted({name.split('/')[0] for name in cases}, key=FORMATS.index)
+    sizes = sorted({name.split('/')[1] for name in cases}, key=SIZE_NAMES.index)
+    manifest = {f"{entry['format']}/{entry['size']}": entry for entry in generate_corpus(corpus_dir, formats, sizes, seed)}
+
+    payloads: Dict[str, Any] = {}
+    for name in cases:
+        entry = manifest[name]
+        with open(os.path.join(corpus_dir, entry['file']), 'rb') as f:
+            payloads[name] = (entry['file'], entry['file_type'], f.read())
+
+    # Textes courts : /classify-text reçoit le texte en paramètre d'URL
+    generator = TextGenerator(seed)
+    payloads[CLASSIFY_TEXT] = [generator.paragraph(sentences=8) for _ in range(50)]
+    return payloads
+
+async def run(args: argparse.Namespace, mix: List[Tuple[str, float]], payloads: Dict[str, Any], base_url: str, service: subprocess.Popen) -> Dict[str, Any]:
+    import httpx
+
+    levels = [int(level) for level in args.concurrency.split(',')]
+    limits = httpx.Limits(max_connections=max(levels) + 1, max_keepalive_connections=max(levels) + 1)
+    async with httpx.AsyncClient(base_url=base_url, timeout=args.timeout, limits=limits) as client:
+        generator = LoadGenerator(client, mix, payloads, args)
+
+        # Chauffe : chargement des modèles, démarrage des pools
+        if args.wait_ready:
+            deadline = time.time() + args.startup_timeout
+            while time.time() < deadline and (await client.get('/ready')).status_code != 200:
+                await asyncio.sleep(1)
+        rng = random.Random(args.seed)
+        for name, _ in mix:
+            for _ in range(args.warmup):
+                await generator.send(name, rng)
+
+        memory_after_warmup = process_tree_rss_mb(service.pid)
+        results = []
+        for level in levels:
+            result = await generator.run_level(level, args.duration, service.pid, args.seed + level)
+            results.append(result)
+            print(
+                f"  concurrence {level:4d} : {result['throughput']:8.2f} req/s  "
+                f"p50 {result['latency'].get('p50', 0) * 1000:8.1f} ms  "
+                f"p99 {result['latency'].get('p99', 0) * 1000:8.1f} ms  "
+                f"erreurs {result['error_rate'] * 100:5.1f} %  "
+                f"sonde p99 {result['loop_probe'].get('p99', 0) * 1000:7.1f} ms  "
+                f"RSS {result['memory_mb']['end']:7.1f} MB ({result['memory_mb']['growth']:+.1f})",
+                file=sys.stderr
+            )
+            if args.pause:
+                await asyncio.sleep(args.pause)
+
+        stats = (await client.get('/stats')).json()
+
+    return {
+        'levels': results,
+        'memory_mb': {
+            'after_warmup': memory_after_warmup,
+            'end': process_tree_rss_mb(service.pid),
+            'growth': round(process_tree_rss_mb(service.pid) - memory_after_warmup, 1)
+        },
+        'service_stats': stats
+    }
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Test de charge du service HTTP')
+    parser.add_argument('--concurrency', default='10,50,200', help='Niveaux de concurrence')
+    parser.add_argument('--duration', type=float, default=30, help='Durée de chaque niveau (secondes)')
+    parser.add_argument('--mix', default=DEFAULT_MIX, help='Mélange pondéré : format/taille=poids ou classify-text=poids')
+    parser.add_argument('--repeat-ratio', type=float, default=0, help='Part des envois identiques (servis par le cache)')
+    parser.add_argument('--summary', action='store_true', help='Demande aussi le résumé (generate_summary)')
+    parser.add_argument('--corpus', default=os.path.join(tempfile.gettempdir(), 'docproc-corpus'), help='Répertoire du corpus')
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED)
+    parser.add_argument('--redis', default='auto', choices=['auto', 'server', 'standin', 'off'])
+    parser.add_argument('--warmup', type=int, default=2, help='Requêtes de chauffe par type')
+    parser.add_argument('--wait-ready', action='store_true', help='Attend /ready (préchauffage des modèles)')
+    parser.add_argument('--timeout', type=float, default=120, help='Délai maximal par requête (secondes)')
+    parser.add_argument('--startup-timeout', type=float, default=120)
+    parser.add_argument('--pause', type=float, default=2, help='Pause entre deux niveaux (secondes)')
+    parser.add_argument('--output', help='Fichier JSON des résultats')
+    args = parser.parse_args()
+
+    try:
+        import httpx  # noqa: F401
+    except ImportError:
+        raise SystemExit("httpx est requis pour le test de charge (pip install httpx)")
+
+    try:
+        mix = parse_mix(args.mix)
+    except ValueError as e:
+        parser.error(str(e))
+    payloads = load_payloads(mix, args.corpus, args.seed)
+
+    redis_mode, redis_process, service = args.redis, None, None
+    with tempfile.TemporaryDirectory() as work_dir:
+        try:
+            redis_mode, redis_host, redis_port, redis_process = start_redis(args.redis)
+            port = free_port()
+            log_path = os.path.join(work_dir, 'service.log')
+            service = start_service(port, redis_host, redis_port, work_dir, log_path)
+            if not wait_for_port('127.0.0.1', port, args.startup_timeout):
+                with open(log_path) as f:
+                    sys.stderr.write(f.read()[-4000:])
+                raise SystemExit("Le service n'a pas démarré")
+
+            base_url = f"http://127.0.0.1:{port}"
+            print(f"Service sur {base_url} (Redis : {redis_mode})", file=sys.stderr)
+            report = asyncio.run(run(args, mix, payloads, base_url, service))
+        finally:
+            stop_process(service)
+            stop_process(redis_process)
+
+    report.update({
+        'created': datetime.datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'mix': dict(mix),
+        'duration': args.duration,
+        'repeat_ratio': args.repeat_ratio,
+        'redis': redis_mode
+    })
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
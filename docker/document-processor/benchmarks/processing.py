@@ -0,0 +1,328 @@
+"""
+Benchmark du traitement des documents par format et par étape
+
+Le corpus synthétique (benchmarks/corpus.py) est généré à la demande puis
+chaque document (format × taille) est traité dans un interpréteur neuf :
+DocumentProcessor.process_file puis, selon --stages, classification, entités
+et résumé par AIClassifier, sans cache Redis. Pour chaque cas, le script
+rapporte :
+- débit (documents/s et MB/s) et latences p50/p99 de bout en bout ;
+- latences p50/p99 par étape, y compris les étapes internes mesurées par
+  track_stage (ocr_page, pdf_render, content_analysis...) ;
+- pic de mémoire résidente (RSS) du processus.
+
+Les pools d'exécution tournent par défaut en mode thread afin que le pic de
+RSS couvre l'extraction et les modèles (en mode process, les workers sont
+enfants du forkserver et ne sont pas comptés).
+
+Les résultats sont écrits en JSON et comparés à une référence : une latence
+p50 (totale ou par étape) ou un pic de RSS au-delà de la tolérance est
+signalé comme régression (code de sortie 1).
+
+Avec --pdf-backends, chaque document PDF est mesuré une fois par moteur
+d'extraction (cas « pdf_text/large@pdftotext ») pour comparer leurs débits.
+
+Usage (depuis docker/document-processor) :
+    python benchmarks/processing.py --corpus /tmp/corpus --sizes small,medium --save-baseline
+    python benchmarks/processing.py --corpus /tmp/corpus --sizes small,medium --output results.json
+    python benchmarks/processing.py --formats pdf_scanned --stages extraction --iterations 3
+    python benchmarks/processing.py --formats pdf_text --sizes medium,large --stages extraction \\
+        --pdf-backends pypdf2,pdfplumber,pdftotext
+"""
+import os
+import sys
+import json
+import math
+import time
+import asyncio
+import argparse
+import platform
+import datetime
+import resource
+import subprocess
+import tempfile
+from typing import Any, Dict, List, Optional
+
+SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SERVICE_DIR)
+
+from benchmarks.corpus import FORMATS, SIZE_NAMES, DEFAULT_SEED, generate_corpus
+from processors.extractors import PDF_BACKENDS
+
+DEFAULT_BASELINE = os.path.join(SERVICE_DIR, 'benchmarks', 'processing_baseline.json')
+
+STAGES = ['extraction', 'classification', 'entities', 'summary']
+
+def percentile(values: List[float], rank: float) -> float:
+    """
+    Percentile au rang le plus proche (valeur réellement observée)
+    """
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(rank / 100 * len(ordered)) - 1)]
+
+def summarize(values: List[float]) -> Dict[str, float]:
+    return {
+        'p50': round(percentile(values, 50), 4),
+        'p99': round(percentile(values, 99), 4),
+        'min': round(min(values), 4),
+        'max': round(max(values), 4)
+    }
+
+def peak_rss_mb() -> float:
+    # ru_maxrss est en KB sous Linux, en octets sous macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+async def run_case(path: str, file_type: str, stages: List[str], iterations: int, warmup: int, language: str) -> Dict[str, Any]:
+    """
+    Traite `warmup + iterations` fois le document dans ce processus
+    """
+    from processors.document_processor import DocumentProcessor
+    from processors.ai_classifier import AIClassifier
+    from utils.execution import ExecutionEngine
+    from utils.metrics import stage_trace, track_stage
+
+    engine = ExecutionEngine()
+    processor = DocumentProcessor(execution_engine=engine)
+    classifier = AIClassifier(execution_engine=engine) if set(stages) - {'extraction'} else None
+    initial_rss = peak_rss_mb()
+
+    latencies: List[float] = []
+    stage_latencies: Dict[str, List[float]] = {}
+    errors: List[str] = []
+    text_length = 0
+    pdf_backend = None
+    try:
+        for iteration in range(warmup + iterations):
+            with stage_trace() as trace:
+                start_time = time.perf_counter()
+                try:
+                    with track_stage('extraction', file_type):
+                        extraction = await processor.process_file(path, file_type, language=language)
+                    text = extraction['text_content']
+                    text_length = len(text)
+                    pdf_backend = extraction['metadata'].get('pdf_backend')
+
+                    if 'classification' in stages and text:
+                        with track_stage('classification'):
+                            await classifier.classify_document(text, language=language)
+                    if 'entities' in stages and text:
+                        with track_stage('entities'):
+                            await classifier.extract_entities(text, language=language)
+                    if 'summary' in stages and text:
+                        with track_stage('summary'):
+                            await classifier.generate_summary(text, language=language)
+                except Exception as e:
+                    errors.append(str(e))
+                    continue
+                elapsed = time.perf_counter() - start_time
+
+            # Les premiers passages (chargement des modèles, pools) ne sont pas comptés
+            if iteration < warmup:
+                continue
+            latencies.append(elapsed)
+            for stage, total in trace.totals().items():
+                stage_latencies.setdefault(stage, []).append(total['duration'])
+    finally:
+        await processor.libreoffice_pool.shutdown()
+        engine.shutdown(wait=True)
+
+    result: Dict[str, Any] = {
+        'iterations': len(latencies),
+        'errors': errors[:5],
+        'error_count': len(errors),
+        'text_length': text_length,
+        'pdf_backend': pdf_backend,
+        'initial_rss_mb': initial_rss,
+        'peak_rss_mb': peak_rss_mb()
+    }
+    if latencies:
+        size_mb = os.path.getsize(path) / (1024 * 1024)
+        total_time = sum(latencies)
+        result.update({
+            'docs_per_second': round(len(latencies) / total_time, 3),
+            'mb_per_second': round(size_mb * len(latencies) / total_time, 3),
+            'latency': summarize(latencies),
+            'stages': {stage: summarize(values) for stage, values in stage_latencies.items()}
+        })
+    return result
+
+def case_main(args: argparse.Namespace) -> int:
+    """
+    Mode enfant : mesure un seul document et écrit le résultat JSON sur stdout
+    """
+    from loguru import logger
+
+    # Les journaux par document fausseraient les mesures
+    logger.remove()
+    logger.add(sys.stderr, level='WARNING')
+
+    result = asyncio.run(run_case(
+        args.case, args.file_type, args.stages.split(','), args.iterations, args.warmup, args.language
+    ))
+    print(json.dumps(result))
+    return 0
+
+def run_case_subprocess(
+    entry: Dict[str, Any],
+    corpus_dir: str,
+    work_dir: str,
+    args: argparse.Namespace,
+    pdf_backend: Optional[str] = None
+) -> Dict[str, Any]:
+    env = dict(os.environ)
+    if pdf_backend:
+        env['PDF_BACKEND'] = pdf_backend
+    env.update({
+        'PYTHONPATH': os.pathsep.join(filter(None, [SERVICE_DIR, env.get('PYTHONPATH')])),
+        'EXECUTOR_MODE': args.executor_mode,
+        'TEMP_DIR': work_dir,
+        'MODELS_DIR': env.get('MODELS_DIR', os.path.join(work_dir, 'models')),
+        'LIBREOFFICE_POOL_SIZE': env.get('LIBREOFFICE_POOL_SIZE', '0'),
+    })
+    command = [
+        sys.executable, os.path.abspath(__file__),
+        '--case', os.path.join(corpus_dir, entry['file']),
+        '--file-type', entry['file_type'],
+        '--stages', args.stages,
+        '--iterations', str(args.iterations),
+        '--warmup', str(args.warmup),
+        '--language', args.language
+    ]
+    completed = subprocess.run(command, cwd=SERVICE_DIR, env=env, capture_output=True, text=True)
+    if completed.returncode != 0:
+        return {'iterations': 0, 'error_count': 1, 'errors': [completed.stderr.strip()[-2000:]]}
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float, min_delta: float) -> List[str]:
+    """
+    Régressions de `current` par rapport à `baseline` (cas présents dans les deux)
+
+    Une latence n'est signalée que si elle dépasse la référence de plus de la
+    tolérance et d'au moins `min_delta` secondes (bruit des mesures courtes).
+    """
+    regressions: List[str] = []
+
+    def check(name: str, value: Optional[float], reference: Optional[float], floor: float, unit: str, digits: int = 4):
+        if value is None or reference is None:
+            return
+        limit = reference * (1 + tolerance)
+        if value > limit and value - reference > floor:
+            regressions.append(
+                f"{name}: {value:.{digits}f}{unit} contre {reference:.{digits}f}{unit} "
+                f"en référence (limite {limit:.{digits}f}{unit})"
+            )
+
+    for case, result in current['cases'].items():
+        reference = baseline.get('cases', {}).get(case)
+        if not reference or 'latency' not in result or 'latency' not in reference:
+            continue
+        check(f"{case} latence p50", result['latency']['p50'], reference['latency']['p50'], min_delta, 's')
+        for stage, stats in result['stages'].items():
+            reference_stage = reference['stages'].get(stage)
+            if reference_stage:
+                check(f"{case} étape {stage} p50", stats['p50'], reference_stage['p50'], min_delta, 's')
+        check(f"{case} pic RSS", result['peak_rss_mb'], reference.get('peak_rss_mb'), 0, ' MB', digits=1)
+    return regressions
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Benchmark du traitement des documents par format')
+    parser.add_argument('--corpus', default=os.path.join(tempfile.gettempdir(), 'docproc-corpus'), help='Répertoire du corpus')
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED, help='Graine du corpus')
+    parser.add_argument('--formats', default=','.join(FORMATS), help='Formats mesurés')
+    parser.add_argument('--sizes', default='small,medium', help='Tailles mesurées (small, medium, large)')
+    parser.add_argument('--stages', default='extraction,classification,entities', help=f"Étapes ({', '.join(STAGES)})")
+    parser.add_argument('--iterations', type=int, default=5, help='Passages mesurés par document')
+    parser.add_argument('--warmup', type=int, default=1, help='Passages de chauffe non mesurés')
+    parser.add_argument('--language', default='fr')
+    parser.add_argument('--executor-mode', default='thread', choices=['thread', 'process'])
+    parser.add_argument('--pdf-backends', default='', help='Moteurs PDF comparés (ex. pypdf2,pdftotext ; défaut : PDF_BACKEND)')
+    parser.add_argument('--output', help='Fichier JSON des résultats')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='Fichier JSON de référence')
+    parser.add_argument('--save-baseline', action='store_true', help='Enregistre les résultats comme référence')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='Régression tolérée (0.2 = +20 %%)')
+    parser.add_argument('--min-delta-ms', type=float, default=5, help='Écart minimal signalé, en ms')
+    # Mode enfant (un seul document)
+    parser.add_argument('--case', help=argparse.SUPPRESS)
+    parser.add_argument('--file-type', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    unknown = [stage for stage in args.stages.split(',') if stage not in STAGES]
+    if unknown or 'extraction' not in args.stages.split(','):
+        parser.error(f"Étapes invalides (extraction obligatoire): {args.stages}")
+
+    if args.case:
+        return case_main(args)
+
+    formats = [name for name in args.formats.split(',') if name]
+    sizes = [name for name in args.sizes.split(',') if name]
+    pdf_backends = [name for name in args.pdf_backends.split(',') if name]
+    invalid = [name for name in formats if name not in FORMATS] + [name for name in sizes if name not in SIZE_NAMES]
+    invalid += [name for name in pdf_backends if name not in PDF_BACKENDS and name != 'auto']
+    if invalid:
+        parser.error(f"Formats ou tailles inconnus: {', '.join(invalid)}")
+
+    manifest = generate_corpus(args.corpus, formats, sizes, args.seed)
+
+    report: Dict[str, Any] = {
+        'created': datetime.datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'seed': args.seed,
+        'stages': args.stages.split(','),
+        'iterations': args.iterations,
+        'executor_mode': args.executor_mode,
+        'cases': {}
+    }
+    with tempfile.TemporaryDirectory() as work_dir:
+        cases = []
+        for entry in manifest:
+            case = f"{entry['format']}/{entry['size']}"
+            if entry['file_type'] == 'pdf' and pdf_backends:
+                cases.extend((f"{case}@{backend}", entry, backend) for backend in pdf_backends)
+            else:
+                cases.append((case, entry, None))
+
+        for case, entry, pdf_backend in cases:
+            result = run_case_subprocess(entry, args.corpus, work_dir, args, pdf_backend)
+            result.update({'file_type': entry['file_type'], 'bytes': entry['bytes'], entry['unit']: entry['amount']})
+            report['cases'][case] = result
+
+            if 'latency' in result:
+                print(
+                    f"  {case:32} p50 {result['latency']['p50'] * 1000:9.1f} ms  "
+                    f"p99 {result['latency']['p99'] * 1000:9.1f} ms  "
+                    f"{result['docs_per_second']:8.2f} docs/s  {result['mb_per_second']:8.2f} MB/s  "
+                    f"RSS {result['peak_rss_mb']:7.1f} MB",
+                    file=sys.stderr
+                )
+            else:
+                print(f"  {case:32} ÉCHEC : {'; '.join(result['errors'])[:300]}", file=sys.stderr)
+
+    failures: List[str] = [
+        f"{case}: {result['error_count']} erreur(s)"
+        for case, result in report['cases'].items() if result.get('error_count')
+    ]
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+    elif os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        report['baseline'] = baseline['created']
+        report['regressions'] = compare(report, baseline, args.tolerance, args.min_delta_ms / 1000)
+        failures.extend(report['regressions'])
+
+    report['failures'] = failures
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+    for failure in failures:
+        print(f"ÉCHEC : {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
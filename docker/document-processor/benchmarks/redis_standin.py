@@ -0,0 +1,252 @@
+"""
+Serveur Redis de substitution pour les tests de charge
+
+Implémente en mémoire, sur le protocole RESP2, le sous-ensemble de commandes
+utilisé par CacheManager (GET, MGET, SET EX/PX, DEL, UNLINK, EXISTS, INCR,
+SCAN, INFO...) afin de lancer le service sans installation de Redis. Un
+serveur redis-server réel reste préférable quand il est disponible : ce
+substitut n'a ni persistance ni limite mémoire, et son coût CPU n'est pas
+représentatif.
+
+Usage :
+    python benchmarks/redis_standin.py --port 6390
+"""
+import sys
+import time
+import fnmatch
+import asyncio
+import argparse
+from typing import Dict, List, Optional, Tuple
+
+class RespError(Exception):
+    pass
+
+def encode(value) -> bytes:
+    """
+    Encode une réponse RESP2
+    """
+    if value is None:
+        return b'$-1\r\n'
+    if isinstance(value, RespError):
+        return b'-' + str(value).encode() + b'\r\n'
+    if isinstance(value, int):
+        return b':%d\r\n' % value
+    if isinstance(value, str):
+        return b'+' + value.encode() + b'\r\n'
+    if isinstance(value, bytes):
+        return b'$%d\r\n' % len(value) + value + b'\r\n'
+    if isinstance(value, (list, tuple)):
+        return b'*%d\r\n' % len(value) + b''.join(encode(item) for item in value)
+    raise TypeError(f"Type RESP non géré: {type(value)}")
+
+async def read_command(reader: asyncio.StreamReader) -> Optional[List[bytes]]:
+    """
+    Lit une commande (tableau de chaînes RESP, ou commande en ligne)
+    """
+    line = await reader.readline()
+    if not line:
+        return None
+    if not line.startswith(b'*'):
+        return line.strip().split()
+
+    arguments = []
+    for _ in range(int(line[1:])):
+        header = await reader.readline()
+        length = int(header[1:])
+        data = await reader.readexactly(length + 2)
+        arguments.append(data[:-2])
+    return arguments
+
+class RedisStandin:
+    """
+    Base clé/valeur en mémoire avec expiration paresseuse
+    """
+
+    def __init__(self):
+        self.data: Dict[bytes, bytes] = {}
+        self.expires: Dict[bytes, float] = {}
+        self.start_time = time.time()
+        self.commands = 0
+        self.hits = 0
+        self.misses = 0
+        self.clients = 0
+
+    def _alive(self, key: bytes) -> bool:
+        deadline = self.expires.get(key)
+        if deadline is not None and deadline <= time.time():
+            self.data.pop(key, None)
+            self.expires.pop(key, None)
+        return key in self.data
+
+    def _get(self, key: bytes) -> Optional[bytes]:
+        if self._alive(key):
+            self.hits += 1
+            return self.data[key]
+        self.misses += 1
+        return None
+
+    def _delete(self, keys: List[bytes]) -> int:
+        deleted = 0
+        for key in keys:
+            if self._alive(key):
+                del self.data[key]
+                self.expires.pop(key, None)
+                deleted += 1
+        return deleted
+
+    def execute(self, arguments: List[bytes]):
+        self.commands += 1
+        name = arguments[0].upper().decode()
+        handler = getattr(self, f"cmd_{name.lower()}", None)
+        if handler is None:
+            return RespError(f"ERR unknown command '{name}'")
+        try:
+            return handler(*arguments[1:])
+        except (TypeError, ValueError, IndexError):
+            return RespError(f"ERR wrong arguments for '{name}' command")
+
+    def cmd_ping(self, *arguments):
+        return arguments[0] if arguments else 'PONG'
+
+    def cmd_echo(self, message):
+        return message
+
+    def cmd_client(self, *arguments):
+        return 'OK'
+
+    def cmd_select(self, index):
+        return 'OK'
+
+    def cmd_get(self, key):
+        return self._get(key)
+
+    def cmd_mget(self, *keys):
+        return [self._get(key) for key in keys]
+
+    def cmd_set(self, key, value, *options):
+        options = [option.upper() for option in options]
+        if b'NX' in options and self._alive(key):
+            return None
+        if b'XX' in options and not self._alive(key):
+            return None
+
+        self.data[key] = value
+        self.expires.pop(key, None)
+        for option, argument in zip(options, options[1:]):
+            if option == b'EX':
+                self.expires[key] = time.time() + int(argument)
+            elif option == b'PX':
+                self.expires[key] = time.time() + int(argument) / 1000
+        return 'OK'
+
+    def cmd_setex(self, key, seconds, value):
+        return self.cmd_set(key, value, b'EX', seconds)
+
+    def cmd_del(self, *keys):
+        return self._delete(list(keys))
+
+    def cmd_unlink(self, *keys):
+        return self._delete(list(keys))
+
+    def cmd_exists(self, *keys):
+        return sum(1 for key in keys if self._alive(key))
+
+    def cmd_incrby(self, key, increment):
+        value = int(self.data[key]) if self._alive(key) else 0
+        value += int(increment)
+        self.data[key] = str(value).encode()
+        return value
+
+    def cmd_incr(self, key):
+        return self.cmd_incrby(key, b'1')
+
+    def cmd_scan(self, cursor, *options):
+        pattern, count = b'*', 10
+        for option, argument in zip(options[::2], options[1::2]):
+            if option.upper() == b'MATCH':
+                pattern = argument
+            elif option.upper() == b'COUNT':
+                count = int(argument)
+
+        # Curseur = position dans l'ordre trié des clés (les clés ajoutées
+        # pendant le parcours peuvent être manquées, comme avec Redis)
+        keys = sorted(self.data)
+        start = int(cursor)
+        page = keys[start:start + count]
+        next_cursor = start + count if start + count < len(keys) else 0
+        matched = [
+            key for key in page
+            if self._alive(key) and fnmatch.fnmatchcase(key.decode('latin-1'), pattern.decode('latin-1'))
+        ]
+        return [str(next_cursor).encode(), matched]
+
+    def cmd_dbsize(self):
+        return len(self.data)
+
+    def cmd_flushdb(self, *arguments):
+        self.data.clear()
+        self.expires.clear()
+        return 'OK'
+
+    def cmd_info(self, *sections):
+        used_memory = sum(len(key) + len(value) for key, value in self.data.items())
+        lines = [
+            '# Server',
+            'redis_version:7.0.0-standin',
+            f"uptime_in_seconds:{int(time.time() - self.start_time)}",
+            '# Clients',
+            f"connected_clients:{self.clients}",
+            '# Memory',
+            f"used_memory:{used_memory}",
+            f"used_memory_human:{used_memory / (1024 * 1024):.2f}M",
+            '# Stats',
+            f"total_commands_processed:{self.commands}",
+            f"keyspace_hits:{self.hits}",
+            f"keyspace_misses:{self.misses}",
+            '# Keyspace',
+            f"db0:keys={len(self.data)},expires={len(self.expires)},avg_ttl=0",
+        ]
+        return ('\r\n'.join(lines) + '\r\n').encode()
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.clients += 1
+        try:
+            while True:
+                arguments = await read_command(reader)
+                if not arguments:
+                    break
+                if arguments[0].upper() == b'QUIT':
+                    writer.write(encode('OK'))
+                    break
+                writer.write(encode(self.execute(arguments)))
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self.clients -= 1
+            writer.close()
+
+async def serve(host: str, port: int) -> Tuple[RedisStandin, asyncio.AbstractServer]:
+    standin = RedisStandin()
+    server = await asyncio.start_server(standin.handle, host, port)
+    return standin, server
+
+async def run(host: str, port: int):
+    _, server = await serve(host, port)
+    print(f"Redis de substitution sur {host}:{port}", flush=True)
+    async with server:
+        await server.serve_forever()
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Serveur Redis de substitution (en mémoire)')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=6390)
+    args = parser.parse_args()
+    try:
+        asyncio.run(run(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
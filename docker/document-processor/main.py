@@ -1,17 +1,30 @@
-from fastapi import FastAPI, File, UploadFile, HTTPException, BackgroundTasks
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, File, Form, Query, UploadFile, HTTPException, BackgroundTasks
+from fastapi.responses import JSONResponse, Response, PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
 import uvicorn
 import os
-import tempfile
-import shutil
-from typing import Optional, List, Dict, Any
+import json
+import asyncio
+from contextlib import aclosing
+from typing import Optional, List, Dict, Any, Tuple
 from loguru import logger
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
 
 from processors.document_processor import DocumentProcessor
 from processors.ai_classifier import AIClassifier
-from utils.file_utils import get_file_type, sanitize_filename
+from processors.pipeline import DocumentPipeline, CACHE_NAMESPACES
+from utils.file_utils import (
+    sanitize_filename, spool_upload, compute_file_digest, validate_file_path,
+    FileTooLargeError, SpooledUpload
+)
 from utils.cache import CacheManager
+from utils.execution import ExecutionEngine
+from utils.jobs import Job, JobManager, QueueFullError, JOB_PRIORITIES
+from utils.metrics import track_stage, stage_trace, register_service_collector
+from utils.profiling import (
+    sampling_profile, profile_path, ProfilerBusyError, PROFILING_ENABLED
+)
+from utils.text_store import TextStore, TextNotFoundError, TextRangeError
 
 # Configuration de l'application
 app = FastAPI(
@@ -21,9 +34,19 @@ app = FastAPI(
 )
 
 # Initialisation des services
-document_processor = DocumentProcessor()
-ai_classifier = AIClassifier()
+execution_engine = ExecutionEngine()
+document_processor = DocumentProcessor(execution_engine=execution_engine)
+ai_classifier = AIClassifier(execution_engine=execution_engine)
 cache_manager = CacheManager()
+document_pipeline = DocumentPipeline(document_processor, ai_classifier, cache_manager)
+text_store = TextStore()
+
+# Nombre maximal de documents par appel à /process-batch
+BATCH_MAX_ITEMS = int(os.environ.get('BATCH_MAX_ITEMS', 200))
+
+# Répertoire des fichiers référencés par chemin dans /process-batch (`paths`) ;
+# vide : références par chemin refusées
+BATCH_INPUT_DIR = os.environ.get('BATCH_INPUT_DIR', '')
 
 # Modèles Pydantic
 class ProcessingResult(BaseModel):
@@ -34,8 +57,12 @@ class ProcessingResult(BaseModel):
     classification: Optional[Dict[str, Any]] = None
     entities: Optional[List[Dict[str, Any]]] = None
     summary: Optional[str] = None
+    layout: Optional[Dict[str, Any]] = None
     processing_time: float
     status: str
+    stages: Optional[Dict[str, Any]] = None
+    profile: Optional[Dict[str, Any]] = None
+    text_ref: Optional[Dict[str, Any]] = None
 
 class ProcessingRequest(BaseModel):
     extract_text: bool = True
@@ -44,119 +71,477 @@ class ProcessingRequest(BaseModel):
     extract_entities: bool = True
     generate_summary: bool = False
     language: str = "fr"
+    include_layout: bool = False
+
+async def store_result_text(result: Dict[str, Any]):
+    """
+    Remplace le texte d'un résultat par une référence vers le stockage des textes
+    """
+    result['text_ref'] = await asyncio.to_thread(text_store.put, result['text_content'])
+    result['text_content'] = ''
+
+async def process_job(job: Job) -> Dict[str, Any]:
+    """
+    Exécute un job de traitement soumis via /jobs
+    """
+    upload = job.payload['upload']
+    try:
+        result = await document_pipeline.run(
+            upload,
+            job.payload['file_id'],
+            progress=job.update_progress,
+            **job.payload['options']
+        )
+        if job.payload.get('store_text'):
+            await store_result_text(result)
+        return ProcessingResult(**result).dict()
+    finally:
+        if os.path.exists(upload.path):
+            os.unlink(upload.path)
+
+job_manager = JobManager(process_job)
+
+# Statistiques internes des composants exposées dans /metrics
+register_service_collector(
+    cache_manager=cache_manager,
+    job_manager=job_manager,
+    execution_engine=execution_engine,
+    libreoffice_pool=document_processor.libreoffice_pool,
+    batchers={
+        'classification': ai_classifier.classification_batcher,
+        'summary': ai_classifier.summary_batcher
+    }
+)
+
+# Tâche de préchauffage des modèles, lancée au démarrage
+model_warmup_task: Optional[asyncio.Task] = None
+
+@app.on_event("startup")
+async def startup_event():
+    """
+    Démarrage de la file de jobs et préchauffage des modèles
+    """
+    global model_warmup_task
+    await job_manager.start()
+    ai_classifier.model_registry.start()
+    # Préchauffage en tâche de fond : /ready renvoie 503 jusqu'à la fin
+    model_warmup_task = asyncio.create_task(ai_classifier.model_registry.warm_up())
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """
+    Arrêt de la file de jobs, des modèles, des pools d'exécution, des instances LibreOffice
+    et des connexions Redis
+    """
+    await job_manager.stop()
+    await ai_classifier.model_registry.stop()
+    await document_processor.libreoffice_pool.shutdown()
+    await cache_manager.close()
+    execution_engine.shutdown(wait=False)
 
 @app.get("/health")
 async def health_check():
     """Vérification de l'état du service"""
     return {"status": "healthy", "service": "document-processor"}
 
+@app.get("/ready")
+async def readiness_check():
+    """
+    Disponibilité du service : modèles requis chargés
+
+    Contrairement à /health (processus vivant), renvoie 503 tant que le
+    préchauffage des modèles requis n'est pas terminé ou a échoué.
+    """
+    ready = ai_classifier.model_registry.is_ready()
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={
+            "status": "ready" if ready else "not_ready",
+            **ai_classifier.model_registry.get_status()
+        }
+    )
+
 @app.post("/process", response_model=ProcessingResult)
 async def process_document(
-    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     extract_text: bool = True,
     perform_ocr: bool = True,
     classify_document: bool = True,
     extract_entities: bool = True,
     generate_summary: bool = False,
-    language: str = "fr"
+    language: str = "fr",
+    include_layout: bool = False,
+    trace: bool = False,
+    profile: bool = False,
+    store_text: bool = False
 ):
     """
     Traite un document uploadé et extrait le contenu selon les options spécifiées
+
+    `trace` ajoute au résultat la durée de chaque étape ; `profile` (si
+    PROFILING_ENABLED) profile le traitement par échantillonnage et implique
+    `trace`. `store_text` enregistre le texte extrait côté serveur et
+    retourne sa référence (`text_ref`) au lieu du texte.
     """
     import time
     start_time = time.time()
     
+    if profile and not PROFILING_ENABLED:
+        raise HTTPException(status_code=403, detail="Profilage désactivé (PROFILING_ENABLED=0)")
+    
     # Génération d'un ID unique pour le fichier
     file_id = f"{int(time.time())}_{sanitize_filename(file.filename)}"
     
     try:
-        # Vérification du cache
-        cache_key = f"doc:{file_id}:{hash(file.filename + str(file.size))}"
-        cached_result = await cache_manager.get(cache_key)
-        if cached_result:
-            logger.info(f"Résultat en cache pour {file_id}")
-            return cached_result
-        
-        # Sauvegarde temporaire du fichier
+        # Sauvegarde temporaire du fichier, par blocs
         temp_path = None
         try:
-            with tempfile.NamedTemporaryFile(delete=False, suffix=f"_{file.filename}") as temp_file:
-                temp_path = temp_file.name
-                content = await file.read()
-                temp_file.write(content)
-            
-            # Détection du type de fichier
-            file_type = get_file_type(temp_path)
-            logger.info(f"Traitement du fichier {file_id} de type {file_type}")
-            
-            # Traitement du document
-            result = await document_processor.process_file(
-                temp_path,
-                file_type=file_type,
-                extract_text=extract_text,
-                perform_ocr=perform_ocr,
-                language=language
-            )
-            
-            # Classification IA si demandée
-            classification = None
-            entities = None
-            summary = None
-            
-            if classify_document and result.get('text_content'):
-                classification = await ai_classifier.classify_document(
-                    result['text_content'],
-                    language=language
+            with stage_trace(trace or profile) as request_trace, sampling_profile(profile) as profiler:
+                with track_stage('upload'):
+                    upload = await spool_upload(file)
+                temp_path = upload.path
+                
+                result = await document_pipeline.run(
+                    upload,
+                    file_id,
+                    extract_text=extract_text,
+                    perform_ocr=perform_ocr,
+                    classify_document=classify_document,
+                    extract_entities=extract_entities,
+                    generate_summary=generate_summary,
+                    language=language,
+                    include_layout=include_layout
                 )
             
-            if extract_entities and result.get('text_content'):
-                entities = await ai_classifier.extract_entities(
-                    result['text_content'],
-                    language=language
-                )
-            
-            if generate_summary and result.get('text_content'):
-                summary = await ai_classifier.generate_summary(
-                    result['text_content'],
-                    language=language
-                )
+            if store_text:
+                await store_result_text(result)
             
             processing_time = time.time() - start_time
-            
-            # Construction du résultat
-            final_result = ProcessingResult(
-                file_id=file_id,
-                file_type=file_type,
-                text_content=result.get('text_content', ''),
-                metadata=result.get('metadata', {}),
-                classification=classification,
-                entities=entities,
-                summary=summary,
-                processing_time=processing_time,
-                status="success"
-            )
-            
-            # Mise en cache du résultat
-            background_tasks.add_task(
-                cache_manager.set,
-                cache_key,
-                final_result.dict(),
-                expire=3600  # 1 heure
-            )
+            result['processing_time'] = processing_time
+            if request_trace:
+                result['stages'] = request_trace.to_dict()
+            if profiler:
+                result['profile'] = await asyncio.to_thread(profiler.save)
             
             logger.info(f"Traitement réussi pour {file_id} en {processing_time:.2f}s")
-            return final_result
+            return ProcessingResult(**result)
             
         finally:
             # Nettoyage du fichier temporaire
             if temp_path and os.path.exists(temp_path):
                 os.unlink(temp_path)
                 
+    except FileTooLargeError as e:
+        logger.warning(f"Fichier refusé {file_id}: {str(e)}")
+        raise HTTPException(status_code=413, detail=str(e))
+    except ProfilerBusyError as e:
+        raise HTTPException(status_code=409, detail=str(e))
     except Exception as e:
         logger.error(f"Erreur lors du traitement de {file_id}: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Erreur de traitement: {str(e)}")
 
+# Formats de diffusion de /process/stream et leur type de contenu
+STREAM_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'sse': 'text/event-stream'
+}
+
+def format_stream_event(event: Dict[str, Any], event_format: str) -> str:
+    data = json.dumps(event, ensure_ascii=False, default=str)
+    if event_format == 'sse':
+        return f"event: {event['type']}\ndata: {data}\n\n"
+    return data + "\n"
+
+@app.post("/process/stream")
+async def process_document_stream(
+    file: UploadFile = File(...),
+    perform_ocr: bool = True,
+    classify_document: bool = True,
+    extract_entities: bool = True,
+    generate_summary: bool = False,
+    language: str = "fr",
+    event_format: str = Query("ndjson", alias="format")
+):
+    """
+    Traite un document en diffusant le texte page par page (NDJSON ou SSE)
+
+    Les unités extraites (pages, diapositives, feuilles...) sont envoyées dès
+    qu'elles sont prêtes, suivies des résultats de classification, entités et
+    résumé. Une erreur en cours de traitement est signalée par un événement
+    'error', le statut HTTP étant déjà envoyé.
+    """
+    import time
+    
+    if event_format not in STREAM_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Format de diffusion non supporté: {event_format}")
+    
+    file_id = f"{int(time.time())}_{sanitize_filename(file.filename)}"
+    
+    try:
+        with track_stage('upload'):
+            upload = await spool_upload(file)
+    except FileTooLargeError as e:
+        logger.warning(f"Fichier refusé {file_id}: {str(e)}")
+        raise HTTPException(status_code=413, detail=str(e))
+    
+    async def events():
+        pipeline_events = document_pipeline.stream(
+            upload,
+            file_id,
+            perform_ocr=perform_ocr,
+            classify_document=classify_document,
+            extract_entities=extract_entities,
+            generate_summary=generate_summary,
+            language=language
+        )
+        try:
+            # Déconnexion du client : fermeture en cascade jusqu'à l'OCR en cours
+            async with aclosing(pipeline_events) as stream_events:
+                async for event in stream_events:
+                    yield format_stream_event(event, event_format)
+            logger.info(f"Diffusion terminée pour {file_id}")
+        except Exception as e:
+            logger.error(f"Erreur lors de la diffusion de {file_id}: {str(e)}")
+            yield format_stream_event({'type': 'error', 'error': f"Erreur de traitement: {str(e)}"}, event_format)
+        finally:
+            # Nettoyage du fichier temporaire
+            if os.path.exists(upload.path):
+                os.unlink(upload.path)
+    
+    return StreamingResponse(
+        events(),
+        media_type=STREAM_FORMATS[event_format],
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+@app.get("/profiles/{profile_id}", response_class=PlainTextResponse)
+async def get_profile(profile_id: str):
+    """
+    Profil d'une requête au format « collapsed stacks » (flamegraph.pl, speedscope)
+    """
+    if not profile_id.isalnum():
+        raise HTTPException(status_code=400, detail="Identifiant de profil invalide")
+    
+    path = profile_path(profile_id)
+    if not os.path.exists(path):
+        raise HTTPException(status_code=404, detail="Profil non trouvé")
+    
+    with open(path) as f:
+        return PlainTextResponse(f.read())
+
+def parse_page_range(pages: str) -> Tuple[int, int]:
+    """
+    Plage de pages de la forme "3" ou "3-5"
+    """
+    first, _, last = pages.partition('-')
+    try:
+        first_page = int(first)
+        last_page = int(last) if last else first_page
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Plage de pages invalide: {pages}")
+    if first_page < 1 or last_page < first_page:
+        raise HTTPException(status_code=400, detail=f"Plage de pages invalide: {pages}")
+    return first_page, last_page
+
+@app.get("/texts/{handle}")
+async def get_text(
+    handle: str,
+    pages: Optional[str] = None,
+    start: int = 0,
+    end: Optional[int] = None
+):
+    """
+    Texte enregistré via store_text, en entier ou par plage
+
+    `pages` ("3" ou "3-5") sélectionne des pages ; sinon `start` et `end`
+    (exclu) sélectionnent une plage d'octets, qui peut couper un caractère
+    UTF-8 multi-octets à ses bornes.
+    """
+    try:
+        if pages:
+            first_page, last_page = parse_page_range(pages)
+            data = await asyncio.to_thread(text_store.read_pages, handle, first_page, last_page)
+        else:
+            data = await asyncio.to_thread(text_store.read, handle, start, end)
+    except TextNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except TextRangeError as e:
+        raise HTTPException(status_code=416, detail=str(e))
+    
+    return Response(content=data, media_type='text/plain; charset=utf-8')
+
+@app.get("/texts/{handle}/pages")
+async def get_text_pages(handle: str):
+    """
+    Index des pages d'un texte enregistré : numéro et plage d'octets
+    """
+    try:
+        index = await asyncio.to_thread(text_store.page_index, handle)
+    except TextNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return {
+        'handle': handle,
+        'pages': [{'page': page_num, 'start': start, 'end': end} for page_num, start, end in index]
+    }
+
+@app.post("/process-batch")
+async def process_batch(
+    files: List[UploadFile] = File(default=[]),
+    paths: List[str] = Form(default=[]),
+    extract_text: bool = True,
+    perform_ocr: bool = True,
+    classify_document: bool = True,
+    extract_entities: bool = True,
+    generate_summary: bool = False,
+    language: str = "fr",
+    include_layout: bool = False
+):
+    """
+    Traite un lot de documents uploadés ou référencés par chemin sous BATCH_INPUT_DIR
+    """
+    import time
+    start_time = time.time()
+    
+    if not files and not paths:
+        raise HTTPException(status_code=400, detail="Aucun document fourni")
+    if len(files) + len(paths) > BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=400, detail=f"Lot trop volumineux: {BATCH_MAX_ITEMS} documents maximum")
+    
+    items = []
+    item_indexes = []
+    errors = []
+    temp_paths = []
+    
+    try:
+        # Copie des uploads sur disque
+        for index, file in enumerate(files):
+            file_id = f"{int(time.time())}_{sanitize_filename(file.filename)}"
+            try:
+                with track_stage('upload'):
+                    upload = await spool_upload(file)
+                temp_paths.append(upload.path)
+                items.append((upload, file_id))
+                item_indexes.append(index)
+            except Exception as e:
+                errors.append({'index': index, 'file_id': file_id, 'status': 'error', 'error': str(e)})
+        
+        # Fichiers référencés sous BATCH_INPUT_DIR : lus sur place, jamais supprimés
+        for index, path in enumerate(paths, start=len(files)):
+            file_id = f"{int(time.time())}_{sanitize_filename(os.path.basename(path))}"
+            if not validate_file_path(path, BATCH_INPUT_DIR):
+                errors.append({'index': index, 'file_id': file_id, 'status': 'error', 'error': f"Chemin invalide: {path}"})
+                continue
+            real_path = os.path.realpath(os.path.join(BATCH_INPUT_DIR, path))
+            try:
+                # Le fichier peut avoir été remplacé ou supprimé depuis la validation
+                if not os.path.isfile(real_path):
+                    raise ValueError(f"Pas un fichier régulier: {path}")
+                digest = await asyncio.to_thread(compute_file_digest, real_path)
+                size = os.path.getsize(real_path)
+                items.append((SpooledUpload(path=real_path, size=size, digest=digest, mime_type=None), file_id))
+                item_indexes.append(index)
+            except Exception as e:
+                errors.append({'index': index, 'file_id': file_id, 'status': 'error', 'error': str(e)})
+        
+        results = await document_pipeline.run_batch(
+            items,
+            extract_text=extract_text,
+            perform_ocr=perform_ocr,
+            classify_document=classify_document,
+            extract_entities=extract_entities,
+            generate_summary=generate_summary,
+            language=language,
+            include_layout=include_layout
+        )
+        
+        for index, item in zip(item_indexes, results):
+            item['index'] = index
+            if item['status'] == 'success':
+                item['result'] = ProcessingResult(**item['result'])
+        
+        processing_time = time.time() - start_time
+        logger.info(f"Lot de {len(items) + len(errors)} documents traité en {processing_time:.2f}s")
+        
+        return {
+            "items": sorted(results + errors, key=lambda item: item['index']),
+            "processing_time": processing_time,
+            "status": "success"
+        }
+        
+    finally:
+        # Nettoyage des fichiers temporaires
+        for temp_path in temp_paths:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+
+@app.post("/jobs", status_code=202)
+async def submit_job(
+    file: UploadFile = File(...),
+    extract_text: bool = True,
+    perform_ocr: bool = True,
+    classify_document: bool = True,
+    extract_entities: bool = True,
+    generate_summary: bool = False,
+    language: str = "fr",
+    include_layout: bool = False,
+    priority: str = "normal",
+    callback_url: Optional[str] = None,
+    store_text: bool = False
+):
+    """
+    Soumet un document à traiter en arrière-plan et retourne l'identifiant du job
+    """
+    import time
+    
+    if priority not in JOB_PRIORITIES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Priorité inconnue: {priority} (valeurs: {', '.join(JOB_PRIORITIES)})"
+        )
+    
+    file_id = f"{int(time.time())}_{sanitize_filename(file.filename)}"
+    
+    try:
+        with track_stage('upload'):
+            upload = await spool_upload(file)
+    except FileTooLargeError as e:
+        logger.warning(f"Fichier refusé {file_id}: {str(e)}")
+        raise HTTPException(status_code=413, detail=str(e))
+    
+    options = ProcessingRequest(
+        extract_text=extract_text,
+        perform_ocr=perform_ocr,
+        classify_document=classify_document,
+        extract_entities=extract_entities,
+        generate_summary=generate_summary,
+        language=language,
+        include_layout=include_layout
+    )
+    
+    try:
+        job = job_manager.submit(
+            {'upload': upload, 'file_id': file_id, 'options': options.dict(), 'store_text': store_text},
+            priority=priority,
+            callback_url=callback_url
+        )
+    except QueueFullError as e:
+        os.unlink(upload.path)
+        raise HTTPException(status_code=503, detail=str(e))
+    
+    logger.info(f"Job {job.id} soumis pour {file_id} (priorité {priority})")
+    return {"job_id": job.id, "status": job.status, "priority": job.priority}
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """
+    Retourne l'état, l'avancement et le résultat d'un job
+    """
+    job = job_manager.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Job inconnu: {job_id}")
+    
+    return job.to_dict()
+
 @app.post("/classify-text")
 async def classify_text(
     text: str,
@@ -166,12 +551,11 @@ async def classify_text(
     Classifie un texte sans traitement de fichier
     """
     try:
-        classification = await ai_classifier.classify_document(text, language=language)
-        entities = await ai_classifier.extract_entities(text, language=language)
+        result = await document_pipeline.classify_text(text, language=language)
         
         return {
-            "classification": classification,
-            "entities": entities,
+            "classification": result['classification'],
+            "entities": result['entities'],
             "status": "success"
         }
         
@@ -198,16 +582,61 @@ async def get_supported_formats():
         ]
     }
 
+@app.post("/cache/invalidate")
+async def invalidate_cache(namespace: str):
+    """
+    Invalide un espace de noms du cache ('extraction' ou 'ml') en O(1)
+
+    Le compteur de génération est incrémenté : les clés existantes ne sont
+    plus lues et expirent d'elles-mêmes. L'invalidation de 'extraction'
+    s'applique aussi aux étapes ML des fichiers.
+    """
+    if namespace not in CACHE_NAMESPACES:
+        raise HTTPException(status_code=400, detail=f"Espace de noms inconnu: {namespace}")
+
+    generation = await cache_manager.bump_generation(namespace)
+    if generation is None:
+        raise HTTPException(status_code=503, detail="Cache indisponible")
+
+    return {"namespace": namespace, "generation": generation, "status": "invalidated"}
+
+@app.post("/cache/purge", status_code=202)
+async def purge_cache(background_tasks: BackgroundTasks, pattern: str = "doc:*"):
+    """
+    Supprime physiquement les clés du service correspondant au pattern
+
+    La suppression (SCAN + UNLINK à débit limité) s'exécute en arrière-plan.
+    Seules les clés du service ('doc:') peuvent être ciblées : Redis est
+    partagé avec l'application Rails.
+    """
+    if not pattern.startswith("doc:"):
+        raise HTTPException(status_code=400, detail="Le pattern doit commencer par 'doc:'")
+
+    background_tasks.add_task(cache_manager.clear_cache, pattern)
+    return {"pattern": pattern, "status": "started"}
+
 @app.get("/metrics")
 async def get_metrics():
     """
-    Métriques du service pour monitoring
+    Métriques Prometheus du service (latences par étape, cache, files)
+    """
+    return Response(content=generate_latest(), headers={'Content-Type': CONTENT_TYPE_LATEST})
+
+@app.get("/stats")
+async def get_service_stats():
+    """
+    État détaillé des composants du service, au format JSON
     """
-    # Ici vous pourriez ajouter des métriques Prometheus
     return {
-        "documents_processed": cache_manager.get_stats(),
-        "service_uptime": "OK",
-        "memory_usage": "OK"
+        "cache": await cache_manager.get_stats(),
+        "execution": execution_engine.get_stats(),
+        "libreoffice": document_processor.libreoffice_pool.get_stats(),
+        "jobs": job_manager.get_stats(),
+        "text_store": await asyncio.to_thread(text_store.get_stats),
+        "batching": {
+            "classification": ai_classifier.classification_batcher.get_stats(),
+            "summary": ai_classifier.summary_batcher.get_stats()
+        }
     }
 
 if __name__ == "__main__":
@@ -1,62 +1,58 @@
 import asyncio
-from typing import Dict, List, Any, Optional
+import importlib.util
+from typing import Dict, List, Any, Optional, Tuple
 from loguru import logger
-import re
-import json
-from collections import Counter
-
-# IA/ML imports
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.naive_bayes import MultinomialNB
-from sklearn.pipeline import Pipeline
-import pickle
 import os
 
-# NLP imports
-import nltk
-from nltk.tokenize import word_tokenize, sent_tokenize
-from nltk.corpus import stopwords
-from nltk.stem import SnowballStemmer
+# scikit-learn, NLTK et Transformers sont importés au chargement des modèles
+# (ModelRegistry) : le démarrage du service n'en dépend pas
+from processors import classifier_tasks
+from processors.entity_engine import default_entity_engine
+from processors.model_registry import ModelRegistry
+from utils.batching import MicroBatcher
+from utils.execution import ExecutionEngine
+from utils.metrics import track_stage
 
-# Transformers pour modèles plus avancés
-try:
-    from transformers import pipeline, AutoTokenizer, AutoModelForSequenceClassification
-    from sentence_transformers import SentenceTransformer
-    TRANSFORMERS_AVAILABLE = True
-except ImportError:
-    TRANSFORMERS_AVAILABLE = False
+# Transformers pour modèles plus avancés (détection sans import)
+TRANSFORMERS_AVAILABLE = all(
+    importlib.util.find_spec(module) is not None
+    for module in ('transformers', 'sentence_transformers')
+)
+if not TRANSFORMERS_AVAILABLE:
     logger.warning("Transformers non disponibles, utilisation des modèles basiques uniquement")
 
+# Version des modèles, à incrémenter quand la classification ou les entités changent
+MODEL_VERSION = os.environ.get('MODEL_VERSION', '1')
+
 class AIClassifier:
     """
     Service de classification et d'extraction IA pour documents
     """
     
-    def __init__(self):
+    def __init__(self, execution_engine: Optional[ExecutionEngine] = None):
         self.models_dir = os.environ.get('MODELS_DIR', '/app/models')
+        self.version = MODEL_VERSION
         os.makedirs(self.models_dir, exist_ok=True)
+        self.classifier_path = os.path.join(self.models_dir, 'document_classifier.pkl')
         
-        # Initialisation des ressources NLP
-        self._setup_nltk()
+        # Les traitements CPU s'exécutent dans le pool 'ml'
+        self.execution_engine = execution_engine or ExecutionEngine()
         
-        # Chargement des modèles
-        self.document_classifier = None
-        self.entity_extractor = None
-        self.summarizer = None
-        self.sentence_transformer = None
+        # Regroupement des requêtes concurrentes en lots vectorisés
+        self.classification_batcher = MicroBatcher(self._classify_batch, name='classification')
+        self.summary_batcher = MicroBatcher(self._summarize_batch, name='summary')
         
-        # Initialisation asynchrone des modèles
-        asyncio.create_task(self._load_models())
+        # Modèles et ressources NLP chargés à la demande ou au préchauffage
+        self.model_registry = ModelRegistry()
+        self.model_registry.register('nltk_resources', self._load_nltk_resources, required=True)
+        self.model_registry.register('document_classifier', self._load_simple_classifier, required=True)
+        if TRANSFORMERS_AVAILABLE:
+            self.model_registry.register('summarizer', self._load_summarizer, size_mb=1600)
+            self.model_registry.register('sentence_transformer', self._load_sentence_transformer, size_mb=90)
         
-        # Patterns pour extraction d'entités
-        self.entity_patterns = {
-            'email': r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b',
-            'phone': r'\b(?:\+33|0)[1-9](?:[0-9]{8})\b',
-            'date': r'\b\d{1,2}[/-]\d{1,2}[/-]\d{2,4}\b',
-            'amount': r'\b\d+[,.]?\d*\s*€?\s*euros?\b',
-            'siret': r'\b\d{14}\b',
-            'siren': r'\b\d{9}\b'
-        }
+        # Patterns d'extraction d'entités, combinés en un seul passage sur le texte ;
+        # d'autres types s'ajoutent par self.entity_engine.register(...)
+        self.entity_engine = default_entity_engine()
         
         # Catégories de documents
         self.document_categories = {
@@ -98,6 +94,8 @@ class AIClassifier:
         """
         Configuration des ressources NLTK
         """
+        import nltk
+
         try:
             # Vérification et téléchargement des ressources NLTK
             nltk.data.find('tokenizers/punkt')
@@ -108,121 +106,113 @@ class AIClassifier:
             nltk.download('stopwords', quiet=True)
             nltk.download('wordnet', quiet=True)
     
-    async def _load_models(self):
+    async def _load_nltk_resources(self):
         """
-        Chargement asynchrone des modèles IA
+        Vérification (et téléchargement si besoin) des ressources NLTK
         """
-        try:
-            # Chargement du modèle de classification simple
-            await self._load_simple_classifier()
-            
-            # Chargement des modèles transformers si disponibles
-            if TRANSFORMERS_AVAILABLE:
-                await self._load_transformer_models()
-            
-            logger.info("Modèles IA chargés avec succès")
-            
-        except Exception as e:
-            logger.error(f"Erreur lors du chargement des modèles: {e}")
+        await asyncio.to_thread(self._setup_nltk)
+        return True
     
     async def _load_simple_classifier(self):
         """
-        Chargement ou création d'un classificateur simple
+        Vérification (ou création) du classificateur sur disque
+
+        Le modèle est chargé et utilisé par les seuls workers 'ml'
+        (classifier_tasks.ml_classify_batch) : le registre n'en conserve que la
+        référence (chemin, date de modification), sans copie en mémoire.
         """
-        classifier_path = os.path.join(self.models_dir, 'document_classifier.pkl')
-        
-        if os.path.exists(classifier_path):
-            with open(classifier_path, 'rb') as f:
-                self.document_classifier = pickle.load(f)
-            logger.info("Classificateur chargé depuis le cache")
-        else:
+        if not os.path.exists(self.classifier_path):
             # Création d'un classificateur basique avec données d'entraînement minimales
-            self.document_classifier = Pipeline([
-                ('tfidf', TfidfVectorizer(max_features=1000, stop_words='english')),
-                ('classifier', MultinomialNB())
-            ])
-            
-            # Entraînement avec données synthétiques
-            await self._train_simple_classifier()
-            
-            # Sauvegarde
-            with open(classifier_path, 'wb') as f:
-                pickle.dump(self.document_classifier, f)
-            
+            await self.execution_engine.run(
+                'ml',
+                classifier_tasks.create_classifier,
+                self.classifier_path,
+                self.document_categories
+            )
             logger.info("Nouveau classificateur créé et sauvegardé")
+        
+        return {
+            'path': self.classifier_path,
+            'mtime': os.path.getmtime(self.classifier_path)
+        }
     
-    async def _train_simple_classifier(self):
+    async def _load_summarizer(self):
         """
-        Entraînement basique du classificateur
+        Chargement du modèle de résumé Transformers
         """
-        # Données d'entraînement synthétiques
-        training_data = []
-        labels = []
+        from transformers import pipeline
         
-        for category, info in self.document_categories.items():
-            # Génération de textes synthétiques pour chaque catégorie
-            for _ in range(10):
-                text = ' '.join(info['keywords'] * 2)  # Simulation de texte
-                training_data.append(text)
-                labels.append(category)
+        # Chargement bloquant (téléchargement, poids) hors de la boucle asyncio
+        return await asyncio.to_thread(
+            pipeline,
+            "summarization",
+            model="facebook/bart-large-cnn",
+            device=-1  # CPU
+        )
+    
+    async def _load_sentence_transformer(self):
+        """
+        Chargement du modèle d'embeddings pour similarité
+        """
+        from sentence_transformers import SentenceTransformer
         
-        # Entraînement
-        self.document_classifier.fit(training_data, labels)
+        return await asyncio.to_thread(SentenceTransformer, 'all-MiniLM-L6-v2')
     
-    async def _load_transformer_models(self):
+    async def _classify_batch(self, texts: List[str]) -> List[Optional[Dict[str, Any]]]:
         """
-        Chargement des modèles Transformers
+        Classification ML d'un lot de textes en un seul predict_proba
         """
+        # Le modèle doit exister sur disque avant d'être lu par les workers
+        classifier_ref = await self.model_registry.get('document_classifier')
+        if classifier_ref is None:
+            return [None] * len(texts)
+        
+        # Le classificateur ML est chargé depuis le disque par les workers
+        return await self.execution_engine.run(
+            'ml',
+            classifier_tasks.ml_classify_batch,
+            classifier_ref['path'],
+            texts
+        )
+    
+    async def _ml_classification(self, text: str) -> Optional[Dict[str, Any]]:
         try:
-            # Modèle de résumé en français
-            self.summarizer = pipeline(
-                "summarization",
-                model="facebook/bart-large-cnn",
-                device=-1  # CPU
-            )
-            
-            # Modèle d'embeddings pour similarité
-            self.sentence_transformer = SentenceTransformer('all-MiniLM-L6-v2')
-            
-            logger.info("Modèles Transformers chargés")
-            
+            with track_stage('ml_classification'):
+                return await self.classification_batcher.submit(text)
         except Exception as e:
-            logger.warning(f"Impossible de charger les modèles Transformers: {e}")
+            logger.warning(f"Erreur classification ML: {e}")
+            return None
+    
+    async def _analyze_content(self, text: str) -> Dict[str, Any]:
+        """
+        Classification par mots-clés et analyse de contenu (tokenisation NLTK)
+        """
+        with track_stage('content_analysis'):
+            return await self.execution_engine.run(
+                'ml',
+                classifier_tasks.analyze_text,
+                text,
+                self.document_categories
+            )
     
     async def classify_document(self, text: str, language: str = "fr") -> Dict[str, Any]:
         """
         Classification d'un document
         """
         try:
-            # Nettoyage du texte
-            cleaned_text = self._clean_text(text)
-            
-            # Classification par mots-clés (rapide)
-            keyword_classification = self._classify_by_keywords(cleaned_text)
-            
-            # Classification ML si modèle disponible
-            ml_classification = None
-            if self.document_classifier:
-                try:
-                    prediction = self.document_classifier.predict([cleaned_text])[0]
-                    probabilities = self.document_classifier.predict_proba([cleaned_text])[0]
-                    confidence = max(probabilities)
-                    
-                    ml_classification = {
-                        'category': prediction,
-                        'confidence': float(confidence),
-                        'all_probabilities': dict(zip(self.document_classifier.classes_, probabilities))
-                    }
-                except Exception as e:
-                    logger.warning(f"Erreur classification ML: {e}")
+            # Tokeniseurs NLTK nécessaires à l'analyse de contenu
+            await self.model_registry.get('nltk_resources')
             
-            # Analyse de contenu
-            content_analysis = self._analyze_content(cleaned_text)
+            # Mots-clés et analyse dans le pool, ML par micro-lots
+            analysis, ml_classification = await asyncio.gather(
+                self._analyze_content(text),
+                self._ml_classification(text)
+            )
             
             return {
-                'keyword_classification': keyword_classification,
+                'keyword_classification': analysis['keyword_classification'],
                 'ml_classification': ml_classification,
-                'content_analysis': content_analysis,
+                'content_analysis': analysis['content_analysis'],
                 'language_detected': language
             }
             
@@ -230,202 +220,94 @@ class AIClassifier:
             logger.error(f"Erreur classification: {e}")
             raise
     
+    async def classify_documents(self, texts: List[str], language: str = "fr") -> List[Dict[str, Any]]:
+        """
+        Classification d'un lot de documents
+
+        Les appels concurrents sont regroupés par le micro-batcher : le modèle
+        ML traite le lot en un minimum de passages.
+        """
+        return list(await asyncio.gather(*[
+            self.classify_document(text, language=language)
+            for text in texts
+        ]))
+    
     async def extract_entities(self, text: str, language: str = "fr") -> List[Dict[str, Any]]:
         """
         Extraction d'entités du texte
         """
-        entities = []
-        
         try:
-            # Extraction par expressions régulières
-            for entity_type, pattern in self.entity_patterns.items():
-                matches = re.finditer(pattern, text, re.IGNORECASE)
-                for match in matches:
-                    entities.append({
-                        'type': entity_type,
-                        'value': match.group(),
-                        'start': match.start(),
-                        'end': match.end(),
-                        'confidence': 0.8  # Confiance fixe pour regex
-                    })
-            
-            # Extraction d'entités nommées avec NLTK
-            named_entities = self._extract_named_entities(text)
-            entities.extend(named_entities)
-            
-            # Dédoublonnage
-            entities = self._deduplicate_entities(entities)
-            
-            return entities
+            return await self.execution_engine.run(
+                'ml',
+                classifier_tasks.extract_entities,
+                text,
+                self.entity_engine
+            )
             
         except Exception as e:
             logger.error(f"Erreur extraction entités: {e}")
             return []
     
+    async def _summarize_batch(self, items: List[Tuple[str, int]]) -> List[str]:
+        """
+        Résumé Transformers d'un lot de textes, groupés par longueur maximale
+        """
+        summarizer = await self.model_registry.get('summarizer')
+        if summarizer is None:
+            raise RuntimeError("Modèle de résumé indisponible")
+        
+        summaries: Dict[int, str] = {}
+        by_length: Dict[int, List[int]] = {}
+        for index, (_, max_length) in enumerate(items):
+            by_length.setdefault(max_length, []).append(index)
+        
+        for max_length, indexes in by_length.items():
+            # Le modèle réside dans ce processus : inférence dans un thread
+            outputs = await asyncio.to_thread(
+                summarizer,
+                [items[index][0] for index in indexes],
+                max_length=max_length,
+                min_length=30,
+                do_sample=False
+            )
+            for index, output in zip(indexes, outputs):
+                summaries[index] = output['summary_text']
+        
+        return [summaries[index] for index in range(len(items))]
+    
     async def generate_summary(self, text: str, language: str = "fr", max_length: int = 150) -> Optional[str]:
         """
         Génération de résumé
         """
         try:
             # Nettoyage du texte
-            cleaned_text = self._clean_text(text)
+            cleaned_text = await self.execution_engine.run('ml', classifier_tasks.clean_text, text)
             
             # Si le texte est trop court, pas de résumé
             if len(cleaned_text.split()) < 50:
                 return None
             
             # Résumé avec Transformers si disponible
-            if self.summarizer and TRANSFORMERS_AVAILABLE:
+            if TRANSFORMERS_AVAILABLE and self.model_registry.entries['summarizer'].state != 'failed':
                 try:
                     # Limitation de la taille d'entrée
                     input_text = cleaned_text[:1024]  # Limitation Transformers
                     
-                    summary = self.summarizer(
-                        input_text,
-                        max_length=max_length,
-                        min_length=30,
-                        do_sample=False
-                    )
-                    
-                    return summary[0]['summary_text']
+                    with track_stage('summary_model'):
+                        return await self.summary_batcher.submit((input_text, max_length))
                     
                 except Exception as e:
                     logger.warning(f"Erreur résumé Transformers: {e}")
             
             # Résumé extractif simple en fallback
-            return self._extractive_summary(cleaned_text, max_length)
+            await self.model_registry.get('nltk_resources')
+            return await self.execution_engine.run(
+                'ml',
+                classifier_tasks.extractive_summary,
+                cleaned_text,
+                max_length
+            )
             
         except Exception as e:
             logger.error(f"Erreur génération résumé: {e}")
             return None
-    
-    def _clean_text(self, text: str) -> str:
-        """
-        Nettoyage du texte
-        """
-        # Suppression des caractères spéciaux excessifs
-        text = re.sub(r'\s+', ' ', text)  # Espaces multiples
-        text = re.sub(r'[^\w\sà-ÿ.,!?;:()\[\]-]', '', text)  # Caractères spéciaux
-        return text.strip()
-    
-    def _classify_by_keywords(self, text: str) -> Dict[str, Any]:
-        """
-        Classification basique par mots-clés
-        """
-        text_lower = text.lower()
-        scores = {}
-        
-        for category, info in self.document_categories.items():
-            score = 0
-            found_keywords = []
-            
-            for keyword in info['keywords']:
-                count = text_lower.count(keyword.lower())
-                if count > 0:
-                    score += count
-                    found_keywords.append(keyword)
-            
-            if score > 0:
-                scores[category] = {
-                    'score': score,
-                    'keywords_found': found_keywords,
-                    'description': info['description']
-                }
-        
-        # Tri par score
-        sorted_scores = sorted(scores.items(), key=lambda x: x[1]['score'], reverse=True)
-        
-        return {
-            'top_category': sorted_scores[0][0] if sorted_scores else 'unknown',
-            'all_scores': dict(sorted_scores),
-            'confidence': sorted_scores[0][1]['score'] / len(text.split()) if sorted_scores else 0
-        }
-    
-    def _analyze_content(self, text: str) -> Dict[str, Any]:
-        """
-        Analyse générale du contenu
-        """
-        words = word_tokenize(text.lower())
-        sentences = sent_tokenize(text)
-        
-        # Statistiques basiques
-        stats = {
-            'word_count': len(words),
-            'sentence_count': len(sentences),
-            'avg_sentence_length': len(words) / len(sentences) if sentences else 0,
-            'unique_words': len(set(words))
-        }
-        
-        # Mots les plus fréquents
-        try:
-            stop_words = set(stopwords.words('french'))
-            filtered_words = [word for word in words if word.isalpha() and word not in stop_words]
-            most_common = Counter(filtered_words).most_common(10)
-            stats['most_common_words'] = most_common
-        except:
-            stats['most_common_words'] = []
-        
-        return stats
-    
-    def _extract_named_entities(self, text: str) -> List[Dict[str, Any]]:
-        """
-        Extraction d'entités nommées basique
-        """
-        entities = []
-        
-        # Patterns pour entités françaises
-        patterns = {
-            'organization': r'\b[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*\s+(?:SA|SARL|SAS|EURL|SNC)\b',
-            'person': r'\b(?:M\.|Mme|Monsieur|Madame)\s+[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*\b',
-            'location': r'\b\d+[,\s]+[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*[,\s]+\d{5}\s+[A-Z][a-z]+\b'
-        }
-        
-        for entity_type, pattern in patterns.items():
-            matches = re.finditer(pattern, text)
-            for match in matches:
-                entities.append({
-                    'type': entity_type,
-                    'value': match.group().strip(),
-                    'start': match.start(),
-                    'end': match.end(),
-                    'confidence': 0.6
-                })
-        
-        return entities
-    
-    def _deduplicate_entities(self, entities: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """
-        Suppression des doublons d'entités
-        """
-        seen = set()
-        unique_entities = []
-        
-        for entity in entities:
-            key = (entity['type'], entity['value'].lower())
-            if key not in seen:
-                seen.add(key)
-                unique_entities.append(entity)
-        
-        return unique_entities
-    
-    def _extractive_summary(self, text: str, max_length: int) -> str:
-        """
-        Résumé extractif simple
-        """
-        sentences = sent_tokenize(text)
-        
-        if len(sentences) <= 3:
-            return text
-        
-        # Sélection des premières phrases jusqu'à la limite
-        summary_sentences = []
-        current_length = 0
-        
-        for sentence in sentences:
-            if current_length + len(sentence.split()) <= max_length:
-                summary_sentences.append(sentence)
-                current_length += len(sentence.split())
-            else:
-                break
-        
-        return ' '.join(summary_sentences)
\ No newline at end of file
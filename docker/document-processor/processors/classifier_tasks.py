@@ -0,0 +1,213 @@
+"""
+Traitements CPU de l'AIClassifier exécutés dans le pool 'ml'
+
+Ces fonctions sont appelées via l'ExecutionEngine : elles doivent rester
+définies au niveau du module et ne recevoir que des arguments sérialisables.
+NLTK est importé à la première utilisation (pré-importé par les workers 'ml').
+"""
+import os
+import re
+import pickle
+from collections import Counter
+from typing import Dict, List, Any, Tuple
+
+from processors.entity_engine import EntityEngine
+
+# Classificateurs chargés dans ce worker, indexés par (chemin, date de modification)
+_classifier_cache: Dict[Tuple[str, float], Any] = {}
+
+def _load_classifier(classifier_path: str):
+    """
+    Charge le classificateur sérialisé une seule fois par worker
+    """
+    key = (classifier_path, os.path.getmtime(classifier_path))
+    classifier = _classifier_cache.get(key)
+    if classifier is None:
+        with open(classifier_path, 'rb') as f:
+            classifier = pickle.load(f)
+        _classifier_cache.clear()
+        _classifier_cache[key] = classifier
+    return classifier
+
+def create_classifier(classifier_path: str, document_categories: Dict[str, Dict[str, Any]]) -> str:
+    """
+    Entraîne un classificateur basique sur des textes synthétiques (mots-clés
+    de chaque catégorie) et l'enregistre sur disque
+    """
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.naive_bayes import MultinomialNB
+    from sklearn.pipeline import Pipeline
+
+    classifier = Pipeline([
+        ('tfidf', TfidfVectorizer(max_features=1000, stop_words='english')),
+        ('classifier', MultinomialNB())
+    ])
+
+    # Données d'entraînement synthétiques
+    training_data = []
+    labels = []
+    for category, info in document_categories.items():
+        for _ in range(10):
+            training_data.append(' '.join(info['keywords'] * 2))
+            labels.append(category)
+    classifier.fit(training_data, labels)
+
+    # Écriture atomique : un worker ne lit jamais un fichier incomplet
+    temp_path = f"{classifier_path}.tmp"
+    with open(temp_path, 'wb') as f:
+        pickle.dump(classifier, f)
+    os.replace(temp_path, classifier_path)
+    return classifier_path
+
+def clean_text(text: str) -> str:
+    """
+    Nettoyage du texte
+    """
+    # Suppression des caractères spéciaux excessifs
+    text = re.sub(r'\s+', ' ', text)  # Espaces multiples
+    text = re.sub(r'[^\w\sà-ÿ.,!?;:()\[\]-]', '', text)  # Caractères spéciaux
+    return text.strip()
+
+def classify_by_keywords(text: str, document_categories: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Classification basique par mots-clés
+    """
+    text_lower = text.lower()
+    scores = {}
+
+    for category, info in document_categories.items():
+        score = 0
+        found_keywords = []
+
+        for keyword in info['keywords']:
+            count = text_lower.count(keyword.lower())
+            if count > 0:
+                score += count
+                found_keywords.append(keyword)
+
+        if score > 0:
+            scores[category] = {
+                'score': score,
+                'keywords_found': found_keywords,
+                'description': info['description']
+            }
+
+    # Tri par score
+    sorted_scores = sorted(scores.items(), key=lambda x: x[1]['score'], reverse=True)
+
+    return {
+        'top_category': sorted_scores[0][0] if sorted_scores else 'unknown',
+        'all_scores': dict(sorted_scores),
+        'confidence': sorted_scores[0][1]['score'] / len(text.split()) if sorted_scores else 0
+    }
+
+def analyze_content(text: str) -> Dict[str, Any]:
+    """
+    Analyse générale du contenu
+    """
+    from nltk.tokenize import word_tokenize, sent_tokenize
+    from nltk.corpus import stopwords
+
+    words = word_tokenize(text.lower())
+    sentences = sent_tokenize(text)
+
+    # Statistiques basiques
+    stats = {
+        'word_count': len(words),
+        'sentence_count': len(sentences),
+        'avg_sentence_length': len(words) / len(sentences) if sentences else 0,
+        'unique_words': len(set(words))
+    }
+
+    # Mots les plus fréquents
+    try:
+        stop_words = set(stopwords.words('french'))
+        filtered_words = [word for word in words if word.isalpha() and word not in stop_words]
+        most_common = Counter(filtered_words).most_common(10)
+        stats['most_common_words'] = most_common
+    except:
+        stats['most_common_words'] = []
+
+    return stats
+
+def ml_classify_batch(classifier_path: str, texts: List[str]) -> List[Dict[str, Any]]:
+    """
+    Classification ML vectorisée d'un lot de textes
+
+    Une seule transformation TF-IDF et un seul predict_proba pour tout le
+    lot ; la catégorie prédite est celle de probabilité maximale, issue de la
+    même matrice de probabilités.
+    """
+    classifier = _load_classifier(classifier_path)
+    probabilities = classifier.predict_proba([clean_text(text) for text in texts])
+    classes = [str(label) for label in classifier.classes_]
+
+    results = []
+    for row in probabilities:
+        best = int(row.argmax())
+        results.append({
+            'category': classes[best],
+            'confidence': float(row[best]),
+            'all_probabilities': {label: float(probability) for label, probability in zip(classes, row)}
+        })
+    return results
+
+def analyze_text(text: str, document_categories: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Classification par mots-clés et analyse de contenu d'un texte
+    """
+    # Nettoyage du texte
+    cleaned_text = clean_text(text)
+
+    return {
+        # Classification par mots-clés (rapide)
+        'keyword_classification': classify_by_keywords(cleaned_text, document_categories),
+        # Analyse de contenu
+        'content_analysis': analyze_content(cleaned_text)
+    }
+
+def deduplicate_entities(entities: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Suppression des doublons d'entités
+    """
+    seen = set()
+    unique_entities = []
+
+    for entity in entities:
+        key = (entity['type'], entity['value'].lower())
+        if key not in seen:
+            seen.add(key)
+            unique_entities.append(entity)
+
+    return unique_entities
+
+def extract_entities(text: str, entity_engine: EntityEngine) -> List[Dict[str, Any]]:
+    """
+    Extraction d'entités du texte (identifiants, montants, entités nommées)
+    en un seul passage, puis dédoublonnage
+    """
+    return deduplicate_entities(entity_engine.extract(text))
+
+def extractive_summary(text: str, max_length: int) -> str:
+    """
+    Résumé extractif simple
+    """
+    from nltk.tokenize import sent_tokenize
+
+    sentences = sent_tokenize(text)
+
+    if len(sentences) <= 3:
+        return text
+
+    # Sélection des premières phrases jusqu'à la limite
+    summary_sentences = []
+    current_length = 0
+
+    for sentence in sentences:
+        if current_length + len(sentence.split()) <= max_length:
+            summary_sentences.append(sentence)
+            current_length += len(sentence.split())
+        else:
+            break
+
+    return ' '.join(summary_sentences)
@@ -1,27 +1,126 @@
 import os
+import re
+import time
+import shutil
 import tempfile
-import subprocess
 import asyncio
-from typing import Dict, Any, Optional
+from contextlib import aclosing
+from typing import Dict, Any, AsyncIterator, List, Optional, Tuple
 from loguru import logger
-import PyPDF2
-import pdfplumber
-from docx import Document
-from pptx import Presentation
-from openpyxl import load_workbook
-import pytesseract
-from PIL import Image
-import cv2
-import numpy as np
 from pathlib import Path
 
+from processors import extractors
+from processors.libreoffice_pool import LibreOfficePool
+from utils.execution import ExecutionEngine
+from utils.metrics import track_stage, observe_stage
+
+# Version de l'extracteur, à incrémenter quand le texte produit change
+EXTRACTOR_VERSION = os.environ.get('EXTRACTOR_VERSION', '6')
+
+# Nombre de pages OCRisées en parallèle (défaut : taille du pool 'ocr')
+OCR_CONCURRENCY = int(os.environ.get('OCR_CONCURRENCY', 0))
+
+# Nombre de pages rendues par appel à pdftoppm
+OCR_RENDER_BATCH = int(os.environ.get('OCR_RENDER_BATCH', 2))
+
+# Nombre minimal de caractères d'une page PDF pour que sa couche texte soit
+# considérée exploitable (en deçà, la page est candidate à l'OCR)
+PDF_MIN_PAGE_CHARS = int(os.environ.get('PDF_MIN_PAGE_CHARS', 100))
+
+# Part minimale de la surface d'une page candidate couverte par des images
+# pour qu'elle soit OCRisée (page numérisée, et non page blanche)
+PDF_OCR_MIN_IMAGE_COVERAGE = float(os.environ.get('PDF_OCR_MIN_IMAGE_COVERAGE', 0.5))
+
+# Formats diffusés unité par unité : (pool d'exécution, générateur d'unités)
+STREAMING_EXTRACTORS = {
+    'pdf': ('pdf', extractors.iter_pdf_pages),
+    'docx': ('office', extractors.iter_docx_sections),
+    'pptx': ('office', extractors.iter_pptx_slides),
+    'xlsx': ('office', extractors.iter_xlsx_sheets),
+    'csv': ('office', extractors.iter_csv_rows),
+    'txt': ('office', extractors.iter_text_chunks),
+}
+
+def ocr_page_content(page_num: int, text: str) -> str:
+    """
+    Contribution d'une page OCRisée au texte complet
+    """
+    return f"\n--- OCR Page {page_num} ---\n{text}" if text.strip() else ""
+
+def merge_pdf_pages(page_texts: Dict[int, str], ocr_texts: Dict[int, str]) -> str:
+    """
+    Texte complet d'un PDF dans l'ordre des pages, le texte OCR (s'il n'est
+    pas vide) remplaçant la couche texte de la page
+    """
+    parts = []
+    for page_num in sorted(set(page_texts) | set(ocr_texts)):
+        ocr_text = ocr_texts.get(page_num, '')
+        if ocr_text.strip():
+            parts.append(ocr_page_content(page_num, ocr_text))
+        else:
+            parts.append(extractors.page_content(page_num, page_texts.get(page_num, '')))
+    return "".join(parts)
+
+def page_runs(pages: List[int], batch_size: int) -> List[Tuple[int, int]]:
+    """
+    Regroupe des numéros de page croissants en plages contiguës d'au plus
+    batch_size pages
+    """
+    runs: List[Tuple[int, int]] = []
+    for page_num in pages:
+        if runs and page_num == runs[-1][1] + 1 and page_num - runs[-1][0] < batch_size:
+            runs[-1] = (runs[-1][0], page_num)
+        else:
+            runs.append((page_num, page_num))
+    return runs
+
+class StreamedText:
+    """
+    Reconstitue, à partir des unités diffusées par stream_file, le texte
+    complet que retournerait process_file
+    """
+    
+    def __init__(self, file_type: str):
+        self.file_type = file_type
+        self.parts: List[str] = []
+        self.page_texts: Dict[int, str] = {}
+        self.ocr_texts: Dict[int, str] = {}
+    
+    def add(self, event: Dict[str, Any]):
+        if self.file_type != 'pdf':
+            self.parts.append(event['content'])
+        elif event.get('source') == 'ocr':
+            # Les pages OCRisées arrivent dans l'ordre de fin de traitement
+            self.ocr_texts[event['index']] = event['text']
+        else:
+            self.page_texts[event['index']] = event['text']
+    
+    def text(self) -> str:
+        if self.file_type == 'pdf':
+            return merge_pdf_pages(self.page_texts, self.ocr_texts).strip()
+        return "".join(self.parts)
+
 class DocumentProcessor:
     """
     Classe principale pour le traitement et l'extraction de contenu des documents
     """
     
-    def __init__(self):
+    def __init__(
+        self,
+        execution_engine: Optional[ExecutionEngine] = None,
+        libreoffice_pool: Optional[LibreOfficePool] = None
+    ):
         self.temp_dir = os.environ.get('TEMP_DIR', '/tmp')
+        self.version = EXTRACTOR_VERSION
+        if extractors.PDF_BACKEND != 'auto':
+            # Le texte des PDF dépend du moteur imposé
+            self.version = f"{EXTRACTOR_VERSION}-{extractors.PDF_BACKEND}"
+        
+        # Les extracteurs bloquants s'exécutent hors de la boucle asyncio
+        self.execution_engine = execution_engine or ExecutionEngine()
+        
+        # Instances LibreOffice résidentes pour les formats legacy
+        self.libreoffice_pool = libreoffice_pool or LibreOfficePool()
         self.supported_formats = {
             'pdf': self._process_pdf,
             'docx': self._process_docx,
@@ -47,7 +146,8 @@ class DocumentProcessor:
         file_type: str,
         extract_text: bool = True,
         perform_ocr: bool = True,
-        language: str = 'fr'
+        language: str = 'fr',
+        include_layout: bool = False
     ) -> Dict[str, Any]:
         """
         Traite un fichier et extrait son contenu
@@ -69,7 +169,8 @@ class DocumentProcessor:
                 file_path,
                 extract_text=extract_text,
                 perform_ocr=perform_ocr,
-                language=language
+                language=language,
+                include_layout=include_layout
             )
             
             # Ajout des métadonnées de base
@@ -85,123 +186,338 @@ class DocumentProcessor:
             logger.error(f"Erreur lors du traitement de {file_path}: {str(e)}")
             raise
     
+    async def stream_file(
+        self,
+        file_path: str,
+        file_type: str,
+        perform_ocr: bool = True,
+        language: str = 'fr'
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Extrait un fichier unité par unité (page, diapositive, feuille...)
+
+        Produit un événement 'metadata', puis un événement 'unit' par unité
+        extraite ('content' étant sa contribution au texte complet, voir
+        StreamedText), puis un événement 'extraction' portant les métadonnées
+        complètes. Les formats non découpables (images, formats legacy)
+        produisent une seule unité 'document'.
+        """
+        if not os.path.exists(file_path):
+            raise FileNotFoundError(f"Fichier non trouvé: {file_path}")
+        
+        processor = self.supported_formats.get(file_type.lower())
+        if not processor:
+            raise ValueError(f"Type de fichier non supporté: {file_type}")
+        
+        logger.info(f"Diffusion du fichier {file_path} ({file_type})")
+        metadata: Dict[str, Any] = {}
+        streaming = STREAMING_EXTRACTORS.get(file_type.lower())
+        
+        if streaming is None:
+            result = await processor(file_path, extract_text=True, perform_ocr=perform_ocr, language=language)
+            metadata = result['metadata']
+            yield {'type': 'metadata', 'metadata': metadata}
+            yield {
+                'type': 'unit', 'unit': 'document', 'index': 1, 'source': 'text',
+                'text': result['text_content'], 'content': result['text_content']
+            }
+        else:
+            pool_name, iter_units = streaming
+            # Pages PDF sans couche texte exploitable (numéro -> nombre de caractères)
+            candidates: Dict[int, int] = {}
+            failed = False
+            try:
+                # Fermeture explicite : le worker s'arrête dès que le client abandonne
+                async with aclosing(self.execution_engine.stream(pool_name, iter_units, file_path)) as units:
+                    async for unit in units:
+                        if unit['unit'] == 'metadata':
+                            metadata.update(unit['metadata'])
+                            yield {'type': 'metadata', 'metadata': unit['metadata']}
+                            continue
+                        if unit['unit'] == 'page' and len(unit['text'].strip()) < PDF_MIN_PAGE_CHARS:
+                            candidates[unit['index']] = len(unit['text'].strip())
+                        content = extractors.unit_content(unit)
+                        yield {'type': 'unit', 'source': 'text', **unit, 'content': content}
+            except Exception as e:
+                if file_type.lower() != 'pdf' or not perform_ocr:
+                    raise
+                # Comme process_file : OCR de toutes les pages
+                logger.error(f"Erreur traitement PDF: {e}")
+                failed = True
+            
+            # OCR au fil de l'eau des pages sans couche texte exploitable (de
+            # toutes après un échec) ; une page OCRisée remplace l'unité texte
+            # de même numéro déjà diffusée
+            if file_type.lower() == 'pdf' and perform_ocr:
+                ocr_selection = None
+                if not failed:
+                    selected = await self._select_ocr_pages(file_path, candidates)
+                    ocr_selection = [page['page'] for page in selected]
+                    if selected:
+                        metadata['ocr_selected_pages'] = selected
+                
+                if ocr_selection is None or ocr_selection:
+                    pages: Dict[int, Dict[str, Any]] = {}
+                    start_time = time.time()
+                    ocr_iter = self._iter_pdf_ocr(file_path, language, page_count=metadata.get('pages'), pages=ocr_selection)
+                    async with aclosing(ocr_iter) as ocr_pages:
+                        async for page in ocr_pages:
+                            pages[page['page']] = page
+                            yield {
+                                'type': 'unit', 'unit': 'page', 'index': page['page'], 'source': 'ocr',
+                                'text': page['text'], 'content': ocr_page_content(page['page'], page['text'])
+                            }
+                    metadata.update(self._ocr_metadata(pages, start_time))
+        
+        metadata.update({
+            'file_size': os.path.getsize(file_path),
+            'file_type': file_type,
+            'original_filename': os.path.basename(file_path)
+        })
+        yield {'type': 'extraction', 'metadata': metadata}
+    
     async def _process_pdf(self, file_path: str, **kwargs) -> Dict[str, Any]:
         """
         Traite les fichiers PDF
+
+        La couche texte de chaque page est conservée si elle est exploitable ;
+        seules les pages numérisées sont OCRisées, puis fusionnées dans
+        l'ordre des pages.
         """
-        text_content = ""
+        page_texts: Dict[int, str] = {}
+        ocr_texts: Dict[int, str] = {}
         metadata = {}
+        language = kwargs.get('language', 'fr')
+        perform_ocr = kwargs.get('perform_ocr', True)
         
         try:
-            # Tentative d'extraction de texte direct
-            with open(file_path, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                metadata['pages'] = len(pdf_reader.pages)
-                
-                # Extraction des métadonnées PDF
-                if pdf_reader.metadata:
-                    metadata.update({
-                        'title': pdf_reader.metadata.get('/Title', ''),
-                        'author': pdf_reader.metadata.get('/Author', ''),
-                        'subject': pdf_reader.metadata.get('/Subject', ''),
-                        'creator': pdf_reader.metadata.get('/Creator', ''),
-                        'creation_date': str(pdf_reader.metadata.get('/CreationDate', ''))
-                    })
-                
-                # Extraction de texte page par page
-                for page_num, page in enumerate(pdf_reader.pages):
-                    try:
-                        page_text = page.extract_text()
-                        if page_text.strip():
-                            text_content += f"\n--- Page {page_num + 1} ---\n{page_text}"
-                    except Exception as e:
-                        logger.warning(f"Erreur extraction page {page_num + 1}: {e}")
-            
-            # Si peu de texte extrait et OCR demandé, utiliser pdfplumber + OCR
-            if (len(text_content.strip()) < 100 and kwargs.get('perform_ocr', True)):
-                logger.info("Peu de texte extrait, tentative avec pdfplumber et OCR")
-                text_content += await self._pdf_ocr_fallback(file_path, kwargs.get('language', 'fr'))
+            # Extraction du texte direct, page par page
+            result = await self.execution_engine.run('pdf', extractors.extract_pdf_pages, file_path)
+            page_texts = dict(enumerate(result['pages'], 1))
+            metadata = result['metadata']
+            
+            # OCR des seules pages sans couche texte exploitable
+            if perform_ocr:
+                candidates = {
+                    page_num: len(text.strip())
+                    for page_num, text in page_texts.items()
+                    if len(text.strip()) < PDF_MIN_PAGE_CHARS
+                }
+                selected = await self._select_ocr_pages(file_path, candidates)
+                if selected:
+                    ocr_texts, ocr_metadata = await self._ocr_pdf_pages(
+                        file_path, language, pages=[page['page'] for page in selected]
+                    )
+                    metadata.update(ocr_metadata)
+                    metadata['ocr_selected_pages'] = selected
             
         except Exception as e:
             logger.error(f"Erreur traitement PDF: {e}")
-            # Fallback vers OCR si extraction directe échoue
-            if kwargs.get('perform_ocr', True):
-                text_content = await self._pdf_ocr_fallback(file_path, kwargs.get('language', 'fr'))
+            # Fallback vers OCR de toutes les pages si extraction directe échoue
+            if perform_ocr:
+                ocr_texts, ocr_metadata = await self._ocr_pdf_pages(file_path, language)
+                metadata.update(ocr_metadata)
         
         return {
-            'text_content': text_content.strip(),
+            'text_content': merge_pdf_pages(page_texts, ocr_texts).strip(),
             'metadata': metadata
         }
     
-    async def _pdf_ocr_fallback(self, file_path: str, language: str = 'fr') -> str:
+    async def _select_ocr_pages(self, file_path: str, candidates: Dict[int, int]) -> List[Dict[str, Any]]:
         """
-        OCR de secours pour les PDF
+        Pages à OCRiser parmi celles dont la couche texte est insuffisante
+        (numéro de page -> nombre de caractères)
+
+        Une page candidate est OCRisée si des images couvrent au moins
+        PDF_OCR_MIN_IMAGE_COVERAGE de sa surface ; une page presque vide sans
+        image (page blanche, intercalaire) est laissée telle quelle.
         """
+        if not candidates:
+            return []
+        
         try:
-            # Conversion PDF vers images puis OCR
-            output_dir = tempfile.mkdtemp()
-            cmd = [
-                'pdftoppm',
-                file_path,
-                f'{output_dir}/page',
-                '-png'
-            ]
-            
-            process = await asyncio.create_subprocess_exec(
-                *cmd,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
+            coverage = await self.execution_engine.run(
+                'pdf', extractors.pdf_image_coverage, file_path, sorted(candidates)
             )
-            await process.communicate()
-            
-            # OCR sur chaque image générée
-            ocr_text = ""
-            for img_file in sorted(Path(output_dir).glob('*.png')):
-                page_text = await self._ocr_image(str(img_file), language)
-                if page_text.strip():
-                    ocr_text += f"\n--- OCR Page ---\n{page_text}"
-            
-            # Nettoyage
-            import shutil
-            shutil.rmtree(output_dir)
-            
-            return ocr_text
-            
         except Exception as e:
-            logger.error(f"Erreur OCR PDF: {e}")
-            return ""
+            # Couverture inconnue : toutes les pages candidates sont OCRisées
+            logger.warning(f"Analyse des images du PDF impossible: {e}")
+            coverage = {}
+        
+        selected = []
+        for page_num in sorted(candidates):
+            page_coverage = coverage.get(page_num)
+            if page_coverage is None or page_coverage >= PDF_OCR_MIN_IMAGE_COVERAGE:
+                selected.append({
+                    'page': page_num,
+                    'text_chars': candidates[page_num],
+                    'image_coverage': round(page_coverage, 3) if page_coverage is not None else None
+                })
+        
+        if selected:
+            logger.info(f"{len(selected)} page(s) sans couche texte exploitable, OCR")
+        return selected
+    
+    async def _count_pdf_pages(self, file_path: str) -> int:
+        """
+        Nombre de pages d'un PDF via pdfinfo
+        """
+        process = await asyncio.create_subprocess_exec(
+            'pdfinfo', file_path,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+        stdout, _ = await process.communicate()
+        match = re.search(rb'^Pages:\s+(\d+)', stdout, re.MULTILINE)
+        return int(match.group(1)) if match else 0
+    
+    async def _render_pdf_pages(self, file_path: str, first: int, last: int, output_dir: str) -> List[Tuple[int, str]]:
+        """
+        Rend une plage de pages d'un PDF en PNG et retourne (numéro de page, chemin)
+        """
+        prefix = os.path.join(output_dir, f'p{first}')
+        process = await asyncio.create_subprocess_exec(
+            'pdftoppm', '-f', str(first), '-l', str(last), '-png', file_path, prefix,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+        await process.communicate()
+        
+        # pdftoppm suffixe chaque image par son numéro de page (avec zéros de tête)
+        rendered = []
+        for img_file in Path(output_dir).glob(f'p{first}-*.png'):
+            rendered.append((int(img_file.stem.rsplit('-', 1)[1]), str(img_file)))
+        return sorted(rendered)
+    
+    def _ocr_concurrency(self) -> int:
+        return OCR_CONCURRENCY or self.execution_engine.pool_size('ocr')
+    
+    async def _iter_pdf_ocr(
+        self,
+        file_path: str,
+        language: str = 'fr',
+        page_count: Optional[int] = None,
+        pages: Optional[List[int]] = None
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        OCR des pages d'un PDF (toutes, ou la liste croissante `pages`), en pipeline
+
+        Les pages sont rendues par petites plages et transmises à un nombre
+        borné de workers OCR dès qu'elles sont prêtes. Chaque page est
+        produite dès la fin de son OCR (ordre de fin, pas ordre des pages).
+        """
+        output_dir = tempfile.mkdtemp(dir=self.temp_dir)
+        concurrency = self._ocr_concurrency()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=concurrency * 2)
+        results: asyncio.Queue = asyncio.Queue()
+        
+        async def render_pages():
+            selection = pages
+            if selection is None:
+                total = page_count or await self._count_pdf_pages(file_path)
+                selection = list(range(1, total + 1))
+            for first, last in page_runs(selection, OCR_RENDER_BATCH):
+                render_start = time.time()
+                rendered = await self._render_pdf_pages(file_path, first, last, output_dir)
+                render_time = (time.time() - render_start) / max(len(rendered), 1)
+                for page_num, img_path in rendered:
+                    observe_stage('pdf_render', render_time, 'pdf')
+                    await queue.put((page_num, img_path, render_time))
+        
+        async def ocr_pages():
+            while True:
+                item = await queue.get()
+                if item is None:
+                    return
+                page_num, img_path, render_time = item
+                # Une page en échec n'arrête pas le worker : le rendu ne doit
+                # jamais attendre une file que plus personne ne vide
+                try:
+                    ocr_start = time.time()
+                    with track_stage('ocr_page', 'pdf'):
+                        text = await self._ocr_image(img_path, language)
+                    os.unlink(img_path)
+                    results.put_nowait({
+                        'page': page_num,
+                        'text': text,
+                        'render_time': round(render_time, 3),
+                        'ocr_time': round(time.time() - ocr_start, 3)
+                    })
+                except Exception as e:
+                    logger.error(f"Erreur OCR PDF page {page_num}: {e}")
+        
+        async def run_pipeline():
+            workers = [asyncio.create_task(ocr_pages()) for _ in range(concurrency)]
+            try:
+                try:
+                    await render_pages()
+                except Exception as e:
+                    logger.error(f"Erreur OCR PDF: {e}")
+                # Rendu terminé : les workers vident la file puis s'arrêtent
+                for _ in workers:
+                    await queue.put(None)
+                await asyncio.gather(*workers)
+            finally:
+                # Sur annulation, les workers sont annulés sans signal de fin
+                # (la file des pages peut être pleine) ; la file des résultats
+                # n'est pas bornée, son signal de fin ne bloque jamais
+                for worker in workers:
+                    worker.cancel()
+                await asyncio.gather(*workers, return_exceptions=True)
+                results.put_nowait(None)
+        
+        pipeline = asyncio.create_task(run_pipeline())
+        try:
+            while True:
+                page = await results.get()
+                if page is None:
+                    return
+                yield page
+        finally:
+            # Consommateur interrompu : arrêt du rendu et des OCR en cours
+            pipeline.cancel()
+            await asyncio.gather(pipeline, return_exceptions=True)
+            # Nettoyage
+            shutil.rmtree(output_dir, ignore_errors=True)
+    
+    async def _ocr_pdf_pages(
+        self,
+        file_path: str,
+        language: str = 'fr',
+        page_count: Optional[int] = None,
+        pages: Optional[List[int]] = None
+    ) -> Tuple[Dict[int, str], Dict[str, Any]]:
+        """
+        OCR de pages d'un PDF (toutes par défaut) : texte par numéro de page
+        et métadonnées de l'OCR
+        """
+        results: Dict[int, Dict[str, Any]] = {}
+        start_time = time.time()
+        
+        async for page in self._iter_pdf_ocr(file_path, language, page_count, pages):
+            results[page['page']] = page
+        
+        return (
+            {page_num: page['text'] for page_num, page in results.items()},
+            self._ocr_metadata(results, start_time)
+        )
+    
+    def _ocr_metadata(self, pages: Dict[int, Dict[str, Any]], start_time: float) -> Dict[str, Any]:
+        return {
+            'ocr_pages': [
+                {key: pages[page_num][key] for key in ('page', 'render_time', 'ocr_time')}
+                for page_num in sorted(pages)
+            ],
+            'ocr_concurrency': self._ocr_concurrency(),
+            'ocr_time': round(time.time() - start_time, 3)
+        }
     
     async def _process_docx(self, file_path: str, **kwargs) -> Dict[str, Any]:
         """
         Traite les fichiers DOCX
         """
         try:
-            doc = Document(file_path)
-            
-            # Extraction du texte
-            text_content = "\n".join([paragraph.text for paragraph in doc.paragraphs])
-            
-            # Extraction des métadonnées
-            metadata = {
-                'paragraphs': len(doc.paragraphs),
-                'tables': len(doc.tables),
-                'images': len(doc.inline_shapes)
-            }
-            
-            # Métadonnées du document
-            if hasattr(doc.core_properties, 'title'):
-                metadata.update({
-                    'title': doc.core_properties.title or '',
-                    'author': doc.core_properties.author or '',
-                    'subject': doc.core_properties.subject or '',
-                    'created': str(doc.core_properties.created) if doc.core_properties.created else '',
-                    'modified': str(doc.core_properties.modified) if doc.core_properties.modified else ''
-                })
-            
-            return {
-                'text_content': text_content,
-                'metadata': metadata
-            }
+            return await self.execution_engine.run('office', extractors.extract_docx, file_path)
             
         except Exception as e:
             logger.error(f"Erreur traitement DOCX: {e}")
@@ -217,40 +533,17 @@ class DocumentProcessor:
         """
         Convertit et traite les fichiers via LibreOffice
         """
+        output_dir = tempfile.mkdtemp(dir=self.temp_dir)
         try:
-            output_dir = tempfile.mkdtemp()
-            
-            # Conversion vers format moderne via LibreOffice
-            cmd = [
-                'libreoffice',
-                '--headless',
-                '--convert-to',
-                'txt',
-                '--outdir',
-                output_dir,
-                file_path
-            ]
-            
-            process = await asyncio.create_subprocess_exec(
-                *cmd,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
-            )
-            
-            stdout, stderr = await process.communicate()
-            
-            # Lecture du fichier converti
-            txt_file = Path(output_dir) / (Path(file_path).stem + '.txt')
+            # Conversion en texte par une instance LibreOffice du pool
+            with track_stage('libreoffice_conversion', file_type):
+                txt_file = await self.libreoffice_pool.convert(file_path, output_dir, 'txt')
             text_content = ""
             
             if txt_file.exists():
                 with open(txt_file, 'r', encoding='utf-8') as f:
                     text_content = f.read()
             
-            # Nettoyage
-            import shutil
-            shutil.rmtree(output_dir)
-            
             return {
                 'text_content': text_content,
                 'metadata': {'converted_via': 'libreoffice'}
@@ -259,6 +552,9 @@ class DocumentProcessor:
         except Exception as e:
             logger.error(f"Erreur LibreOffice: {e}")
             raise
+        finally:
+            # Nettoyage
+            shutil.rmtree(output_dir, ignore_errors=True)
     
     async def _process_image(self, file_path: str, **kwargs) -> Dict[str, Any]:
         """
@@ -267,133 +563,49 @@ class DocumentProcessor:
         if not kwargs.get('perform_ocr', True):
             return {'text_content': '', 'metadata': {'type': 'image', 'ocr_skipped': True}}
         
-        return await self._ocr_image_detailed(file_path, kwargs.get('language', 'fr'))
+        return await self._ocr_image_detailed(
+            file_path,
+            kwargs.get('language', 'fr'),
+            include_layout=kwargs.get('include_layout', False)
+        )
     
-    async def _ocr_image_detailed(self, file_path: str, language: str = 'fr') -> Dict[str, Any]:
+    async def _ocr_image_detailed(self, file_path: str, language: str = 'fr', include_layout: bool = False) -> Dict[str, Any]:
         """
         OCR détaillé d'une image avec pré-traitement
         """
         try:
-            # Chargement de l'image
-            img = cv2.imread(file_path)
-            if img is None:
-                raise ValueError("Impossible de charger l'image")
-            
-            # Pré-traitement pour améliorer l'OCR
-            img = await self._preprocess_image_for_ocr(img)
-            
-            # OCR avec Tesseract
-            lang_map = {'fr': 'fra', 'en': 'eng'}
-            tesseract_lang = lang_map.get(language, 'fra')
-            
-            # Configuration Tesseract
-            config = '--oem 3 --psm 6'
-            
-            text_content = pytesseract.image_to_string(
-                img,
-                lang=tesseract_lang,
-                config=config
-            )
-            
-            # Extraction des données de confiance
-            data = pytesseract.image_to_data(
-                img,
-                lang=tesseract_lang,
-                config=config,
-                output_type=pytesseract.Output.DICT
-            )
-            
-            # Calcul de la confiance moyenne
-            confidences = [int(conf) for conf in data['conf'] if int(conf) > 0]
-            avg_confidence = sum(confidences) / len(confidences) if confidences else 0
-            
-            metadata = {
-                'ocr_confidence': avg_confidence,
-                'image_dimensions': img.shape[:2],
-                'detected_text_blocks': len([conf for conf in confidences if conf > 50])
-            }
-            
-            return {
-                'text_content': text_content,
-                'metadata': metadata
-            }
+            with track_stage('ocr', 'image'):
+                return await self.execution_engine.run(
+                    'ocr',
+                    extractors.ocr_image_detailed,
+                    file_path,
+                    language,
+                    include_layout
+                )
             
         except Exception as e:
             logger.error(f"Erreur OCR image: {e}")
             return {'text_content': '', 'metadata': {'ocr_error': str(e)}}
     
-    async def _preprocess_image_for_ocr(self, img):
-        """
-        Pré-traitement d'image pour améliorer l'OCR
-        """
-        # Conversion en niveaux de gris
-        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-        
-        # Réduction du bruit
-        denoised = cv2.medianBlur(gray, 3)
-        
-        # Amélioration du contraste
-        clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8,8))
-        enhanced = clahe.apply(denoised)
-        
-        # Binarisation adaptative
-        binary = cv2.adaptiveThreshold(
-            enhanced, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 11, 2
-        )
-        
-        return binary
-    
     async def _ocr_image(self, file_path: str, language: str = 'fr') -> str:
         """
         OCR simple d'une image
         """
         try:
-            lang_map = {'fr': 'fra', 'en': 'eng'}
-            tesseract_lang = lang_map.get(language, 'fra')
-            
-            return pytesseract.image_to_string(
-                Image.open(file_path),
-                lang=tesseract_lang
-            )
+            return await self.execution_engine.run('ocr', extractors.ocr_image, file_path, language)
         except Exception as e:
             logger.error(f"Erreur OCR simple: {e}")
             return ""
     
     # Méthodes pour autres formats
     async def _process_text(self, file_path: str, **kwargs) -> Dict[str, Any]:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            return {'text_content': f.read(), 'metadata': {}}
+        return await self.execution_engine.run('office', extractors.extract_text_file, file_path)
     
     async def _process_pptx(self, file_path: str, **kwargs) -> Dict[str, Any]:
-        prs = Presentation(file_path)
-        text_content = ""
-        for slide in prs.slides:
-            for shape in slide.shapes:
-                if hasattr(shape, "text"):
-                    text_content += shape.text + "\n"
-        
-        return {
-            'text_content': text_content,
-            'metadata': {'slides': len(prs.slides)}
-        }
+        return await self.execution_engine.run('office', extractors.extract_pptx, file_path)
     
     async def _process_xlsx(self, file_path: str, **kwargs) -> Dict[str, Any]:
-        wb = load_workbook(file_path)
-        text_content = ""
-        
-        for sheet_name in wb.sheetnames:
-            sheet = wb[sheet_name]
-            text_content += f"\n--- Feuille: {sheet_name} ---\n"
-            
-            for row in sheet.iter_rows(values_only=True):
-                row_text = "\t".join([str(cell) if cell is not None else "" for cell in row])
-                if row_text.strip():
-                    text_content += row_text + "\n"
-        
-        return {
-            'text_content': text_content,
-            'metadata': {'sheets': len(wb.sheetnames)}
-        }
+        return await self.execution_engine.run('office', extractors.extract_xlsx, file_path)
     
     # Méthodes pour formats legacy
     async def _process_rtf(self, file_path: str, **kwargs) -> Dict[str, Any]:
@@ -406,15 +618,4 @@ class DocumentProcessor:
         return await self._process_with_libreoffice(file_path, 'xls')
     
     async def _process_csv(self, file_path: str, **kwargs) -> Dict[str, Any]:
-        import csv
-        text_content = ""
-        
-        with open(file_path, 'r', encoding='utf-8') as csvfile:
-            reader = csv.reader(csvfile)
-            for row in reader:
-                text_content += "\t".join(row) + "\n"
-        
-        return {
-            'text_content': text_content,
-            'metadata': {'format': 'csv'}
-        }
\ No newline at end of file
+        return await self.execution_engine.run('office', extractors.extract_csv, file_path)
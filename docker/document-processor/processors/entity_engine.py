@@ -0,0 +1,248 @@
+"""
+Extraction d'entités par expressions régulières, en un seul passage sur le texte
+
+Les patterns enregistrés (EntityEngine.register) sont combinés en une seule
+expression parcourue une fois, au lieu d'un finditer par pattern :
+- le \\b initial commun aux patterns est factorisé devant l'alternation, et
+  chaque branche commence par son propre premier élément (littéral ou classe
+  de caractères), ce qui permet au moteur re d'écarter les branches
+  impossibles sans les essayer ;
+- chaque branche se termine par un groupe vide : lastindex identifie le
+  pattern reconnu sans groupe englobant (qui masquerait le premier élément) ;
+- un préfiltre facultatif, recherché une fois par texte (ex. '@' pour les
+  emails, \\d{9} pour SIRET/SIREN), retire de l'expression les patterns qui ne
+  peuvent pas correspondre.
+
+Chevauchements : comme dans toute alternation, la correspondance la plus à
+gauche l'emporte, puis à position égale le premier pattern enregistré ; les
+entités retournées ne se chevauchent pas.
+"""
+import re
+import json
+import hashlib
+from typing import Any, Dict, List, Optional, Pattern, Tuple
+
+# Options re utilisables par pattern (appliquées localement via (?i:...))
+SCOPED_FLAGS = {
+    re.IGNORECASE: 'i',
+    re.MULTILINE: 'm',
+    re.DOTALL: 's',
+    re.VERBOSE: 'x',
+}
+
+WORD_BOUNDARY = r'\b'
+
+def _starts_with_boundary(pattern: str) -> bool:
+    """
+    Le pattern commence-t-il par un \\b qui s'applique à toutes ses alternatives
+    (pas de | au premier niveau, hors classes de caractères et groupes) ?
+    """
+    if not pattern.startswith(WORD_BOUNDARY):
+        return False
+
+    depth = 0
+    in_class = False
+    escaped = False
+    for char in pattern:
+        if escaped:
+            escaped = False
+        elif char == '\\':
+            escaped = True
+        elif in_class:
+            in_class = char != ']'
+        elif char == '[':
+            in_class = True
+        elif char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        elif char == '|' and depth == 0:
+            return False
+    return True
+
+class EntityPattern:
+    """
+    Pattern d'entité enregistré
+    """
+
+    def __init__(
+        self,
+        entity_type: str,
+        pattern: str,
+        flags: int = 0,
+        confidence: float = 0.8,
+        prefilter: Optional[str] = None
+    ):
+        unsupported = flags & ~sum(SCOPED_FLAGS)
+        if unsupported:
+            raise ValueError(f"Pattern {entity_type}: options re non supportées ({unsupported})")
+
+        regex = re.compile(pattern, flags)
+        if regex.groups:
+            # Les groupes seraient renumérotés dans l'expression combinée
+            raise ValueError(f"Pattern {entity_type}: groupes capturants interdits, utiliser (?:...)")
+
+        self.entity_type = entity_type
+        self.pattern = pattern
+        self.flags = flags
+        self.confidence = confidence
+        self.prefilter = prefilter
+        self.regex = regex
+        self.prefilter_regex = re.compile(prefilter) if prefilter else None
+        self.hoistable = _starts_with_boundary(pattern) and not flags & re.VERBOSE
+
+    def branch(self, hoisted: bool) -> str:
+        """
+        Source de la branche dans l'expression combinée, suivie du groupe marqueur
+        """
+        body = self.pattern[len(WORD_BOUNDARY):] if hoisted else self.pattern
+        scoped = ''.join(letter for flag, letter in SCOPED_FLAGS.items() if self.flags & flag)
+        return f"(?{scoped}:{body})()"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'type': self.entity_type,
+            'pattern': self.pattern,
+            'flags': self.flags,
+            'confidence': self.confidence,
+            'prefilter': self.prefilter
+        }
+
+class EntityEngine:
+    """
+    Patterns d'entités enregistrés, compilés en une expression combinée
+    """
+
+    def __init__(self):
+        self.patterns: List[EntityPattern] = []
+        self._combined: Dict[Tuple[int, ...], Pattern] = {}
+
+    def register(
+        self,
+        entity_type: str,
+        pattern: str,
+        flags: int = 0,
+        confidence: float = 0.8,
+        prefilter: Optional[str] = None
+    ):
+        """
+        Ajoute un pattern, prioritaire sur les suivants en cas de chevauchement
+
+        `prefilter` est une expression présente dans tout texte où le pattern
+        peut correspondre : si elle est absente, le pattern n'est pas cherché.
+        """
+        self.patterns.append(EntityPattern(entity_type, pattern, flags, confidence, prefilter))
+        self._combined.clear()
+
+    @property
+    def version(self) -> str:
+        """
+        Empreinte des patterns enregistrés (clés de cache des entités)
+        """
+        signature = json.dumps([entity_pattern.to_dict() for entity_pattern in self.patterns])
+        return hashlib.sha256(signature.encode('utf-8')).hexdigest()[:8]
+
+    def _active_patterns(self, text: str) -> Tuple[int, ...]:
+        """
+        Index des patterns dont le préfiltre est présent dans le texte
+        """
+        # Un même préfiltre, partagé par plusieurs patterns, n'est cherché qu'une fois
+        found: Dict[str, bool] = {}
+        active = []
+        for index, entity_pattern in enumerate(self.patterns):
+            prefilter = entity_pattern.prefilter
+            if prefilter:
+                if prefilter not in found:
+                    found[prefilter] = entity_pattern.prefilter_regex.search(text) is not None
+                if not found[prefilter]:
+                    continue
+            active.append(index)
+        return tuple(active)
+
+    def _compile(self, active: Tuple[int, ...]) -> Pattern:
+        """
+        Expression combinée des patterns actifs, dans l'ordre d'enregistrement
+
+        Les suites de patterns commençant par \\b partagent un seul \\b.
+        """
+        combined = self._combined.get(active)
+        if combined is not None:
+            return combined
+
+        alternatives = []
+        hoisted: List[str] = []
+        for index in active:
+            entity_pattern = self.patterns[index]
+            if entity_pattern.hoistable:
+                hoisted.append(entity_pattern.branch(hoisted=True))
+                continue
+            if hoisted:
+                alternatives.append(f"{WORD_BOUNDARY}(?:{'|'.join(hoisted)})")
+                hoisted = []
+            alternatives.append(entity_pattern.branch(hoisted=False))
+        if hoisted:
+            alternatives.append(f"{WORD_BOUNDARY}(?:{'|'.join(hoisted)})")
+
+        combined = re.compile('|'.join(alternatives))
+        self._combined[active] = combined
+        return combined
+
+    def extract(self, text: str) -> List[Dict[str, Any]]:
+        """
+        Entités du texte, dans l'ordre d'apparition
+        """
+        active = self._active_patterns(text)
+        if not active:
+            return []
+
+        # Groupe marqueur n (1..) : n-ième pattern actif
+        patterns = [self.patterns[index] for index in active]
+        entities = []
+        for match in self._compile(active).finditer(text):
+            entity_pattern = patterns[match.lastindex - 1]
+            entities.append({
+                'type': entity_pattern.entity_type,
+                'value': match.group(),
+                'start': match.start(),
+                'end': match.end(),
+                'confidence': entity_pattern.confidence
+            })
+        return entities
+
+    def __getstate__(self):
+        # Les expressions combinées sont recompilées dans le worker qui reçoit le moteur
+        state = self.__dict__.copy()
+        state['_combined'] = {}
+        return state
+
+def default_entity_engine() -> EntityEngine:
+    """
+    Patterns d'entités du service : identifiants et montants, puis entités
+    nommées françaises (confiance plus faible)
+    """
+    engine = EntityEngine()
+    engine.register('email', r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', re.IGNORECASE, prefilter='@')
+    engine.register('phone', r'\b(?:\+33|0)[1-9](?:[0-9]{8})\b', re.IGNORECASE, prefilter=r'\d')
+    engine.register('date', r'\b\d{1,2}[/-]\d{1,2}[/-]\d{2,4}\b', re.IGNORECASE, prefilter=r'\d')
+    engine.register('amount', r'\b\d+[,.]?\d*\s*€?\s*euros?\b', re.IGNORECASE, prefilter=r'\d')
+    engine.register('siret', r'\b\d{14}\b', re.IGNORECASE, prefilter=r'\d{9}')
+    engine.register('siren', r'\b\d{9}\b', re.IGNORECASE, prefilter=r'\d{9}')
+    engine.register(
+        'organization',
+        r'\b[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*\s+(?:SA|SARL|SAS|EURL|SNC)\b',
+        confidence=0.6,
+        prefilter=r'S(?:A|ARL|AS|NC)\b|EURL\b'
+    )
+    engine.register(
+        'person',
+        r'\b(?:M\.|Mme|Monsieur|Madame)\s+[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*\b',
+        confidence=0.6,
+        prefilter=r'M(?:\.|me|onsieur|adame)'
+    )
+    engine.register(
+        'location',
+        r'\b\d+[,\s]+[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*[,\s]+\d{5}\s+[A-Z][a-z]+\b',
+        confidence=0.6,
+        prefilter=r'\d'
+    )
+    return engine
@@ -0,0 +1,653 @@
+"""
+Extracteurs synchrones exécutés dans les pools de processus
+
+Ces fonctions sont appelées via l'ExecutionEngine : elles doivent rester
+définies au niveau du module pour pouvoir être envoyées aux workers.
+
+Les bibliothèques d'extraction sont importées dans les fonctions qui les
+utilisent : l'import de ce module reste léger pour le processus principal,
+et les workers les pré-importent à leur démarrage (POOL_PRELOAD_MODULES).
+
+Les formats paginés ou découpables sont lus par des générateurs (iter_*)
+produisant d'abord une unité 'metadata' puis une unité par page, diapositive,
+feuille, section ou bloc : ils alimentent la diffusion au fil de l'eau
+(ExecutionEngine.stream) et, assemblés par collect_units, les extracteurs
+complets (extract_*).
+"""
+import os
+import re
+import csv
+import shutil
+import functools
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+from loguru import logger
+
+# Paragraphes DOCX par section diffusée
+STREAM_DOCX_PARAGRAPHS = int(os.environ.get('STREAM_DOCX_PARAGRAPHS', 50))
+
+# Lignes XLSX / CSV par bloc diffusé
+STREAM_ROWS = int(os.environ.get('STREAM_ROWS', 1000))
+
+# Caractères par bloc de texte brut diffusé
+STREAM_TEXT_CHARS = int(os.environ.get('STREAM_TEXT_CHARS', 65536))
+
+# Moteur d'extraction du texte des PDF : 'auto', 'pypdf2', 'pdfplumber' ou 'pdftotext'
+PDF_BACKEND = os.environ.get('PDF_BACKEND', 'auto')
+
+# Sélection automatique : pdftotext à partir de ce nombre de pages ou de cette taille
+PDF_AUTO_MIN_PAGES = int(os.environ.get('PDF_AUTO_MIN_PAGES', 20))
+PDF_AUTO_MIN_SIZE_MB = float(os.environ.get('PDF_AUTO_MIN_SIZE_MB', 5))
+
+# Sélection automatique : producteurs (expression régulière sur /Producer et
+# /Creator) dont les polices sont mal décodées par PyPDF2
+PDF_PDFTOTEXT_PRODUCERS = os.environ.get('PDF_PDFTOTEXT_PRODUCERS', r'pdftex|luatex|xetex|ghostscript')
+
+# Plafonds des extractions XLSX, CSV et texte (0 : illimité) ; au-delà, le
+# texte est tronqué et signalé par TRUNCATION_MARKER
+EXTRACT_MAX_ROWS = int(os.environ.get('EXTRACT_MAX_ROWS', 100000))
+EXTRACT_MAX_CELLS = int(os.environ.get('EXTRACT_MAX_CELLS', 2000000))
+EXTRACT_MAX_CHARS = int(os.environ.get('EXTRACT_MAX_CHARS', 10000000))
+
+TRUNCATION_MARKER = "\n[... contenu tronqué : limite de {limit} {kind} atteinte ...]\n"
+TRUNCATION_KINDS = {'rows': 'lignes', 'cells': 'cellules', 'chars': 'caractères'}
+
+# Taille de l'échantillon analysé pour détecter l'encodage des fichiers texte
+ENCODING_SAMPLE_BYTES = int(os.environ.get('ENCODING_SAMPLE_BYTES', 65536))
+
+# Confiance minimale de chardet, en deçà de laquelle cp1252 est retenu
+ENCODING_MIN_CONFIDENCE = float(os.environ.get('ENCODING_MIN_CONFIDENCE', 0.5))
+
+# Correspondance des langues vers les codes Tesseract
+TESSERACT_LANGUAGES = {'fr': 'fra', 'en': 'eng'}
+
+def tesseract_language(language: str) -> str:
+    return TESSERACT_LANGUAGES.get(language, 'fra')
+
+def _pypdf2_pages(file_path: str, pdf_reader: Any) -> Iterator[str]:
+    """
+    Texte des pages via PyPDF2 (pur Python, sans dépendance système)
+    """
+    for page_num, page in enumerate(pdf_reader.pages):
+        try:
+            yield page.extract_text()
+        except Exception as e:
+            logger.warning(f"Erreur extraction page {page_num + 1}: {e}")
+            yield ''
+
+def _pdfplumber_pages(file_path: str, pdf_reader: Any) -> Iterator[str]:
+    """
+    Texte des pages via pdfplumber (ordre de lecture plus fidèle, plus lent)
+    """
+    import pdfplumber
+
+    with pdfplumber.open(file_path) as pdf:
+        for page_num, page in enumerate(pdf.pages):
+            try:
+                yield page.extract_text() or ''
+            except Exception as e:
+                logger.warning(f"Erreur extraction page {page_num + 1}: {e}")
+                yield ''
+            finally:
+                # Sans cela, les objets de chaque page restent en mémoire
+                # jusqu'à la fermeture du document
+                page.flush_cache()
+                page.get_textmap.cache_clear()
+
+def _pdftotext_pages(file_path: str, pdf_reader: Any) -> Iterator[str]:
+    """
+    Texte des pages via pdftotext (poppler), lu au fil de sa sortie où
+    chaque page se termine par un saut de page
+    """
+    import codecs
+    import subprocess
+
+    process = subprocess.Popen(
+        ['pdftotext', '-enc', 'UTF-8', file_path, '-'],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL
+    )
+    decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+    pending = ''
+    try:
+        while True:
+            chunk = process.stdout.read(65536)
+            pending += decoder.decode(chunk, final=not chunk)
+            *pages, pending = pending.split('\f')
+            yield from pages
+            if not chunk:
+                break
+
+        if process.wait() != 0:
+            raise RuntimeError(f"pdftotext a échoué (code {process.returncode})")
+    finally:
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+        process.stdout.close()
+
+# Moteurs d'extraction du texte des PDF : générateur du texte de chaque page,
+# à partir du chemin et du lecteur PyPDF2 déjà ouvert (métadonnées)
+PDF_BACKENDS = {
+    'pypdf2': _pypdf2_pages,
+    'pdfplumber': _pdfplumber_pages,
+    'pdftotext': _pdftotext_pages,
+}
+
+@functools.lru_cache(maxsize=None)
+def pdftotext_available() -> bool:
+    return shutil.which('pdftotext') is not None
+
+def select_pdf_backend(metadata: Dict[str, Any], file_size: int) -> str:
+    """
+    Choix automatique du moteur d'extraction d'un PDF
+
+    pdftotext (natif) est retenu pour les documents volumineux, où PyPDF2
+    devient la principale source de latence, et pour les producteurs dont
+    PyPDF2 décode mal les polices ; PyPDF2, sans coût de lancement d'un
+    processus, reste utilisé pour les petits documents.
+    """
+    if not pdftotext_available():
+        return 'pypdf2'
+
+    if metadata.get('pages', 0) >= PDF_AUTO_MIN_PAGES or file_size >= PDF_AUTO_MIN_SIZE_MB * 1024 * 1024:
+        return 'pdftotext'
+
+    producer = f"{metadata.get('producer', '')} {metadata.get('creator', '')}"
+    if PDF_PDFTOTEXT_PRODUCERS and re.search(PDF_PDFTOTEXT_PRODUCERS, producer, re.IGNORECASE):
+        return 'pdftotext'
+
+    return 'pypdf2'
+
+def iter_pdf_pages(file_path: str, backend: str = PDF_BACKEND) -> Iterator[Dict[str, Any]]:
+    """
+    Métadonnées puis texte de chaque page d'un PDF
+
+    `backend` désigne un moteur de PDF_BACKENDS, ou 'auto' pour le choisir
+    selon le document (select_pdf_backend). Les métadonnées sont toujours
+    lues par PyPDF2, quel que soit le moteur.
+    """
+    import PyPDF2
+
+    with open(file_path, 'rb') as file:
+        pdf_reader = PyPDF2.PdfReader(file)
+        metadata = {'pages': len(pdf_reader.pages)}
+
+        # Extraction des métadonnées PDF
+        if pdf_reader.metadata:
+            metadata.update({
+                'title': pdf_reader.metadata.get('/Title', ''),
+                'author': pdf_reader.metadata.get('/Author', ''),
+                'subject': pdf_reader.metadata.get('/Subject', ''),
+                'creator': pdf_reader.metadata.get('/Creator', ''),
+                'producer': pdf_reader.metadata.get('/Producer', ''),
+                'creation_date': str(pdf_reader.metadata.get('/CreationDate', ''))
+            })
+
+        if backend == 'auto':
+            backend = select_pdf_backend(metadata, os.path.getsize(file_path))
+        elif backend not in PDF_BACKENDS:
+            raise ValueError(f"Moteur d'extraction PDF inconnu: {backend}")
+        metadata['pdf_backend'] = backend
+        yield {'unit': 'metadata', 'metadata': metadata}
+
+        # Extraction de texte page par page
+        for page_num, page_text in enumerate(PDF_BACKENDS[backend](file_path, pdf_reader)):
+            yield {'unit': 'page', 'index': page_num + 1, 'text': page_text}
+
+def iter_docx_sections(file_path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Métadonnées puis paragraphes d'un DOCX, par sections de STREAM_DOCX_PARAGRAPHS
+    """
+    from docx import Document
+
+    doc = Document(file_path)
+
+    # Extraction des métadonnées
+    metadata = {
+        'paragraphs': len(doc.paragraphs),
+        'tables': len(doc.tables),
+        'images': len(doc.inline_shapes)
+    }
+
+    # Métadonnées du document
+    if hasattr(doc.core_properties, 'title'):
+        metadata.update({
+            'title': doc.core_properties.title or '',
+            'author': doc.core_properties.author or '',
+            'subject': doc.core_properties.subject or '',
+            'created': str(doc.core_properties.created) if doc.core_properties.created else '',
+            'modified': str(doc.core_properties.modified) if doc.core_properties.modified else ''
+        })
+    yield {'unit': 'metadata', 'metadata': metadata}
+
+    paragraphs = doc.paragraphs
+    for index, start in enumerate(range(0, len(paragraphs), STREAM_DOCX_PARAGRAPHS)):
+        section = paragraphs[start:start + STREAM_DOCX_PARAGRAPHS]
+        yield {'unit': 'section', 'index': index + 1, 'text': "\n".join(paragraph.text for paragraph in section)}
+
+def iter_pptx_slides(file_path: str) -> Iterator[Dict[str, Any]]:
+    from pptx import Presentation
+
+    prs = Presentation(file_path)
+    yield {'unit': 'metadata', 'metadata': {'slides': len(prs.slides)}}
+
+    for index, slide in enumerate(prs.slides):
+        parts = [shape.text + "\n" for shape in slide.shapes if hasattr(shape, "text")]
+        yield {'unit': 'slide', 'index': index + 1, 'text': "".join(parts)}
+
+class ExtractionLimits:
+    """
+    Plafonds de lignes, cellules et caractères d'une extraction (0 : illimité)
+
+    Le premier plafond atteint est conservé dans `exceeded` ; l'extracteur
+    s'arrête alors et signale la troncature (truncation_units).
+    """
+
+    def __init__(
+        self,
+        max_rows: int = EXTRACT_MAX_ROWS,
+        max_cells: int = EXTRACT_MAX_CELLS,
+        max_chars: int = EXTRACT_MAX_CHARS
+    ):
+        self.limits = {'rows': max_rows, 'cells': max_cells, 'chars': max_chars}
+        self.counts = {'rows': 0, 'cells': 0, 'chars': 0}
+        self.exceeded: Optional[str] = None
+
+    def _over(self, name: str, amount: int) -> bool:
+        limit = self.limits[name]
+        return bool(limit) and self.counts[name] + amount > limit
+
+    def admit_row(self, cells: int, text: str) -> bool:
+        """
+        Compte une ligne ; False si elle ferait dépasser un plafond
+        """
+        for name, amount in (('rows', 1), ('cells', cells), ('chars', len(text))):
+            if self._over(name, amount):
+                self.exceeded = name
+                return False
+        self.counts['rows'] += 1
+        self.counts['cells'] += cells
+        self.counts['chars'] += len(text)
+        return True
+
+    def clip(self, text: str) -> str:
+        """
+        Compte un bloc de texte et le tronque au plafond de caractères
+        """
+        if self._over('chars', len(text)):
+            self.exceeded = 'chars'
+            text = text[:self.limits['chars'] - self.counts['chars']]
+        self.counts['chars'] += len(text)
+        return text
+
+    def truncation_units(self) -> List[Dict[str, Any]]:
+        limit = self.limits[self.exceeded]
+        return [
+            {'unit': 'truncation', 'text': TRUNCATION_MARKER.format(limit=limit, kind=TRUNCATION_KINDS[self.exceeded])},
+            {'unit': 'metadata', 'metadata': {'truncated': {'reason': self.exceeded, 'limit': limit}}}
+        ]
+
+def detect_encoding(file_path: str, sample_size: int = ENCODING_SAMPLE_BYTES) -> str:
+    """
+    Encodage d'un fichier texte, déterminé sur un échantillon
+
+    UTF-8 (avec ou sans BOM) est retenu si l'échantillon est valide ; sinon
+    chardet est alimenté par blocs jusqu'à ce qu'il soit fixé ou que
+    l'échantillon soit épuisé. À défaut de détection fiable : cp1252, qui
+    couvre les exports Windows/Excel en Latin-1.
+    """
+    import codecs
+    from chardet.universaldetector import UniversalDetector
+
+    with open(file_path, 'rb') as f:
+        sample = f.read(sample_size)
+
+    if sample.startswith(codecs.BOM_UTF8):
+        return 'utf-8-sig'
+    try:
+        # Décodage incrémental : un caractère coupé en fin d'échantillon est admis
+        codecs.getincrementaldecoder('utf-8')().decode(sample, final=False)
+        return 'utf-8'
+    except UnicodeDecodeError:
+        pass
+
+    detector = UniversalDetector()
+    for start in range(0, len(sample), 4096):
+        detector.feed(sample[start:start + 4096])
+        if detector.done:
+            break
+    detector.close()
+
+    encoding = detector.result.get('encoding')
+    if not encoding or detector.result.get('confidence', 0) < ENCODING_MIN_CONFIDENCE:
+        return 'cp1252'
+    return encoding.lower()
+
+def iter_xlsx_sheets(file_path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Métadonnées puis lignes de chaque feuille, par blocs de STREAM_ROWS lignes
+
+    Le classeur est lu en mode read_only : les lignes sont parcourues au fil
+    du fichier sans construire les cellules, la mémoire reste constante
+    quelle que soit la taille de la feuille.
+    """
+    from openpyxl import load_workbook
+
+    wb = load_workbook(file_path, read_only=True)
+    limits = ExtractionLimits()
+    try:
+        yield {'unit': 'metadata', 'metadata': {'sheets': len(wb.sheetnames)}}
+
+        for index, sheet_name in enumerate(wb.sheetnames):
+            sheet = wb[sheet_name]
+            if not hasattr(sheet, 'iter_rows'):
+                # Feuille graphique, sans cellules
+                continue
+
+            rows: List[str] = []
+            first = True
+            for row in sheet.iter_rows(values_only=True):
+                row_text = "\t".join([str(cell) if cell is not None else "" for cell in row])
+                if not row_text.strip():
+                    continue
+                if not limits.admit_row(len(row), row_text):
+                    break
+                rows.append(row_text + "\n")
+                if len(rows) >= STREAM_ROWS:
+                    yield {'unit': 'sheet', 'index': index + 1, 'name': sheet_name, 'first': first, 'text': "".join(rows)}
+                    rows, first = [], False
+            if rows or first:
+                yield {'unit': 'sheet', 'index': index + 1, 'name': sheet_name, 'first': first, 'text': "".join(rows)}
+
+            if limits.exceeded:
+                yield from limits.truncation_units()
+                return
+    finally:
+        # Le mode read_only garde le fichier ouvert jusqu'à la fermeture
+        wb.close()
+
+def iter_csv_rows(file_path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Lignes d'un CSV par blocs de STREAM_ROWS lignes
+    """
+    encoding = detect_encoding(file_path)
+    yield {'unit': 'metadata', 'metadata': {'format': 'csv', 'encoding': encoding}}
+
+    limits = ExtractionLimits()
+    with open(file_path, 'r', encoding=encoding, errors='replace') as csvfile:
+        reader = csv.reader(csvfile)
+        rows: List[str] = []
+        index = 0
+        for row in reader:
+            row_text = "\t".join(row) + "\n"
+            if not limits.admit_row(len(row), row_text):
+                break
+            rows.append(row_text)
+            if len(rows) >= STREAM_ROWS:
+                index += 1
+                yield {'unit': 'rows', 'index': index, 'text': "".join(rows)}
+                rows = []
+        if rows:
+            yield {'unit': 'rows', 'index': index + 1, 'text': "".join(rows)}
+
+    if limits.exceeded:
+        yield from limits.truncation_units()
+
+def iter_text_chunks(file_path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Texte brut par blocs de STREAM_TEXT_CHARS caractères
+    """
+    encoding = detect_encoding(file_path)
+    yield {'unit': 'metadata', 'metadata': {'encoding': encoding}}
+
+    limits = ExtractionLimits()
+    with open(file_path, 'r', encoding=encoding, errors='replace') as f:
+        index = 0
+        while not limits.exceeded:
+            chunk = limits.clip(f.read(STREAM_TEXT_CHARS))
+            if not chunk:
+                break
+            index += 1
+            yield {'unit': 'chunk', 'index': index, 'text': chunk}
+
+    if limits.exceeded:
+        yield from limits.truncation_units()
+
+def page_content(page_num: int, text: str) -> str:
+    """
+    Contribution d'une page PDF au texte complet
+    """
+    return f"\n--- Page {page_num} ---\n{text}" if text.strip() else ""
+
+def unit_content(unit: Dict[str, Any]) -> str:
+    """
+    Contribution d'une unité au texte complet produit par l'extracteur
+    """
+    kind = unit['unit']
+    if kind == 'page':
+        return page_content(unit['index'], unit['text'])
+    if kind == 'sheet':
+        header = f"\n--- Feuille: {unit['name']} ---\n" if unit['first'] else ""
+        return header + unit['text']
+    if kind == 'section' and unit['index'] > 1:
+        return "\n" + unit['text']
+    return unit['text']
+
+def collect_units(units: Iterator[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Assemble les unités d'un extracteur en un seul résultat (texte joint en
+    une fois, sans concaténations successives)
+    """
+    metadata: Dict[str, Any] = {}
+    parts: List[str] = []
+    for unit in units:
+        if unit['unit'] == 'metadata':
+            metadata.update(unit['metadata'])
+        else:
+            parts.append(unit_content(unit))
+
+    return {
+        'text_content': "".join(parts),
+        'metadata': metadata
+    }
+
+def extract_pdf_text(file_path: str, backend: str = PDF_BACKEND) -> Dict[str, Any]:
+    """
+    Extraction du texte et des métadonnées d'un PDF
+    """
+    return collect_units(iter_pdf_pages(file_path, backend))
+
+def extract_pdf_pages(file_path: str, backend: str = PDF_BACKEND) -> Dict[str, Any]:
+    """
+    Texte de chaque page d'un PDF (liste indexée à partir de la page 1) et métadonnées
+    """
+    metadata: Dict[str, Any] = {}
+    pages: List[str] = []
+    for unit in iter_pdf_pages(file_path, backend):
+        if unit['unit'] == 'metadata':
+            metadata.update(unit['metadata'])
+        else:
+            pages.append(unit['text'])
+
+    return {
+        'pages': pages,
+        'metadata': metadata
+    }
+
+def pdf_image_coverage(file_path: str, pages: List[int]) -> Dict[int, float]:
+    """
+    Part de la surface de chaque page demandée couverte par des images (0 à 1)
+
+    Les recouvrements entre images ne sont pas déduits : la valeur est
+    plafonnée à 1.
+    """
+    import pdfplumber
+
+    coverage = {}
+    with pdfplumber.open(file_path) as pdf:
+        for page_num in pages:
+            page = pdf.pages[page_num - 1]
+            page_x0, page_top, page_x1, page_bottom = page.bbox
+            area = float((page_x1 - page_x0) * (page_bottom - page_top)) or 1.0
+            covered = 0.0
+            for image in page.images:
+                # Image rognée aux limites de la page
+                width = min(image['x1'], page_x1) - max(image['x0'], page_x0)
+                height = min(image['bottom'], page_bottom) - max(image['top'], page_top)
+                covered += max(width, 0) * max(height, 0)
+            coverage[page_num] = min(1.0, covered / area)
+            page.flush_cache()
+
+    return coverage
+
+def extract_docx(file_path: str) -> Dict[str, Any]:
+    """
+    Extraction du texte et des métadonnées d'un DOCX
+    """
+    return collect_units(iter_docx_sections(file_path))
+
+def extract_pptx(file_path: str) -> Dict[str, Any]:
+    return collect_units(iter_pptx_slides(file_path))
+
+def extract_xlsx(file_path: str) -> Dict[str, Any]:
+    return collect_units(iter_xlsx_sheets(file_path))
+
+def extract_csv(file_path: str) -> Dict[str, Any]:
+    return collect_units(iter_csv_rows(file_path))
+
+def extract_text_file(file_path: str) -> Dict[str, Any]:
+    return collect_units(iter_text_chunks(file_path))
+
+def preprocess_image_for_ocr(img):
+    """
+    Pré-traitement d'image pour améliorer l'OCR
+    """
+    import cv2
+
+    # Conversion en niveaux de gris
+    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+
+    # Réduction du bruit
+    denoised = cv2.medianBlur(gray, 3)
+
+    # Amélioration du contraste
+    clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8,8))
+    enhanced = clahe.apply(denoised)
+
+    # Binarisation adaptative
+    binary = cv2.adaptiveThreshold(
+        enhanced, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 11, 2
+    )
+
+    return binary
+
+def build_ocr_layout(data: Dict[str, List[Any]]) -> Dict[str, Any]:
+    """
+    Reconstruit le texte et la mise en page (blocs, lignes, mots) à partir
+    de la sortie image_to_data de Tesseract
+    """
+    blocks: Dict[int, Dict[str, Any]] = {}
+    lines: Dict[Tuple[int, int, int], Dict[str, Any]] = {}
+    confidences = []
+
+    for i, word in enumerate(data['text']):
+        conf = float(data['conf'][i])
+        if conf < 0 or not str(word).strip():
+            continue
+        confidences.append(conf)
+
+        block_num = data['block_num'][i]
+        line_key = (block_num, data['par_num'][i], data['line_num'][i])
+        box = {
+            'left': data['left'][i],
+            'top': data['top'][i],
+            'width': data['width'][i],
+            'height': data['height'][i]
+        }
+
+        block = blocks.setdefault(block_num, {'block_num': block_num, 'lines': []})
+        line = lines.get(line_key)
+        if line is None:
+            line = {'paragraph': line_key[1], 'line_num': line_key[2], 'words': []}
+            lines[line_key] = line
+            block['lines'].append(line)
+        line['words'].append({'text': word, 'conf': conf, **box})
+
+    # Texte : mots d'une ligne séparés par des espaces, paragraphes par une ligne vide
+    text_parts = []
+    previous_paragraph = None
+    for (block_num, par_num, _), line in lines.items():
+        if previous_paragraph is not None and previous_paragraph != (block_num, par_num):
+            text_parts.append('')
+        text_parts.append(' '.join(word['text'] for word in line['words']))
+        previous_paragraph = (block_num, par_num)
+
+    return {
+        'text': '\n'.join(text_parts),
+        'confidences': confidences,
+        'blocks': list(blocks.values())
+    }
+
+def ocr_image_detailed(file_path: str, language: str = 'fr', include_layout: bool = False) -> Dict[str, Any]:
+    """
+    OCR détaillé d'une image avec pré-traitement
+
+    Une seule passe Tesseract (image_to_data) fournit le texte, la confiance
+    par mot et la mise en page.
+    """
+    import cv2
+    import pytesseract
+
+    # Chargement de l'image
+    img = cv2.imread(file_path)
+    if img is None:
+        raise ValueError("Impossible de charger l'image")
+
+    # Pré-traitement pour améliorer l'OCR
+    img = preprocess_image_for_ocr(img)
+
+    # Configuration Tesseract
+    config = '--oem 3 --psm 6'
+
+    data = pytesseract.image_to_data(
+        img,
+        lang=tesseract_language(language),
+        config=config,
+        output_type=pytesseract.Output.DICT
+    )
+    layout = build_ocr_layout(data)
+
+    # Calcul de la confiance moyenne
+    confidences = [conf for conf in layout['confidences'] if conf > 0]
+    avg_confidence = sum(confidences) / len(confidences) if confidences else 0
+
+    metadata = {
+        'ocr_confidence': avg_confidence,
+        'image_dimensions': img.shape[:2],
+        'detected_text_blocks': len([conf for conf in confidences if conf > 50])
+    }
+
+    result = {
+        'text_content': layout['text'],
+        'metadata': metadata
+    }
+    if include_layout:
+        result['layout'] = {
+            'width': int(img.shape[1]),
+            'height': int(img.shape[0]),
+            'blocks': layout['blocks']
+        }
+
+    return result
+
+def ocr_image(file_path: str, language: str = 'fr') -> str:
+    """
+    OCR simple d'une image
+    """
+    import pytesseract
+    from PIL import Image
+
+    return pytesseract.image_to_string(
+        Image.open(file_path),
+        lang=tesseract_language(language)
+    )
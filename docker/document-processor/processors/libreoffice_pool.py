@@ -0,0 +1,295 @@
+"""
+Pool d'instances LibreOffice headless persistantes
+
+Chaque instance possède son propre profil utilisateur. Une conversion est
+confiée à une instance libre : la commande soffice lancée avec le même profil
+transmet la demande à l'instance résidente via le canal IPC de LibreOffice,
+ce qui évite le démarrage à froid et les conflits de verrou sur un profil
+partagé.
+"""
+import os
+import time
+import shutil
+import asyncio
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from loguru import logger
+
+# Nombre d'instances LibreOffice résidentes (0 : une instance éphémère par conversion)
+LIBREOFFICE_POOL_SIZE = int(os.environ.get('LIBREOFFICE_POOL_SIZE', 2))
+
+# Durée maximale d'une conversion avant redémarrage de l'instance
+LIBREOFFICE_TIMEOUT = int(os.environ.get('LIBREOFFICE_TIMEOUT', 120))
+
+# Délai maximal de démarrage d'une instance
+LIBREOFFICE_STARTUP_TIMEOUT = int(os.environ.get('LIBREOFFICE_STARTUP_TIMEOUT', 60))
+
+# Intervalle entre deux vérifications de santé des instances
+LIBREOFFICE_HEALTH_INTERVAL = int(os.environ.get('LIBREOFFICE_HEALTH_INTERVAL', 30))
+
+# Durée maximale de la conversion de contrôle d'une instance déjà démarrée
+LIBREOFFICE_HEALTH_TIMEOUT = int(os.environ.get('LIBREOFFICE_HEALTH_TIMEOUT', 20))
+
+LIBREOFFICE_BINARY = os.environ.get('LIBREOFFICE_BINARY', 'soffice')
+
+class LibreOfficeInstance:
+    """
+    Instance LibreOffice headless attachée à un profil dédié
+    """
+
+    def __init__(self, index: int, profile_dir: str):
+        self.index = index
+        self.profile_dir = profile_dir
+        self.process: Optional[asyncio.subprocess.Process] = None
+        self.conversions = 0
+        self.restarts = 0
+        self.failures = 0
+        self.started_at: Optional[float] = None
+        # Vrai après une conversion de contrôle réussie
+        self.healthy = False
+        self.last_check: Optional[float] = None
+
+    @property
+    def profile_url(self) -> str:
+        return Path(self.profile_dir).as_uri()
+
+    def is_alive(self) -> bool:
+        return self.process is not None and self.process.returncode is None
+
+    async def start(self):
+        """
+        Démarre l'instance résidente et attend qu'elle réponde
+        """
+        os.makedirs(self.profile_dir, exist_ok=True)
+        self.process = await asyncio.create_subprocess_exec(
+            LIBREOFFICE_BINARY,
+            f'-env:UserInstallation={self.profile_url}',
+            '--headless',
+            '--invisible',
+            '--nologo',
+            '--nodefault',
+            '--norestore',
+            '--nolockcheck',
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.DEVNULL
+        )
+        self.started_at = time.time()
+
+        # Le fichier .lock du profil apparaît quand l'instance a pris le profil
+        lock_file = Path(self.profile_dir) / '.lock'
+        deadline = time.time() + LIBREOFFICE_STARTUP_TIMEOUT
+        while not lock_file.exists():
+            if not self.is_alive() or time.time() > deadline:
+                raise RuntimeError(f"Démarrage de l'instance LibreOffice {self.index} impossible")
+            await asyncio.sleep(0.2)
+
+        # Conversion de contrôle : l'instance doit répondre aux demandes
+        await self.probe()
+        logger.info(f"Instance LibreOffice {self.index} prête (pid {self.process.pid})")
+
+    async def probe(self, timeout: int = LIBREOFFICE_STARTUP_TIMEOUT):
+        """
+        Vérifie que l'instance convertit un document minimal dans le délai imparti
+        """
+        self.last_check = time.time()
+        probe_dir = tempfile.mkdtemp(prefix='lo_probe_')
+        try:
+            probe_file = Path(probe_dir) / 'probe.html'
+            probe_file.write_text('<p>ok</p>', encoding='utf-8')
+            output = await asyncio.wait_for(
+                self.convert(str(probe_file), probe_dir, 'txt'),
+                timeout=timeout
+            )
+            if not output.exists() or 'ok' not in output.read_text(encoding='utf-8', errors='replace'):
+                raise RuntimeError(f"L'instance LibreOffice {self.index} ne répond pas")
+            self.healthy = True
+        except Exception:
+            self.healthy = False
+            raise
+        finally:
+            shutil.rmtree(probe_dir, ignore_errors=True)
+
+    async def convert(self, file_path: str, output_dir: str, convert_to: str) -> Path:
+        """
+        Transmet une conversion à l'instance résidente et attend le résultat
+        """
+        process = await asyncio.create_subprocess_exec(
+            LIBREOFFICE_BINARY,
+            f'-env:UserInstallation={self.profile_url}',
+            '--headless',
+            '--convert-to',
+            convert_to,
+            '--outdir',
+            output_dir,
+            file_path,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+        try:
+            await process.communicate()
+        except asyncio.CancelledError:
+            if process.returncode is None:
+                process.kill()
+            raise
+
+        extension = convert_to.split(':', 1)[0]
+        return Path(output_dir) / f"{Path(file_path).stem}.{extension}"
+
+    async def stop(self):
+        """
+        Arrête l'instance
+        """
+        self.healthy = False
+        if self.is_alive():
+            self.process.terminate()
+            try:
+                await asyncio.wait_for(self.process.wait(), timeout=10)
+            except asyncio.TimeoutError:
+                self.process.kill()
+                await self.process.wait()
+        self.process = None
+
+    async def restart(self):
+        """
+        Redémarre l'instance avec un profil propre
+        """
+        self.restarts += 1
+        await self.stop()
+        shutil.rmtree(self.profile_dir, ignore_errors=True)
+        await self.start()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'index': self.index,
+            'alive': self.is_alive(),
+            'healthy': self.healthy,
+            'last_check': self.last_check,
+            'pid': self.process.pid if self.process else None,
+            'conversions': self.conversions,
+            'failures': self.failures,
+            'restarts': self.restarts
+        }
+
+class LibreOfficePool:
+    """
+    Répartit les conversions sur des instances LibreOffice résidentes
+    """
+
+    def __init__(self, size: Optional[int] = None, timeout: Optional[int] = None, base_dir: Optional[str] = None):
+        self.size = LIBREOFFICE_POOL_SIZE if size is None else size
+        self.timeout = timeout or LIBREOFFICE_TIMEOUT
+        self.base_dir = base_dir or os.path.join(os.environ.get('TEMP_DIR', '/tmp'), 'libreoffice')
+        self.instances: List[LibreOfficeInstance] = []
+        self._idle: Optional[asyncio.Queue] = None
+        self._start_lock = asyncio.Lock()
+        self._health_task: Optional[asyncio.Task] = None
+
+    async def _ensure_started(self):
+        if self._idle is not None:
+            return
+
+        async with self._start_lock:
+            if self._idle is not None:
+                return
+
+            idle = asyncio.Queue()
+            instances = [
+                LibreOfficeInstance(index, os.path.join(self.base_dir, f'profile_{index}'))
+                for index in range(self.size)
+            ]
+            results = await asyncio.gather(*[instance.start() for instance in instances], return_exceptions=True)
+            for instance, result in zip(instances, results):
+                if isinstance(result, Exception):
+                    # L'instance sera redémarrée à sa première utilisation
+                    logger.error(f"Erreur démarrage LibreOffice {instance.index}: {result}")
+                idle.put_nowait(instance)
+
+            self.instances = instances
+            self._idle = idle
+            self._health_task = asyncio.create_task(self._health_loop())
+
+    async def _health_loop(self):
+        """
+        Contrôle les instances libres une à une par une conversion minimale et
+        redémarre celles qui sont arrêtées ou ne répondent pas
+        """
+        while True:
+            await asyncio.sleep(LIBREOFFICE_HEALTH_INTERVAL)
+            for _ in range(self._idle.qsize()):
+                instance = self._idle.get_nowait()
+                try:
+                    if not instance.is_alive():
+                        logger.warning(f"Instance LibreOffice {instance.index} arrêtée, redémarrage")
+                        await instance.restart()
+                        continue
+                    try:
+                        await instance.probe(timeout=LIBREOFFICE_HEALTH_TIMEOUT)
+                    except Exception as e:
+                        logger.warning(f"Instance LibreOffice {instance.index} sans réponse ({e}), redémarrage")
+                        await instance.restart()
+                except Exception as e:
+                    logger.error(f"Erreur redémarrage LibreOffice {instance.index}: {e}")
+                finally:
+                    self._idle.put_nowait(instance)
+
+    async def convert(self, file_path: str, output_dir: str, convert_to: str = 'txt') -> Path:
+        """
+        Convertit un fichier sur une instance libre
+        """
+        if self.size <= 0:
+            return await self._convert_standalone(file_path, output_dir, convert_to)
+
+        await self._ensure_started()
+        instance = await self._idle.get()
+        try:
+            if not instance.healthy or not instance.is_alive():
+                await instance.restart()
+
+            output = await asyncio.wait_for(
+                instance.convert(file_path, output_dir, convert_to),
+                timeout=self.timeout
+            )
+            instance.conversions += 1
+            return output
+
+        except asyncio.TimeoutError:
+            instance.failures += 1
+            logger.error(f"Conversion LibreOffice bloquée sur l'instance {instance.index}, redémarrage")
+            await instance.restart()
+            raise
+        except Exception:
+            instance.failures += 1
+            raise
+        finally:
+            self._idle.put_nowait(instance)
+
+    async def _convert_standalone(self, file_path: str, output_dir: str, convert_to: str) -> Path:
+        """
+        Conversion par une instance éphémère, avec son propre profil
+        """
+        instance = LibreOfficeInstance(-1, tempfile.mkdtemp(prefix='lo_profile_'))
+        try:
+            return await asyncio.wait_for(
+                instance.convert(file_path, output_dir, convert_to),
+                timeout=self.timeout
+            )
+        finally:
+            shutil.rmtree(instance.profile_dir, ignore_errors=True)
+
+    async def shutdown(self):
+        """
+        Arrête les instances du pool
+        """
+        if self._health_task:
+            self._health_task.cancel()
+        await asyncio.gather(*[instance.stop() for instance in self.instances], return_exceptions=True)
+        self.instances = []
+        self._idle = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'size': self.size,
+            'idle': self._idle.qsize() if self._idle else 0,
+            'instances': [instance.get_stats() for instance in self.instances]
+        }
@@ -0,0 +1,204 @@
+import os
+import time
+import pickle
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from loguru import logger
+
+# Modèles chargés au démarrage (liste séparée par des virgules)
+MODELS_WARMUP = os.environ.get('MODELS_WARMUP', 'nltk_resources,document_classifier')
+
+# Budget mémoire des modèles chargés, en MB (0 : illimité)
+MODELS_MEMORY_BUDGET_MB = int(os.environ.get('MODELS_MEMORY_BUDGET_MB', 0))
+
+# Déchargement des modèles inutilisés depuis N secondes (0 : jamais)
+MODELS_IDLE_TIMEOUT = int(os.environ.get('MODELS_IDLE_TIMEOUT', 0))
+
+def estimate_model_size_mb(model: Any, default: float = 0) -> float:
+    """
+    Estime l'empreinte mémoire d'un modèle chargé
+    """
+    # Modèles torch (SentenceTransformer, pipeline Transformers)
+    module = getattr(model, 'model', model)
+    parameters = getattr(module, 'parameters', None)
+    if callable(parameters):
+        try:
+            size = sum(p.numel() * p.element_size() for p in parameters())
+            return size / (1024 * 1024)
+        except Exception:
+            pass
+
+    # Modèles scikit-learn
+    try:
+        return len(pickle.dumps(model)) / (1024 * 1024)
+    except Exception:
+        return default
+
+class ModelEntry:
+    """
+    Modèle enregistré et son état de chargement
+    """
+
+    def __init__(self, name: str, loader: Callable[[], Awaitable[Any]], size_mb: float = 0, required: bool = False):
+        self.name = name
+        self.loader = loader
+        self.declared_size_mb = size_mb
+        self.required = required
+        self.state = 'not_loaded'
+        self.model: Any = None
+        self.size_mb = 0.0
+        self.error: Optional[str] = None
+        self.load_time: Optional[float] = None
+        self.last_used: Optional[float] = None
+        self.loads = 0
+        self.lock = asyncio.Lock()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'state': self.state,
+            'required': self.required,
+            'size_mb': round(self.size_mb, 1),
+            'load_time': round(self.load_time, 2) if self.load_time is not None else None,
+            'idle_seconds': round(time.time() - self.last_used, 1) if self.last_used else None,
+            'loads': self.loads,
+            'error': self.error
+        }
+
+class ModelRegistry:
+    """
+    Charge les modèles à la première utilisation ou au préchauffage, et
+    décharge les moins récemment utilisés au-delà du budget mémoire
+    """
+
+    def __init__(self, memory_budget_mb: Optional[int] = None, idle_timeout: Optional[int] = None):
+        self.memory_budget_mb = MODELS_MEMORY_BUDGET_MB if memory_budget_mb is None else memory_budget_mb
+        self.idle_timeout = MODELS_IDLE_TIMEOUT if idle_timeout is None else idle_timeout
+        self.entries: Dict[str, ModelEntry] = {}
+        self._idle_task: Optional[asyncio.Task] = None
+
+    def register(self, name: str, loader: Callable[[], Awaitable[Any]], size_mb: float = 0, required: bool = False):
+        """
+        Enregistre un modèle et sa fonction de chargement
+        """
+        self.entries[name] = ModelEntry(name, loader, size_mb=size_mb, required=required)
+
+    async def get(self, name: str) -> Optional[Any]:
+        """
+        Retourne le modèle, chargé si nécessaire ; None si indisponible
+        """
+        entry = self.entries.get(name)
+        if entry is None:
+            return None
+
+        if entry.state != 'ready':
+            async with entry.lock:
+                if entry.state != 'ready':
+                    await self._load(entry)
+
+        entry.last_used = time.time()
+        return entry.model
+
+    async def _load(self, entry: ModelEntry):
+        entry.state = 'loading'
+        start_time = time.time()
+        try:
+            model = await entry.loader()
+        except Exception as e:
+            entry.state = 'failed'
+            entry.error = str(e)
+            logger.warning(f"Impossible de charger le modèle {entry.name}: {e}")
+            return
+
+        if model is None:
+            entry.state = 'failed'
+            entry.error = 'Modèle indisponible'
+            return
+
+        entry.model = model
+        entry.size_mb = estimate_model_size_mb(model, default=entry.declared_size_mb)
+        entry.load_time = time.time() - start_time
+        entry.last_used = time.time()
+        entry.loads += 1
+        entry.error = None
+        entry.state = 'ready'
+        logger.info(f"Modèle {entry.name} chargé en {entry.load_time:.1f}s ({entry.size_mb:.0f} MB)")
+
+        self._enforce_budget(keep=entry.name)
+
+    def unload(self, name: str):
+        """
+        Décharge un modèle ; il sera rechargé à sa prochaine utilisation
+        """
+        entry = self.entries.get(name)
+        if entry is None or entry.state != 'ready':
+            return
+
+        entry.model = None
+        entry.size_mb = 0.0
+        entry.state = 'unloaded'
+        logger.info(f"Modèle {name} déchargé")
+
+    def loaded_size_mb(self) -> float:
+        return sum(entry.size_mb for entry in self.entries.values() if entry.state == 'ready')
+
+    def _enforce_budget(self, keep: str):
+        """
+        Décharge les modèles les moins récemment utilisés au-delà du budget
+        """
+        if not self.memory_budget_mb:
+            return
+
+        candidates = sorted(
+            (entry for entry in self.entries.values() if entry.state == 'ready' and entry.name != keep),
+            key=lambda entry: entry.last_used or 0
+        )
+        for entry in candidates:
+            if self.loaded_size_mb() <= self.memory_budget_mb:
+                break
+            self.unload(entry.name)
+
+    async def warm_up(self, names: Optional[List[str]] = None):
+        """
+        Charge à l'avance les modèles demandés
+        """
+        if names is None:
+            names = [name.strip() for name in MODELS_WARMUP.split(',') if name.strip()]
+        for name in names:
+            if name in self.entries:
+                await self.get(name)
+
+    def start(self):
+        """
+        Démarre le déchargement périodique des modèles inactifs
+        """
+        if self.idle_timeout and self._idle_task is None:
+            self._idle_task = asyncio.create_task(self._unload_idle_loop())
+
+    async def stop(self):
+        if self._idle_task:
+            self._idle_task.cancel()
+            self._idle_task = None
+
+    async def _unload_idle_loop(self):
+        while True:
+            await asyncio.sleep(max(self.idle_timeout / 4, 1))
+            limit = time.time() - self.idle_timeout
+            for entry in self.entries.values():
+                if entry.state == 'ready' and entry.last_used and entry.last_used < limit:
+                    self.unload(entry.name)
+
+    def is_ready(self) -> bool:
+        """
+        Vrai si tous les modèles requis ont été chargés au moins une fois
+        """
+        return all(
+            entry.state in ('ready', 'unloaded')
+            for entry in self.entries.values() if entry.required
+        )
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            'memory_budget_mb': self.memory_budget_mb,
+            'loaded_size_mb': round(self.loaded_size_mb(), 1),
+            'models': {name: entry.to_dict() for name, entry in self.entries.items()}
+        }
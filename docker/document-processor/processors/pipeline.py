@@ -0,0 +1,541 @@
+import os
+import time
+import asyncio
+import hashlib
+from contextlib import aclosing
+from typing import Dict, Any, AsyncIterator, List, Optional, Callable, Awaitable, Set, Tuple
+from loguru import logger
+
+from processors.document_processor import DocumentProcessor, StreamedText
+from processors.ai_classifier import AIClassifier
+from utils.cache import CacheManager, build_stage_key
+from utils.file_utils import get_file_type, SpooledUpload
+from utils.metrics import track_stage
+
+# Nombre de documents d'un lot traités simultanément
+BATCH_CONCURRENCY = int(os.environ.get('BATCH_CONCURRENCY', 8))
+
+# Espaces de noms du cache, invalidables par compteur de génération, dont
+# dépend chaque étape (les étapes ML dépendent aussi du texte extrait)
+CACHE_NAMESPACES = ['extraction', 'ml']
+STAGE_NAMESPACES = {
+    'extraction': ['extraction'],
+    'stream-extraction': ['extraction'],
+    'classification': ['extraction', 'ml'],
+    'entities': ['extraction', 'ml'],
+    'summary': ['extraction', 'ml'],
+    'classify-text': ['ml']
+}
+
+# Avancement (0 à 1) atteint au début de chaque étape
+STAGE_PROGRESS = {
+    'extraction': 0.1,
+    'classification': 0.6,
+    'entities': 0.75,
+    'summary': 0.85
+}
+
+# Métadonnées propres à l'upload : exclues des extractions mises en cache
+# (adressées par contenu) et renseignées depuis l'upload courant à la lecture
+UPLOAD_METADATA_FIELDS = ('file_size', 'file_type', 'original_filename')
+
+def without_upload_metadata(extraction: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Extraction à mettre en cache, sans les métadonnées propres à l'upload
+    """
+    metadata = {
+        key: value
+        for key, value in extraction.get('metadata', {}).items()
+        if key not in UPLOAD_METADATA_FIELDS
+    }
+    return {**extraction, 'metadata': metadata}
+
+def with_upload_metadata(extraction: Dict[str, Any], upload: SpooledUpload, file_type: str) -> Dict[str, Any]:
+    """
+    Extraction lue en cache, complétée par les métadonnées de l'upload courant
+    """
+    metadata = {
+        **extraction.get('metadata', {}),
+        'file_size': upload.size,
+        'file_type': file_type,
+        'original_filename': os.path.basename(upload.path)
+    }
+    return {**extraction, 'metadata': metadata}
+
+class DocumentPipeline:
+    """
+    Enchaîne extraction, classification, entités et résumé pour un fichier,
+    chaque étape étant mise en cache séparément
+    """
+
+    def __init__(
+        self,
+        document_processor: DocumentProcessor,
+        ai_classifier: AIClassifier,
+        cache_manager: CacheManager,
+        cache_expire: int = 3600
+    ):
+        self.document_processor = document_processor
+        self.ai_classifier = ai_classifier
+        self.cache_manager = cache_manager
+        self.cache_expire = cache_expire
+        self._pending_writes: Set[asyncio.Task] = set()
+        self.generations: Dict[str, int] = {}
+
+    def _schedule_cache_write(self, values: Dict[str, Any]):
+        """
+        Écriture en cache différée (un seul aller-retour), sans retarder la réponse
+        """
+        if len(values) == 1:
+            (cache_key, value), = values.items()
+            write = self.cache_manager.set(cache_key, value, expire=self.cache_expire)
+        else:
+            write = self.cache_manager.set_many(values, expire=self.cache_expire)
+
+        task = asyncio.create_task(write)
+        self._pending_writes.add(task)
+        task.add_done_callback(self._pending_writes.discard)
+
+    async def run_cached_stage(
+        self,
+        cache_key: str,
+        compute: Callable[[], Awaitable[Any]],
+        stage: Optional[str] = None
+    ) -> Any:
+        """
+        Exécute une étape du traitement en réutilisant son résultat en cache
+
+        Le résultat est enveloppé afin qu'une valeur nulle (ex. pas de résumé)
+        soit elle aussi mise en cache. Si `stage` est fourni, la durée du
+        calcul (hors cache) est mesurée pour cette étape.
+        """
+        cached = await self.cache_manager.get(cache_key)
+        if cached is not None:
+            logger.info(f"Résultat en cache pour {cache_key}")
+            return cached['result']
+
+        if stage:
+            with track_stage(stage):
+                result = await compute()
+        else:
+            result = await compute()
+
+        # Mise en cache du résultat de l'étape
+        self._schedule_cache_write({cache_key: {'result': result}})
+        return result
+
+    def _extraction_options(
+        self,
+        extract_text: bool,
+        perform_ocr: bool,
+        language: str,
+        include_layout: bool
+    ) -> Dict[str, Any]:
+        """
+        Options influant sur le texte extrait, intégrées aux clés de cache
+        """
+        extraction_options = {
+            'extract_text': extract_text,
+            'perform_ocr': perform_ocr,
+            'language': language
+        }
+        if include_layout:
+            # Option ajoutée seulement si active pour conserver les clés existantes
+            extraction_options['include_layout'] = True
+        return extraction_options
+
+    async def _refresh_generations(self):
+        """
+        Relit les compteurs de génération des espaces de noms du cache
+        """
+        self.generations = await self.cache_manager.get_generations(CACHE_NAMESPACES)
+
+    def _stage_version(self, stage: str) -> str:
+        """
+        Version d'une étape : extracteur et/ou modèles, puis générations non nulles
+        """
+        if stage in ('extraction', 'stream-extraction'):
+            version = self.document_processor.version
+        elif stage == 'classify-text':
+            version = self.ai_classifier.version
+        else:
+            version = f"{self.document_processor.version}-{self.ai_classifier.version}"
+
+        # Les entités dépendent aussi des patterns enregistrés
+        if stage in ('entities', 'classify-text'):
+            version = f"{version}-{self.ai_classifier.entity_engine.version}"
+
+        # Générations omises tant qu'elles valent 0 pour conserver les clés existantes
+        for namespace in STAGE_NAMESPACES[stage]:
+            generation = self.generations.get(namespace, 0)
+            if generation:
+                version = f"{version}.{namespace}{generation}"
+        return version
+
+    def _stage_key(self, stage: str, upload: SpooledUpload, extraction_options: Dict[str, Any]) -> str:
+        """
+        Clé de cache adressée par contenu : empreinte du fichier + options + versions
+        """
+        return build_stage_key(stage, upload.digest, extraction_options, self._stage_version(stage))
+
+    async def _extract(
+        self,
+        upload: SpooledUpload,
+        file_id: str,
+        extraction_options: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        Étape d'extraction, mise en cache
+        """
+        # Détection du type de fichier
+        with track_stage('type_detection'):
+            file_type = get_file_type(upload.path, mime_type=upload.mime_type)
+
+        cache_key = self._stage_key('extraction', upload, extraction_options)
+        cached = await self.cache_manager.get(cache_key)
+        if cached is not None:
+            logger.info(f"Résultat en cache pour {cache_key}")
+            return with_upload_metadata(cached['result'], upload, file_type)
+
+        logger.info(f"Traitement du fichier {file_id} de type {file_type}")
+        with track_stage('extraction', file_type):
+            extraction = await self.document_processor.process_file(
+                upload.path,
+                file_type=file_type,
+                extract_text=extraction_options['extract_text'],
+                perform_ocr=extraction_options['perform_ocr'],
+                language=extraction_options['language'],
+                include_layout=extraction_options.get('include_layout', False)
+            )
+
+        self._schedule_cache_write({cache_key: {'result': without_upload_metadata(extraction)}})
+        return extraction
+
+    async def _document_stages(
+        self,
+        upload: SpooledUpload,
+        text_content: str,
+        extraction_options: Dict[str, Any],
+        extract_entities: bool,
+        generate_summary: bool,
+        report: Callable[[str], None]
+    ) -> Tuple[Optional[List[Dict[str, Any]]], Optional[str]]:
+        """
+        Étapes traitées document par document : entités et résumé
+        """
+        language = extraction_options['language']
+        entities = None
+        summary = None
+
+        if extract_entities and text_content:
+            report('entities')
+            entities = await self.run_cached_stage(
+                self._stage_key('entities', upload, extraction_options),
+                lambda: self.ai_classifier.extract_entities(text_content, language=language),
+                stage='entities'
+            )
+
+        if generate_summary and text_content:
+            report('summary')
+            summary = await self.run_cached_stage(
+                self._stage_key('summary', upload, extraction_options),
+                lambda: self.ai_classifier.generate_summary(text_content, language=language),
+                stage='summary'
+            )
+
+        return entities, summary
+
+    def _build_result(
+        self,
+        file_id: str,
+        extraction: Dict[str, Any],
+        classification: Optional[Dict[str, Any]],
+        entities: Optional[List[Dict[str, Any]]],
+        summary: Optional[str],
+        start_time: float
+    ) -> Dict[str, Any]:
+        return {
+            'file_id': file_id,
+            'file_type': extraction['metadata'].get('file_type', ''),
+            'text_content': extraction.get('text_content', ''),
+            'metadata': extraction.get('metadata', {}),
+            'classification': classification,
+            'entities': entities,
+            'summary': summary,
+            'layout': extraction.get('layout'),
+            'processing_time': time.time() - start_time,
+            'status': 'success'
+        }
+
+    async def run(
+        self,
+        upload: SpooledUpload,
+        file_id: str,
+        extract_text: bool = True,
+        perform_ocr: bool = True,
+        classify_document: bool = True,
+        extract_entities: bool = True,
+        generate_summary: bool = False,
+        language: str = "fr",
+        include_layout: bool = False,
+        progress: Optional[Callable[[str, float], None]] = None
+    ) -> Dict[str, Any]:
+        """
+        Traite un fichier déjà copié sur disque et retourne le résultat complet
+        """
+        start_time = time.time()
+
+        def report(stage: str):
+            if progress:
+                progress(stage, STAGE_PROGRESS.get(stage, 1.0))
+
+        extraction_options = self._extraction_options(extract_text, perform_ocr, language, include_layout)
+        await self._refresh_generations()
+
+        # Traitement du document
+        report('extraction')
+        extraction = await self._extract(upload, file_id, extraction_options)
+        text_content = extraction.get('text_content', '')
+
+        # Classification IA si demandée
+        classification = None
+        if classify_document and text_content:
+            report('classification')
+            classification = await self.run_cached_stage(
+                self._stage_key('classification', upload, extraction_options),
+                lambda: self.ai_classifier.classify_document(text_content, language=language),
+                stage='classification'
+            )
+
+        entities, summary = await self._document_stages(
+            upload, text_content, extraction_options, extract_entities, generate_summary, report
+        )
+
+        return self._build_result(file_id, extraction, classification, entities, summary, start_time)
+
+    async def stream(
+        self,
+        upload: SpooledUpload,
+        file_id: str,
+        perform_ocr: bool = True,
+        classify_document: bool = True,
+        extract_entities: bool = True,
+        generate_summary: bool = False,
+        language: str = "fr"
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Traite un fichier en diffusant les événements au fil de l'eau
+
+        Événements : 'start', 'metadata', 'unit' (page, diapositive, feuille...),
+        'extraction', puis 'classification', 'entities' et 'summary' selon les
+        options, et enfin 'done'. Un document déjà extrait par /process est
+        diffusé en une seule unité. Le texte reconstitué à partir des unités
+        diffusées est mis en cache sous ses propres clés (étape
+        'stream-extraction', option 'source' des étapes ML) : run() ne sert
+        jamais un résultat produit par stream().
+        """
+        start_time = time.time()
+        extraction_options = self._extraction_options(True, perform_ocr, language, False)
+        await self._refresh_generations()
+
+        with track_stage('type_detection'):
+            file_type = get_file_type(upload.path, mime_type=upload.mime_type)
+        yield {'type': 'start', 'file_id': file_id, 'file_type': file_type}
+
+        # Le résultat de run() fait référence ; à défaut, celui d'une diffusion précédente
+        extraction_key = self._stage_key('extraction', upload, extraction_options)
+        stream_key = self._stage_key('stream-extraction', upload, extraction_options)
+        cached = await self.cache_manager.get_many([extraction_key, stream_key])
+        # Options des étapes ML : leurs résultats suivent la provenance du texte
+        stage_options = extraction_options
+        if extraction_key not in cached:
+            stage_options = {**extraction_options, 'source': 'stream'}
+
+        cache_key = extraction_key if extraction_key in cached else stream_key
+        if cache_key in cached:
+            logger.info(f"Résultat en cache pour {cache_key}")
+            extraction = with_upload_metadata(cached[cache_key]['result'], upload, file_type)
+            yield {
+                'type': 'unit', 'unit': 'document', 'index': 1, 'source': 'cache',
+                'text': extraction.get('text_content', '')
+            }
+            yield {'type': 'extraction', 'metadata': extraction.get('metadata', {}), 'cached': True}
+        else:
+            # Le texte complet est reconstitué pour le cache et les étapes ML
+            collected = StreamedText(file_type)
+            metadata: Optional[Dict[str, Any]] = None
+            extraction_events = self.document_processor.stream_file(
+                upload.path, file_type, perform_ocr=perform_ocr, language=language
+            )
+            # Fermeture explicite si le client s'arrête en cours de diffusion :
+            # les workers et l'OCR en cours sont interrompus immédiatement
+            with track_stage('extraction', file_type):
+                async with aclosing(extraction_events) as events:
+                    async for event in events:
+                        if event['type'] == 'unit':
+                            collected.add(event)
+                            event = {key: value for key, value in event.items() if key != 'content'}
+                        elif event['type'] == 'extraction':
+                            metadata = event['metadata']
+                        yield event
+
+            # Fin normale de la diffusion : mise en cache seulement si
+            # l'extraction s'est terminée (événement 'extraction' reçu)
+            extraction = {'text_content': collected.text(), 'metadata': metadata or {}}
+            if metadata is not None:
+                self._schedule_cache_write({stream_key: {'result': without_upload_metadata(extraction)}})
+
+        text_content = extraction.get('text_content', '')
+
+        if classify_document and text_content:
+            classification = await self.run_cached_stage(
+                self._stage_key('classification', upload, stage_options),
+                lambda: self.ai_classifier.classify_document(text_content, language=language),
+                stage='classification'
+            )
+            yield {'type': 'classification', 'classification': classification}
+
+        if extract_entities and text_content:
+            entities = await self.run_cached_stage(
+                self._stage_key('entities', upload, stage_options),
+                lambda: self.ai_classifier.extract_entities(text_content, language=language),
+                stage='entities'
+            )
+            yield {'type': 'entities', 'entities': entities}
+
+        if generate_summary and text_content:
+            summary = await self.run_cached_stage(
+                self._stage_key('summary', upload, stage_options),
+                lambda: self.ai_classifier.generate_summary(text_content, language=language),
+                stage='summary'
+            )
+            yield {'type': 'summary', 'summary': summary}
+
+        yield {'type': 'done', 'file_id': file_id, 'processing_time': time.time() - start_time}
+
+    async def classify_text(self, text: str, language: str = "fr") -> Dict[str, Any]:
+        """
+        Classification et entités d'un texte brut, mises en cache par contenu
+        """
+        async def classify():
+            with track_stage('classification'):
+                classification = await self.ai_classifier.classify_document(text, language=language)
+            with track_stage('entities'):
+                entities = await self.ai_classifier.extract_entities(text, language=language)
+            return {'classification': classification, 'entities': entities}
+
+        await self._refresh_generations()
+        cache_key = build_stage_key(
+            'classify-text',
+            hashlib.sha256(text.encode('utf-8')).hexdigest(),
+            {'language': language},
+            self._stage_version('classify-text')
+        )
+        return await self.run_cached_stage(cache_key, classify)
+
+    async def run_batch(
+        self,
+        items: List[Tuple[SpooledUpload, str]],
+        extract_text: bool = True,
+        perform_ocr: bool = True,
+        classify_document: bool = True,
+        extract_entities: bool = True,
+        generate_summary: bool = False,
+        language: str = "fr",
+        include_layout: bool = False,
+        concurrency: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Traite un lot de fichiers (upload, file_id) en parallèle
+
+        L'extraction, les entités et le résumé sont traités par document ; la
+        classification des documents non présents en cache est regroupée en
+        un seul passage vectorisé du modèle. Chaque élément du résultat
+        contient soit 'result', soit 'error' : un document en échec ne fait
+        pas échouer le lot.
+        """
+        start_time = time.time()
+        semaphore = asyncio.Semaphore(concurrency or BATCH_CONCURRENCY)
+        extraction_options = self._extraction_options(extract_text, perform_ocr, language, include_layout)
+        await self._refresh_generations()
+
+        async def extract_item(upload: SpooledUpload, file_id: str):
+            async with semaphore:
+                return await self._extract(upload, file_id, extraction_options)
+
+        extractions = await asyncio.gather(
+            *[extract_item(upload, file_id) for upload, file_id in items],
+            return_exceptions=True
+        )
+        errors: Dict[int, str] = {
+            index: str(extraction)
+            for index, extraction in enumerate(extractions)
+            if isinstance(extraction, Exception)
+        }
+        texts = {
+            index: extraction.get('text_content', '')
+            for index, extraction in enumerate(extractions)
+            if index not in errors
+        }
+
+        # Classification partagée : lecture groupée du cache puis un seul lot pour les absents
+        classifications: Dict[int, Optional[Dict[str, Any]]] = {}
+        if classify_document:
+            cache_keys = {
+                index: self._stage_key('classification', items[index][0], extraction_options)
+                for index, text_content in texts.items()
+                if text_content
+            }
+            cached = await self.cache_manager.get_many(list(cache_keys.values()))
+            pending = []
+            for index, cache_key in cache_keys.items():
+                if cache_key in cached:
+                    classifications[index] = cached[cache_key]['result']
+                else:
+                    pending.append((index, cache_key))
+
+            if pending:
+                try:
+                    with track_stage('classification'):
+                        results = await self.ai_classifier.classify_documents(
+                            [texts[index] for index, _ in pending],
+                            language=language
+                        )
+                    writes = {}
+                    for (index, cache_key), classification in zip(pending, results):
+                        classifications[index] = classification
+                        writes[cache_key] = {'result': classification}
+                    self._schedule_cache_write(writes)
+                except Exception as e:
+                    for index, _ in pending:
+                        errors[index] = f"Erreur de classification: {e}"
+
+        async def finish_item(index: int):
+            async with semaphore:
+                return await self._document_stages(
+                    items[index][0], texts[index], extraction_options,
+                    extract_entities, generate_summary, lambda stage: None
+                )
+
+        indexes = [index for index in texts if index not in errors]
+        stages = await asyncio.gather(*[finish_item(index) for index in indexes], return_exceptions=True)
+
+        results: List[Dict[str, Any]] = []
+        stage_results = dict(zip(indexes, stages))
+        for index, (upload, file_id) in enumerate(items):
+            stage_result = stage_results.get(index)
+            if isinstance(stage_result, Exception):
+                errors[index] = str(stage_result)
+
+            if index in errors:
+                logger.error(f"Erreur lors du traitement de {file_id}: {errors[index]}")
+                results.append({'file_id': file_id, 'status': 'error', 'error': errors[index]})
+                continue
+
+            entities, summary = stage_result
+            result = self._build_result(
+                file_id, extractions[index], classifications.get(index), entities, summary, start_time
+            )
+            results.append({'file_id': file_id, 'status': 'success', 'result': result})
+
+        return results
@@ -0,0 +1,11 @@
+"""
+Tests du service d'extraction
+
+Usage (depuis docker/document-processor) :
+    python -m pytest tests
+"""
+import os
+import sys
+
+SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SERVICE_DIR)
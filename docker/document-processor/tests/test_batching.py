@@ -0,0 +1,78 @@
+"""
+Micro-lots : vidage à la taille maximale, à la fin de la fenêtre, erreurs
+"""
+import asyncio
+
+from utils.batching import MicroBatcher
+
+class RecordingModel:
+    """
+    Modèle factice : enregistre les lots reçus et double chaque élément
+    """
+
+    def __init__(self):
+        self.batches = []
+
+    async def __call__(self, items):
+        self.batches.append(list(items))
+        return [item * 2 for item in items]
+
+def test_full_batch_is_flushed_without_waiting_for_window():
+    model = RecordingModel()
+
+    async def scenario():
+        # Fenêtre d'une minute : seule la taille peut déclencher le vidage
+        batcher = MicroBatcher(model, max_batch_size=3, window_ms=60000)
+        results = await asyncio.wait_for(batcher.submit_many([1, 2, 3, 4, 5, 6]), timeout=1)
+        return batcher, results
+
+    batcher, results = asyncio.run(scenario())
+    assert results == [2, 4, 6, 8, 10, 12]
+    assert model.batches == [[1, 2, 3], [4, 5, 6]]
+    assert batcher.get_stats()['max_observed_batch_size'] == 3
+
+def test_partial_batch_is_flushed_when_window_ends():
+    model = RecordingModel()
+
+    async def scenario():
+        batcher = MicroBatcher(model, max_batch_size=32, window_ms=20)
+        first = asyncio.create_task(batcher.submit(1))
+        second = asyncio.create_task(batcher.submit(2))
+        await asyncio.sleep(0)
+        # Pendant la fenêtre, les éléments attendent
+        assert batcher.pending() == 2
+        assert model.batches == []
+        return await asyncio.wait_for(asyncio.gather(first, second), timeout=1), batcher
+
+    results, batcher = asyncio.run(scenario())
+    assert results == [2, 4]
+    assert model.batches == [[1, 2]]
+    assert batcher.pending() == 0
+
+def test_batch_error_is_raised_to_every_caller():
+    async def failing_model(items):
+        raise RuntimeError('modèle indisponible')
+
+    async def scenario():
+        batcher = MicroBatcher(failing_model, max_batch_size=2, window_ms=60000)
+        return await asyncio.gather(batcher.submit(1), batcher.submit(2), return_exceptions=True)
+
+    results = asyncio.run(scenario())
+    assert len(results) == 2
+    for result in results:
+        assert isinstance(result, RuntimeError)
+
+def test_size_histogram():
+    model = RecordingModel()
+
+    async def scenario():
+        batcher = MicroBatcher(model, max_batch_size=5, window_ms=1)
+        await batcher.submit_many(list(range(5)))
+        await batcher.submit(1)
+        return batcher.get_stats()
+
+    stats = asyncio.run(scenario())
+    assert stats['batches'] == 2
+    assert stats['items'] == 6
+    assert stats['batch_size_histogram']['1'] == 1
+    assert stats['batch_size_histogram']['8'] == 1
@@ -0,0 +1,79 @@
+"""
+Disjoncteur Redis : ouverture, essai semi-ouvert, fermeture
+"""
+import pytest
+
+from utils import cache
+from utils.cache import CircuitBreaker
+
+@pytest.fixture
+def clock(monkeypatch):
+    """
+    Horloge monotone contrôlée par le test
+    """
+    now = [1000.0]
+    monkeypatch.setattr(cache.time, 'monotonic', lambda: now[0])
+    return now
+
+def test_opens_after_threshold_consecutive_failures(clock):
+    breaker = CircuitBreaker(threshold=3, reset_timeout=30)
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == 'closed'
+    assert breaker.allow()
+
+    breaker.record_failure()
+    assert breaker.state == 'open'
+    assert not breaker.allow()
+    assert breaker.get_stats()['short_circuited'] == 1
+
+def test_success_resets_failure_count(clock):
+    breaker = CircuitBreaker(threshold=2, reset_timeout=30)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == 'closed'
+
+def test_single_trial_after_reset_timeout_then_close(clock):
+    breaker = CircuitBreaker(threshold=1, reset_timeout=30)
+    breaker.record_failure()
+
+    clock[0] += 29
+    assert not breaker.allow()
+
+    clock[0] += 1
+    assert breaker.allow()
+    assert breaker.state == 'half_open'
+    # Un seul essai tant que son résultat n'est pas connu
+    assert not breaker.allow()
+
+    breaker.record_success()
+    assert breaker.state == 'closed'
+    assert breaker.allow()
+
+def test_failed_trial_reopens(clock):
+    breaker = CircuitBreaker(threshold=5, reset_timeout=30)
+    for _ in range(5):
+        breaker.record_failure()
+
+    clock[0] += 30
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == 'open'
+    assert not breaker.allow()
+
+    clock[0] += 30
+    assert breaker.allow()
+
+def test_trial_without_result_is_retried_after_reset_timeout(clock):
+    breaker = CircuitBreaker(threshold=1, reset_timeout=30)
+    breaker.record_failure()
+
+    clock[0] += 30
+    assert breaker.allow()
+    # Appel d'essai annulé : ni succès ni échec enregistré
+    clock[0] += 29
+    assert not breaker.allow()
+    clock[0] += 1
+    assert breaker.allow()
+    assert breaker.state == 'half_open'
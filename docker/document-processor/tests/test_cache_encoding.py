@@ -0,0 +1,86 @@
+"""
+Format binaire du cache : enveloppe msgpack/zstd versionnée, textes séparés
+"""
+import asyncio
+
+import msgpack
+import pytest
+
+from utils.cache import (
+    CACHE_COMPRESS_MIN_BYTES, CACHE_FORMAT_MAGIC, CACHE_FORMAT_VERSION, CACHE_TEXT_MIN_CHARS,
+    FLAG_ZSTD, CacheManager, MemoryCache, decode_value, encode_value, text_key
+)
+
+class FakeRedis:
+    """
+    Client Redis minimal en mémoire (lectures MGET uniquement)
+    """
+
+    def __init__(self, data):
+        self.data = data
+
+    async def mget(self, keys):
+        return [self.data.get(key) for key in keys]
+
+def test_small_value_round_trip_uncompressed():
+    value = {'text_content': 'Bonjour', 'metadata': {'pages': 2, 'ratio': 0.5, 'ocr': None}, 'items': [1, 'a']}
+    data = encode_value(value)
+
+    assert data[:2] == CACHE_FORMAT_MAGIC
+    assert data[2] == CACHE_FORMAT_VERSION
+    assert not data[3] & FLAG_ZSTD
+    assert decode_value(data) == (value, set())
+
+def test_large_value_is_compressed():
+    value = {'text_content': 'facture ' * CACHE_COMPRESS_MIN_BYTES}
+    data = encode_value(value)
+
+    assert data[3] & FLAG_ZSTD
+    assert len(data) < CACHE_COMPRESS_MIN_BYTES
+    assert decode_value(data)[0] == value
+
+def test_large_texts_are_extracted_as_references():
+    text = 'x' * CACHE_TEXT_MIN_CHARS
+    texts = {}
+    data = encode_value({'text_content': text, 'short': 'court'}, texts)
+
+    assert list(texts.values()) == [text]
+    value, refs = decode_value(data)
+    assert refs == set(texts)
+    assert value['short'] == 'court'
+    assert value['text_content'].digest in texts
+
+@pytest.mark.parametrize('data', [
+    b'',
+    b'DP',
+    b'XX\x01\x00' + msgpack.packb('valeur'),
+    CACHE_FORMAT_MAGIC + bytes((CACHE_FORMAT_VERSION + 1, 0)) + msgpack.packb('valeur'),
+    b'{"text_content": "ancien format JSON"}',
+])
+def test_unknown_format_is_rejected(data):
+    with pytest.raises(ValueError):
+        decode_value(data)
+
+def test_unknown_extension_is_rejected():
+    body = msgpack.packb(msgpack.ExtType(42, b'?'))
+    with pytest.raises(ValueError):
+        decode_value(CACHE_FORMAT_MAGIC + bytes((CACHE_FORMAT_VERSION, 0)) + body)
+
+def test_manager_resolves_and_skips_text_blobs():
+    text = 'y' * CACHE_TEXT_MIN_CHARS
+    manager = CacheManager(client=None, memory=MemoryCache(max_bytes=0))
+    entries, _ = manager._encode_entries({
+        'doc:ok': {'result': {'text_content': text}},
+        'doc:legacy': {'result': 'ancien'}
+    })
+    # Entrée d'un ancien format : absente du cache
+    entries['doc:legacy'] = b'{"result": "ancien"}'
+    manager.redis_client = FakeRedis(entries)
+
+    results = asyncio.run(manager.get_many(['doc:ok', 'doc:legacy', 'doc:absent']))
+    assert results == {'doc:ok': {'result': {'text_content': text}}}
+
+    # Texte référencé illisible : l'entrée qui le cite est absente
+    (blob_key,) = [key for key in entries if key.startswith(text_key(''))]
+    entries[blob_key] = b'corrompu'
+    assert asyncio.run(manager.get('doc:ok')) is None
@@ -0,0 +1,76 @@
+"""
+Cache en mémoire : éviction LRU bornée en octets, expiration
+"""
+import pytest
+
+from utils import cache
+from utils.cache import MemoryCache
+
+def test_least_recently_used_entry_is_evicted():
+    memory = MemoryCache(max_bytes=30, ttl=60)
+    memory.set('a', 'A', 10)
+    memory.set('b', 'B', 10)
+    memory.set('c', 'C', 10)
+
+    # 'a' devient la plus récemment utilisée : 'b' est évincée
+    assert memory.get('a') == 'A'
+    memory.set('d', 'D', 10)
+
+    assert memory.get('b') is None
+    assert [memory.get(key) for key in ('a', 'c', 'd')] == ['A', 'C', 'D']
+    assert memory.size == 30
+    assert memory.evictions == 1
+
+def test_several_entries_evicted_for_a_large_one():
+    memory = MemoryCache(max_bytes=30, ttl=60)
+    for key in ('a', 'b', 'c'):
+        memory.set(key, key, 10)
+    memory.set('big', 'BIG', 25)
+
+    assert memory.get('a') is None
+    assert memory.get('b') is None
+    assert memory.get('c') is None
+    assert memory.get('big') == 'BIG'
+    assert memory.size == 25
+    assert memory.evictions == 3
+
+def test_entry_larger_than_cache_is_not_stored():
+    memory = MemoryCache(max_bytes=30, ttl=60)
+    memory.set('a', 'A', 10)
+    memory.set('huge', 'HUGE', 31)
+
+    assert memory.get('huge') is None
+    assert memory.get('a') == 'A'
+    assert memory.size == 10
+
+def test_replacing_an_entry_updates_size():
+    memory = MemoryCache(max_bytes=30, ttl=60)
+    memory.set('a', 'A', 10)
+    memory.set('a', 'AA', 20)
+
+    assert memory.get('a') == 'AA'
+    assert memory.size == 20
+    assert memory.evictions == 0
+
+def test_expired_entry_is_a_miss(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache.time, 'monotonic', lambda: now[0])
+    memory = MemoryCache(max_bytes=100, ttl=60)
+    memory.set('a', 'A', 10)
+    # TTL de l'entrée plafonné par celui du cache
+    memory.set('b', 'B', 10, ttl=3600)
+
+    now[0] += 60
+    assert memory.get('a') is None
+    assert memory.get('b') is None
+    assert memory.size == 0
+    assert memory.get_stats()['expirations'] == 2
+
+@pytest.mark.parametrize('pattern, remaining', [('doc:extraction:*', ['doc:ml:1']), ('*', [])])
+def test_clear_by_pattern(pattern, remaining):
+    memory = MemoryCache(max_bytes=100, ttl=60)
+    for key in ('doc:extraction:1', 'doc:extraction:2', 'doc:ml:1'):
+        memory.set(key, key, 10)
+
+    memory.clear(pattern)
+    assert [key for key in ('doc:extraction:1', 'doc:extraction:2', 'doc:ml:1') if memory.get(key)] == remaining
@@ -0,0 +1,95 @@
+"""
+Moteur d'entités : mêmes entités que l'ancienne extraction pattern par pattern
+"""
+import re
+
+import pytest
+
+from benchmarks.entities import VARIANTS, generate_text
+from processors.classifier_tasks import deduplicate_entities, extract_entities
+from processors.entity_engine import EntityEngine, default_entity_engine
+
+# Patterns de l'ancienne extraction : identifiants (re.IGNORECASE, confiance
+# 0.8) puis entités nommées (sensibles à la casse, confiance 0.6)
+LEGACY_PATTERNS = [
+    ('email', r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', re.IGNORECASE, 0.8),
+    ('phone', r'\b(?:\+33|0)[1-9](?:[0-9]{8})\b', re.IGNORECASE, 0.8),
+    ('date', r'\b\d{1,2}[/-]\d{1,2}[/-]\d{2,4}\b', re.IGNORECASE, 0.8),
+    ('amount', r'\b\d+[,.]?\d*\s*€?\s*euros?\b', re.IGNORECASE, 0.8),
+    ('siret', r'\b\d{14}\b', re.IGNORECASE, 0.8),
+    ('siren', r'\b\d{9}\b', re.IGNORECASE, 0.8),
+    ('organization', r'\b[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*\s+(?:SA|SARL|SAS|EURL|SNC)\b', 0, 0.6),
+    ('person', r'\b(?:M\.|Mme|Monsieur|Madame)\s+[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*\b', 0, 0.6),
+    ('location', r'\b\d+[,\s]+[A-Z][a-z]+(?:\s+[A-Z][a-z]+)*[,\s]+\d{5}\s+[A-Z][a-z]+\b', 0, 0.6),
+]
+
+SAMPLES = [
+    "Contact : jean.dupont@exemple.fr ou +33612345678, facture du 12/03/2024.",
+    "Montant : 1250,50 € euros, soit 300 euros de TVA. SIRET 12345678901234, SIREN 123456789.",
+    "Madame Claire Martin, gérante de Dupont Conseil SARL, 12, Rue De Paris, 75001 Paris.",
+    "M. Jean Durand et Mme Sophie Petit (Atelier Moreau SAS) ; appeler le 0145678901.",
+    "Aucune entité ici, seulement du texte ordinaire sans chiffres.",
+    "",
+]
+
+def legacy_extract(text):
+    entities = []
+    for entity_type, pattern, flags, confidence in LEGACY_PATTERNS:
+        for match in re.finditer(pattern, text, flags):
+            entities.append({'type': entity_type, 'value': match.group(), 'confidence': confidence})
+    return deduplicate_entities(entities)
+
+def entity_keys(entities):
+    return {(entity['type'], entity['value'].lower(), entity['confidence']) for entity in entities}
+
+def test_default_engine_registers_the_legacy_patterns():
+    engine = default_entity_engine()
+    assert [(pattern.entity_type, pattern.pattern, pattern.flags, pattern.confidence) for pattern in engine.patterns] == LEGACY_PATTERNS
+
+@pytest.mark.parametrize('text', SAMPLES)
+def test_same_entities_as_legacy_extraction(text):
+    assert entity_keys(extract_entities(text, default_entity_engine())) == entity_keys(legacy_extract(text))
+
+@pytest.mark.parametrize('variant', VARIANTS)
+def test_same_entities_on_benchmark_corpus(variant):
+    text = generate_text(variant, 200_000)
+    assert entity_keys(extract_entities(text, default_entity_engine())) == entity_keys(legacy_extract(text))
+
+def test_entities_are_returned_in_text_order_with_offsets():
+    text = "M. Jean Durand : jean@exemple.fr, le 01/02/2024"
+    entities = default_entity_engine().extract(text)
+
+    assert [entity['type'] for entity in entities] == ['person', 'email', 'date']
+    for entity in entities:
+        assert text[entity['start']:entity['end']] == entity['value']
+
+def test_earlier_pattern_wins_on_overlap():
+    engine = EntityEngine()
+    engine.register('long', r'\b\d{4}\b')
+    engine.register('short', r'\b\d{4}')
+    assert [entity['type'] for entity in engine.extract('1234 5678')] == ['long', 'long']
+
+def test_prefilter_skips_absent_patterns():
+    engine = EntityEngine()
+    engine.register('email', r'\b\w+@\w+\.fr\b', prefilter='@')
+    engine.register('word', r'\bbonjour\b')
+    assert [entity['type'] for entity in engine.extract('bonjour a@b.fr')] == ['word', 'email']
+    assert [entity['type'] for entity in engine.extract('bonjour')] == ['word']
+
+def test_flags_are_scoped_to_their_pattern():
+    engine = EntityEngine()
+    engine.register('insensitive', r'\bsarl\b', re.IGNORECASE)
+    engine.register('sensitive', r'\bSAS\b')
+    assert [entity['value'] for entity in engine.extract('SARL sas SAS')] == ['SARL', 'SAS']
+
+def test_capturing_groups_are_rejected():
+    engine = EntityEngine()
+    with pytest.raises(ValueError):
+        engine.register('date', r'\b(\d{2})/\d{2}\b')
+
+def test_version_changes_with_registered_patterns():
+    engine = default_entity_engine()
+    version = engine.version
+    assert default_entity_engine().version == version
+    engine.register('iban', r'\bFR\d{2}(?:\s?\d{4}){5}\b')
+    assert engine.version != version
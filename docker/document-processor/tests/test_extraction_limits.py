@@ -0,0 +1,113 @@
+"""
+Plafonds d'extraction : troncature des XLSX, CSV et fichiers texte
+"""
+import functools
+
+import pytest
+
+from processors import extractors
+from processors.extractors import TRUNCATION_MARKER, ExtractionLimits
+
+@pytest.fixture
+def limits(monkeypatch):
+    """
+    Remplace les plafonds des extracteurs pour le test
+    """
+    def set_limits(**kwargs):
+        options = {'max_rows': 0, 'max_cells': 0, 'max_chars': 0, **kwargs}
+        monkeypatch.setattr(extractors, 'ExtractionLimits', functools.partial(ExtractionLimits, **options))
+    return set_limits
+
+def test_admit_row_stops_at_first_exceeded_limit():
+    limits = ExtractionLimits(max_rows=2, max_cells=0, max_chars=0)
+    assert limits.admit_row(3, 'a\tb\tc\n')
+    assert limits.admit_row(3, 'd\te\tf\n')
+    assert not limits.admit_row(3, 'g\th\ti\n')
+    assert limits.exceeded == 'rows'
+    assert limits.counts == {'rows': 2, 'cells': 6, 'chars': 12}
+
+def test_admit_row_counts_cells_and_chars():
+    assert not ExtractionLimits(max_rows=0, max_cells=5, max_chars=0).admit_row(6, 'x')
+    cells = ExtractionLimits(max_rows=0, max_cells=5, max_chars=0)
+    assert cells.admit_row(5, 'x')
+    assert not cells.admit_row(1, 'y')
+    assert cells.exceeded == 'cells'
+
+    chars = ExtractionLimits(max_rows=0, max_cells=0, max_chars=4)
+    assert chars.admit_row(1, 'abcd')
+    assert not chars.admit_row(1, 'e')
+    assert chars.exceeded == 'chars'
+
+def test_clip_truncates_to_remaining_chars():
+    limits = ExtractionLimits(max_rows=0, max_cells=0, max_chars=10)
+    assert limits.clip('abcdef') == 'abcdef'
+    assert limits.exceeded is None
+    assert limits.clip('ghijkl') == 'ghij'
+    assert limits.exceeded == 'chars'
+    assert limits.counts['chars'] == 10
+
+def test_zero_means_unlimited():
+    limits = ExtractionLimits(max_rows=0, max_cells=0, max_chars=0)
+    for _ in range(1000):
+        assert limits.admit_row(100, 'x' * 100)
+    assert limits.clip('y' * 100000) == 'y' * 100000
+    assert limits.exceeded is None
+
+def test_truncation_units():
+    limits = ExtractionLimits(max_rows=1, max_cells=0, max_chars=0)
+    limits.admit_row(1, 'a')
+    limits.admit_row(1, 'b')
+    assert limits.truncation_units() == [
+        {'unit': 'truncation', 'text': TRUNCATION_MARKER.format(limit=1, kind='lignes')},
+        {'unit': 'metadata', 'metadata': {'truncated': {'reason': 'rows', 'limit': 1}}}
+    ]
+
+def test_csv_is_truncated_after_max_rows(tmp_path, limits):
+    limits(max_rows=3)
+    path = tmp_path / 'data.csv'
+    path.write_text(''.join(f"{row},valeur {row}\n" for row in range(10)), encoding='utf-8')
+
+    result = extractors.extract_csv(str(path))
+    assert result['text_content'] == (
+        "0\tvaleur 0\n1\tvaleur 1\n2\tvaleur 2\n" + TRUNCATION_MARKER.format(limit=3, kind='lignes')
+    )
+    assert result['metadata']['truncated'] == {'reason': 'rows', 'limit': 3}
+
+def test_text_file_is_truncated_after_max_chars(tmp_path, limits, monkeypatch):
+    limits(max_chars=25)
+    # Plusieurs blocs lus avant d'atteindre le plafond
+    monkeypatch.setattr(extractors, 'STREAM_TEXT_CHARS', 10)
+    path = tmp_path / 'notes.txt'
+    path.write_text('0123456789' * 5, encoding='utf-8')
+
+    units = list(extractors.iter_text_chunks(str(path)))
+    assert [unit['text'] for unit in units if unit['unit'] == 'chunk'] == ['0123456789', '0123456789', '01234']
+    result = extractors.collect_units(iter(units))
+    assert result['text_content'] == '0123456789' * 2 + '01234' + TRUNCATION_MARKER.format(limit=25, kind='caractères')
+    assert result['metadata']['truncated'] == {'reason': 'chars', 'limit': 25}
+
+def test_text_file_below_limits_is_not_marked(tmp_path, limits):
+    limits(max_chars=100)
+    path = tmp_path / 'court.txt'
+    path.write_text('Bonjour', encoding='utf-8')
+
+    result = extractors.extract_text_file(str(path))
+    assert result['text_content'] == 'Bonjour'
+    assert 'truncated' not in result['metadata']
+
+def test_xlsx_is_truncated_after_max_cells(tmp_path, limits):
+    openpyxl = pytest.importorskip('openpyxl')
+    limits(max_cells=5)
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.title = 'Ventes'
+    for row in range(4):
+        sheet.append([f"r{row}", row])
+    path = tmp_path / 'ventes.xlsx'
+    workbook.save(path)
+
+    result = extractors.extract_xlsx(str(path))
+    assert result['text_content'] == (
+        "\n--- Feuille: Ventes ---\nr0\t0\nr1\t1\n" + TRUNCATION_MARKER.format(limit=5, kind='cellules')
+    )
+    assert result['metadata']['truncated'] == {'reason': 'cells', 'limit': 5}
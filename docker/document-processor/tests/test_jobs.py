@@ -0,0 +1,75 @@
+"""
+File des jobs asynchrones : ordre de priorité, file pleine, échecs
+"""
+import asyncio
+
+import pytest
+
+from utils.jobs import JobManager, QueueFullError
+
+def test_jobs_run_by_priority_then_fifo():
+    order = []
+
+    async def scenario():
+        release = asyncio.Event()
+
+        async def handler(job):
+            if job.payload['name'] == 'blocker':
+                await release.wait()
+            order.append(job.payload['name'])
+
+        manager = JobManager(handler, workers=1, max_queue=10)
+        await manager.start()
+        try:
+            # Le premier job occupe l'unique worker pendant que les autres s'accumulent
+            manager.submit({'name': 'blocker'})
+            await asyncio.sleep(0)
+            manager.submit({'name': 'bulk'}, priority='bulk')
+            manager.submit({'name': 'normal'})
+            manager.submit({'name': 'interactive-1'}, priority='interactive')
+            manager.submit({'name': 'interactive-2'}, priority='interactive')
+            assert manager.queue_depth() == 4
+
+            release.set()
+            await manager._queue.join()
+        finally:
+            await manager.stop()
+
+    asyncio.run(scenario())
+    assert order == ['blocker', 'interactive-1', 'interactive-2', 'normal', 'bulk']
+
+def test_submit_rejects_unknown_priority_and_full_queue():
+    async def scenario():
+        async def handler(job):
+            return None
+
+        manager = JobManager(handler, workers=1, max_queue=1)
+        # Workers non démarrés : la file se remplit
+        manager._queue = asyncio.PriorityQueue(maxsize=1)
+        with pytest.raises(ValueError):
+            manager.submit({}, priority='urgent')
+        manager.submit({})
+        with pytest.raises(QueueFullError):
+            manager.submit({})
+
+    asyncio.run(scenario())
+
+def test_failed_job_keeps_error():
+    async def scenario():
+        async def handler(job):
+            raise RuntimeError('boom')
+
+        manager = JobManager(handler, workers=1, max_queue=10)
+        await manager.start()
+        try:
+            job = manager.submit({})
+            await manager._queue.join()
+        finally:
+            await manager.stop()
+        return job
+
+    job = asyncio.run(scenario())
+    assert job.status == 'failed'
+    assert job.error == 'boom'
+    assert job.finished_at is not None
+    assert job.payload is None
@@ -0,0 +1,81 @@
+"""
+PDF mixtes : sélection des pages à OCRiser et fusion avec la couche texte
+"""
+import asyncio
+
+import pytest
+
+from processors import document_processor
+from processors.document_processor import DocumentProcessor, StreamedText, merge_pdf_pages
+
+class FakeExecutionEngine:
+    """
+    Moteur d'exécution factice : retourne la couverture d'images fournie
+    """
+
+    def __init__(self, coverage=None, error=None):
+        self.coverage = coverage
+        self.error = error
+        self.calls = []
+
+    async def run(self, pool, fn, *args):
+        self.calls.append((pool, fn.__name__, args))
+        if self.error:
+            raise self.error
+        return self.coverage
+
+def select(coverage=None, error=None, candidates=None):
+    engine = FakeExecutionEngine(coverage, error)
+    processor = DocumentProcessor(execution_engine=engine)
+    return asyncio.run(processor._select_ocr_pages('scan.pdf', candidates or {})), engine
+
+def test_merge_keeps_page_order_and_prefers_ocr():
+    page_texts = {1: 'Texte page 1', 2: '', 3: 'Texte page 3'}
+    ocr_texts = {2: 'OCR page 2'}
+
+    assert merge_pdf_pages(page_texts, ocr_texts) == (
+        "\n--- Page 1 ---\nTexte page 1"
+        "\n--- OCR Page 2 ---\nOCR page 2"
+        "\n--- Page 3 ---\nTexte page 3"
+    )
+
+def test_merge_keeps_text_layer_when_ocr_is_empty():
+    assert merge_pdf_pages({1: 'peu'}, {1: '  \n'}) == "\n--- Page 1 ---\npeu"
+
+def test_merge_without_text_layer():
+    # Échec de l'extraction directe : seul l'OCR de toutes les pages est disponible
+    assert merge_pdf_pages({}, {2: 'b', 1: 'a'}) == "\n--- OCR Page 1 ---\na\n--- OCR Page 2 ---\nb"
+
+def test_streamed_text_matches_merge_whatever_the_ocr_order():
+    collected = StreamedText('pdf')
+    for index, text in ((1, 'Texte page 1'), (2, ''), (3, '')):
+        collected.add({'type': 'unit', 'unit': 'page', 'index': index, 'source': 'text', 'text': text})
+    # Les pages OCRisées arrivent dans l'ordre de fin de traitement
+    collected.add({'type': 'unit', 'unit': 'page', 'index': 3, 'source': 'ocr', 'text': 'OCR 3'})
+    collected.add({'type': 'unit', 'unit': 'page', 'index': 2, 'source': 'ocr', 'text': 'OCR 2'})
+
+    expected = merge_pdf_pages({1: 'Texte page 1', 2: '', 3: ''}, {2: 'OCR 2', 3: 'OCR 3'}).strip()
+    assert collected.text() == expected
+
+def test_no_candidates_skips_image_analysis():
+    selected, engine = select(coverage={})
+    assert selected == []
+    assert engine.calls == []
+
+def test_only_pages_covered_by_images_are_selected(monkeypatch):
+    monkeypatch.setattr(document_processor, 'PDF_OCR_MIN_IMAGE_COVERAGE', 0.5)
+    selected, engine = select(coverage={2: 0.95, 4: 0.1, 5: 0.5}, candidates={5: 0, 2: 12, 4: 3})
+
+    assert engine.calls == [('pdf', 'pdf_image_coverage', ('scan.pdf', [2, 4, 5]))]
+    assert selected == [
+        {'page': 2, 'text_chars': 12, 'image_coverage': 0.95},
+        {'page': 5, 'text_chars': 0, 'image_coverage': 0.5}
+    ]
+
+@pytest.mark.parametrize('coverage, error', [({}, None), (None, RuntimeError('pdfplumber absent'))])
+def test_unknown_coverage_selects_every_candidate(coverage, error):
+    selected, _ = select(coverage=coverage, error=error, candidates={3: 0, 1: 40})
+    assert selected == [
+        {'page': 1, 'text_chars': 40, 'image_coverage': None},
+        {'page': 3, 'text_chars': 0, 'image_coverage': None}
+    ]
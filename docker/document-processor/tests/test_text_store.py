@@ -0,0 +1,101 @@
+"""
+Stockage des textes extraits : index des pages, lectures par plage, éviction
+"""
+import os
+
+import pytest
+
+from utils.text_store import TextNotFoundError, TextRangeError, TextStore, build_page_index
+
+PDF_TEXT = "--- Page 1 ---\nIntroduction\n--- OCR Page 2 ---\nPage numérisée\n--- Page 3 ---\nConclusion"
+
+@pytest.fixture
+def store(tmp_path):
+    return TextStore(directory=str(tmp_path / 'texts'), max_bytes=0)
+
+def test_page_index_offsets():
+    data = PDF_TEXT.encode('utf-8')
+    index = build_page_index(data)
+
+    assert [page_num for page_num, _, _ in index] == [1, 2, 3]
+    # Pages contiguës couvrant tout le texte
+    assert index[0][1] == 0
+    assert index[-1][2] == len(data)
+    assert all(index[position][2] == index[position + 1][1] for position in range(len(index) - 1))
+    assert data[index[1][1]:index[1][2]].decode('utf-8') == "--- OCR Page 2 ---\nPage numérisée\n"
+
+def test_text_before_first_marker_belongs_to_first_page():
+    data = "Préambule\n--- Page 1 ---\nA\n--- Page 2 ---\nB".encode('utf-8')
+    index = build_page_index(data)
+    assert index[0][0] == 1
+    assert index[0][1] == 0
+
+def test_text_without_marker_is_a_single_page():
+    assert build_page_index(b'texte brut') == [(1, 0, 10)]
+    assert build_page_index(b'') == [(1, 0, 0)]
+
+def test_marker_must_be_on_its_own_line():
+    assert build_page_index(b'voir --- Page 2 --- plus bas') == [(1, 0, 28)]
+
+def test_put_and_read_pages(store):
+    ref = store.put(PDF_TEXT)
+
+    assert ref['pages'] == [1, 2, 3]
+    assert ref['size'] == len(PDF_TEXT.encode('utf-8'))
+    assert ref['url'] == f"/texts/{ref['handle']}"
+    assert store.read(ref['handle']) == PDF_TEXT.encode('utf-8')
+    assert store.read_pages(ref['handle'], 2, 2).decode('utf-8') == "--- OCR Page 2 ---\nPage numérisée\n"
+    assert store.read_pages(ref['handle'], 2, 9).decode('utf-8') == (
+        "--- OCR Page 2 ---\nPage numérisée\n--- Page 3 ---\nConclusion"
+    )
+
+def test_same_text_is_stored_once(store):
+    assert store.put(PDF_TEXT)['handle'] == store.put(PDF_TEXT)['handle']
+    assert store.get_stats()['texts'] == 1
+
+def test_byte_ranges(store):
+    handle = store.put('0123456789')['handle']
+
+    assert store.read(handle, 2, 5) == b'234'
+    assert store.read(handle, 8) == b'89'
+    # Fin au-delà du texte : lecture jusqu'à la fin
+    assert store.read(handle, 8, 100) == b'89'
+    assert store.read(handle, 10) == b''
+    with pytest.raises(TextRangeError):
+        store.read(handle, 11)
+    with pytest.raises(TextRangeError):
+        store.read(handle, 5, 2)
+    with pytest.raises(TextRangeError):
+        store.read(handle, -1)
+
+def test_missing_pages_and_texts(store):
+    handle = store.put(PDF_TEXT)['handle']
+    with pytest.raises(TextRangeError):
+        store.read_pages(handle, 4, 5)
+    with pytest.raises(TextNotFoundError):
+        store.read('0' * 64)
+    with pytest.raises(TextNotFoundError):
+        store.page_index('0' * 64)
+    # Référence mal formée : jamais convertie en chemin
+    with pytest.raises(TextNotFoundError):
+        store.read('../../etc/passwd')
+
+def test_least_recently_used_texts_are_evicted(tmp_path):
+    store = TextStore(directory=str(tmp_path / 'texts'), max_bytes=25)
+    first = store.put('a' * 10)['handle']
+    second = store.put('b' * 10)['handle']
+    # Le premier texte, lu, devient le plus récemment utilisé
+    os.utime(store._path(second, '.txt'), (1, 1))
+    store.read(first)
+
+    third = store.put('c' * 10)['handle']
+    assert store.read(first) == b'a' * 10
+    assert store.read(third) == b'c' * 10
+    with pytest.raises(TextNotFoundError):
+        store.read(second)
+    assert store.evicted == 1
+
+def test_text_larger_than_budget_is_kept(tmp_path):
+    store = TextStore(directory=str(tmp_path / 'texts'), max_bytes=5)
+    handle = store.put('x' * 10)['handle']
+    assert store.read(handle) == b'x' * 10
@@ -0,0 +1,115 @@
+import os
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from loguru import logger
+
+# Taille maximale d'un lot envoyé au modèle
+ML_BATCH_MAX_SIZE = int(os.environ.get('ML_BATCH_MAX_SIZE', 32))
+
+# Fenêtre de collecte des requêtes concurrentes (millisecondes)
+ML_BATCH_WINDOW_MS = float(os.environ.get('ML_BATCH_WINDOW_MS', 5))
+
+# Bornes supérieures des tranches de l'histogramme des tailles de lot
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128)
+
+class MicroBatcher:
+    """
+    Regroupe les requêtes concurrentes vers un modèle en lots vectorisés
+
+    Les éléments soumis sont collectés pendant une courte fenêtre, ou jusqu'à
+    la taille maximale de lot, puis traités en un seul appel de batch_fn qui
+    doit retourner un résultat par élément, dans le même ordre.
+    """
+
+    def __init__(
+        self,
+        batch_fn: Callable[[List[Any]], Awaitable[List[Any]]],
+        name: str = 'batch',
+        max_batch_size: Optional[int] = None,
+        window_ms: Optional[float] = None
+    ):
+        self.batch_fn = batch_fn
+        self.name = name
+        self.max_batch_size = max_batch_size or ML_BATCH_MAX_SIZE
+        self.window = (ML_BATCH_WINDOW_MS if window_ms is None else window_ms) / 1000
+        self._pending: List[Tuple[Any, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks = set()
+
+        # Statistiques des lots
+        self.batches = 0
+        self.items = 0
+        self.max_observed = 0
+        self.size_histogram = {bucket: 0 for bucket in BATCH_SIZE_BUCKETS}
+        self.size_histogram['+Inf'] = 0
+
+    async def submit(self, item: Any) -> Any:
+        """
+        Soumet un élément et attend son résultat
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window, self._flush)
+
+        return await future
+
+    async def submit_many(self, items: List[Any]) -> List[Any]:
+        """
+        Soumet plusieurs éléments et attend leurs résultats
+        """
+        return list(await asyncio.gather(*[self.submit(item) for item in items]))
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        while self._pending:
+            batch = self._pending[:self.max_batch_size]
+            self._pending = self._pending[self.max_batch_size:]
+            task = asyncio.get_running_loop().create_task(self._run_batch(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run_batch(self, batch: List[Tuple[Any, asyncio.Future]]):
+        self._record(len(batch))
+        try:
+            results = await self.batch_fn([item for item, _ in batch])
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+        except Exception as e:
+            logger.warning(f"Erreur du lot '{self.name}' ({len(batch)} éléments): {e}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+
+    def _record(self, size: int):
+        self.batches += 1
+        self.items += size
+        self.max_observed = max(self.max_observed, size)
+        for bucket in BATCH_SIZE_BUCKETS:
+            if size <= bucket:
+                self.size_histogram[bucket] += 1
+                break
+        else:
+            self.size_histogram['+Inf'] += 1
+
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'max_batch_size': self.max_batch_size,
+            'window_ms': self.window * 1000,
+            'batches': self.batches,
+            'items': self.items,
+            'avg_batch_size': self.items / self.batches if self.batches else 0,
+            'max_observed_batch_size': self.max_observed,
+            'batch_size_histogram': {str(bucket): count for bucket, count in self.size_histogram.items()}
+        }
@@ -1,149 +1,649 @@
-import redis
 import json
-import pickle
-from typing import Any, Optional
+import time
+import asyncio
+import fnmatch
+import hashlib
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Set, Tuple
 from loguru import logger
 import os
 
+import msgpack
+import zstandard
+import redis.asyncio as aioredis
+
+# Connexions simultanées maximales du pool partagé
+REDIS_MAX_CONNECTIONS = int(os.environ.get('REDIS_MAX_CONNECTIONS', 20))
+
+# Délais réseau (secondes) : courts, le cache ne doit jamais ralentir le service
+REDIS_SOCKET_TIMEOUT = float(os.environ.get('REDIS_SOCKET_TIMEOUT', 1))
+REDIS_CONNECT_TIMEOUT = float(os.environ.get('REDIS_CONNECT_TIMEOUT', 1))
+
+# Disjoncteur : ouverture après N échecs consécutifs, nouvel essai après N secondes
+REDIS_BREAKER_THRESHOLD = int(os.environ.get('REDIS_BREAKER_THRESHOLD', 5))
+REDIS_BREAKER_RESET = float(os.environ.get('REDIS_BREAKER_RESET', 30))
+
+# Compression zstd des valeurs encodées au-delà de N octets
+CACHE_COMPRESS_MIN_BYTES = int(os.environ.get('CACHE_COMPRESS_MIN_BYTES', 1024))
+CACHE_COMPRESS_LEVEL = int(os.environ.get('CACHE_COMPRESS_LEVEL', 3))
+
+# Textes de plus de N caractères stockés sous une clé séparée, adressée par contenu
+CACHE_TEXT_MIN_CHARS = int(os.environ.get('CACHE_TEXT_MIN_CHARS', 16384))
+
+# Cache en mémoire du processus, devant Redis (0 : désactivé)
+CACHE_MEMORY_MAX_MB = float(os.environ.get('CACHE_MEMORY_MAX_MB', 64))
+CACHE_MEMORY_TTL = int(os.environ.get('CACHE_MEMORY_TTL', 300))
+
+# Invalidation : clés parcourues par itération de SCAN et débit maximal de suppression
+CACHE_SCAN_BATCH = int(os.environ.get('CACHE_SCAN_BATCH', 500))
+CACHE_UNLINK_RATE = int(os.environ.get('CACHE_UNLINK_RATE', 5000))
+
+# Délai de relecture des compteurs de génération partagés (secondes)
+CACHE_GENERATION_REFRESH = float(os.environ.get('CACHE_GENERATION_REFRESH', 5))
+GENERATION_KEY_PREFIX = 'doc:gen:'
+
+# Format binaire des valeurs : en-tête (magie, version, options) puis msgpack
+CACHE_FORMAT_MAGIC = b'DP'
+CACHE_FORMAT_VERSION = 1
+FLAG_ZSTD = 0x01
+
+# Type d'extension msgpack référençant un texte stocké à part
+TEXT_REF_EXT = 1
+TEXT_KEY_PREFIX = 'doc:text:'
+
+_compressor = zstandard.ZstdCompressor(level=CACHE_COMPRESS_LEVEL)
+_decompressor = zstandard.ZstdDecompressor()
+
+def build_stage_key(stage: str, content_digest: str, options: Dict[str, Any], version: str) -> str:
+    """
+    Construit une clé de cache déterministe pour une étape de traitement
+
+    La clé ne dépend que du contenu du fichier, des options influant sur le
+    résultat et de la version de l'extracteur/des modèles : elle est donc
+    stable entre les requêtes et entre les workers.
+    """
+    options_digest = hashlib.sha256(
+        json.dumps(options, sort_keys=True, separators=(',', ':')).encode('utf-8')
+    ).hexdigest()[:16]
+    return f"doc:{stage}:{version}:{content_digest}:{options_digest}"
+
+class TextRef:
+    """
+    Référence vers un texte stocké sous sa propre clé
+    """
+
+    __slots__ = ('digest',)
+
+    def __init__(self, digest: str):
+        self.digest = digest
+
+def text_key(digest: str) -> str:
+    return f"{TEXT_KEY_PREFIX}{digest}"
+
+def generation_key(namespace: str) -> str:
+    return f"{GENERATION_KEY_PREFIX}{namespace}"
+
+def _is_generation_key(key: Any) -> bool:
+    if isinstance(key, bytes):
+        key = key.decode('utf-8', 'replace')
+    return key.startswith(GENERATION_KEY_PREFIX)
+
+def _extract_texts(value: Any, texts: Dict[str, str]) -> Any:
+    """
+    Remplace les textes volumineux par des références msgpack
+    """
+    if isinstance(value, str):
+        if len(value) < CACHE_TEXT_MIN_CHARS:
+            return value
+        digest = hashlib.sha256(value.encode('utf-8')).hexdigest()
+        texts[digest] = value
+        return msgpack.ExtType(TEXT_REF_EXT, digest.encode('ascii'))
+    if isinstance(value, dict):
+        return {key: _extract_texts(item, texts) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_extract_texts(item, texts) for item in value]
+    return value
+
+def resolve_texts(value: Any, texts: Dict[str, str]) -> Any:
+    """
+    Remplace les références par les textes correspondants
+    """
+    if isinstance(value, TextRef):
+        return texts[value.digest]
+    if isinstance(value, dict):
+        return {key: resolve_texts(item, texts) for key, item in value.items()}
+    if isinstance(value, list):
+        return [resolve_texts(item, texts) for item in value]
+    return value
+
+def encode_value(value: Any, texts: Optional[Dict[str, str]] = None) -> bytes:
+    """
+    Encode une valeur au format binaire versionné du cache
+
+    Si `texts` est fourni, les textes volumineux en sont extraits (clé :
+    empreinte SHA-256) et remplacés par des références.
+    """
+    if texts is not None:
+        value = _extract_texts(value, texts)
+
+    body = msgpack.packb(value, use_bin_type=True)
+    flags = 0
+    if len(body) >= CACHE_COMPRESS_MIN_BYTES:
+        body = _compressor.compress(body)
+        flags |= FLAG_ZSTD
+    return CACHE_FORMAT_MAGIC + bytes((CACHE_FORMAT_VERSION, flags)) + body
+
+def decode_value(data: bytes) -> Tuple[Any, Set[str]]:
+    """
+    Décode une valeur du cache et retourne les empreintes des textes référencés
+
+    Les valeurs d'un autre format (ancienne version, JSON, pickle) lèvent
+    ValueError : elles sont traitées comme absentes du cache.
+    """
+    if len(data) < 4 or data[:2] != CACHE_FORMAT_MAGIC or data[2] != CACHE_FORMAT_VERSION:
+        raise ValueError("Format de cache non reconnu")
+
+    body = data[4:]
+    if data[3] & FLAG_ZSTD:
+        body = _decompressor.decompress(body)
+
+    refs: Set[str] = set()
+
+    def ext_hook(code: int, payload: bytes):
+        if code != TEXT_REF_EXT:
+            raise ValueError(f"Extension msgpack inconnue: {code}")
+        digest = payload.decode('ascii')
+        refs.add(digest)
+        return TextRef(digest)
+
+    return msgpack.unpackb(body, raw=False, ext_hook=ext_hook), refs
+
+class MemoryCache:
+    """
+    Cache en mémoire du processus : LRU borné en octets, TTL par entrée
+
+    La taille d'une entrée est estimée à partir de son encodage. Les valeurs
+    sont partagées entre les appelants et doivent être traitées en lecture
+    seule.
+    """
+
+    def __init__(self, max_bytes: Optional[int] = None, ttl: Optional[int] = None):
+        self.max_bytes = int(CACHE_MEMORY_MAX_MB * 1024 * 1024) if max_bytes is None else max_bytes
+        self.ttl = CACHE_MEMORY_TTL if ttl is None else ttl
+        # Clé -> (valeur, taille, échéance), de la moins à la plus récemment utilisée
+        self._entries: 'OrderedDict[str, Tuple[Any, int, float]]' = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        value, _, expires_at = entry
+        if expires_at <= time.monotonic():
+            self._remove(key)
+            self.expirations += 1
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: str, value: Any, size: int, ttl: Optional[int] = None):
+        self._remove(key)
+        if size > self.max_bytes:
+            return
+
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        self._entries[key] = (value, size, time.monotonic() + ttl)
+        self.size += size
+
+        # Éviction des entrées les moins récemment utilisées
+        while self.size > self.max_bytes:
+            _, (_, evicted_size, _) = self._entries.popitem(last=False)
+            self.size -= evicted_size
+            self.evictions += 1
+
+    def _remove(self, key: str) -> bool:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+        self.size -= entry[1]
+        return True
+
+    def delete(self, key: str) -> bool:
+        return self._remove(key)
+
+    def clear(self, pattern: str = "*") -> int:
+        keys = [key for key in self._entries if fnmatch.fnmatchcase(key, pattern)]
+        for key in keys:
+            self._remove(key)
+        return len(keys)
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'size_bytes': self.size,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': round(self.hits / lookups, 3) if lookups else 0,
+            'evictions': self.evictions,
+            'expirations': self.expirations
+        }
+
+class CircuitBreaker:
+    """
+    Disjoncteur protégeant les appels Redis
+
+    Après `threshold` échecs consécutifs, le circuit s'ouvre : les appels sont
+    court-circuités pendant `reset_timeout` secondes, puis un seul appel
+    d'essai est autorisé (semi-ouvert). Un succès referme le circuit. Un essai
+    resté sans résultat (appel annulé) est suivi d'un nouvel essai après
+    `reset_timeout` secondes.
+    """
+
+    def __init__(self, threshold: Optional[int] = None, reset_timeout: Optional[float] = None):
+        self.threshold = threshold or REDIS_BREAKER_THRESHOLD
+        self.reset_timeout = REDIS_BREAKER_RESET if reset_timeout is None else reset_timeout
+        self.state = 'closed'
+        self.failures = 0
+        self.opened_at = 0.0
+        self.short_circuited = 0
+
+    def allow(self) -> bool:
+        """
+        Indique si un appel peut être tenté
+        """
+        if self.state == 'closed':
+            return True
+
+        now = time.monotonic()
+        if now - self.opened_at >= self.reset_timeout:
+            # Un seul appel d'essai par période de reset_timeout (opened_at :
+            # ouverture ou dernier essai), jusqu'à son résultat
+            self.state = 'half_open'
+            self.opened_at = now
+            return True
+
+        self.short_circuited += 1
+        return False
+
+    def record_success(self):
+        if self.state != 'closed':
+            logger.info("Redis de nouveau disponible, cache réactivé")
+        self.state = 'closed'
+        self.failures = 0
+
+    def record_failure(self):
+        self.failures += 1
+        if self.state == 'half_open' or self.failures >= self.threshold:
+            if self.state != 'open':
+                logger.warning(f"Redis indisponible, cache désactivé pendant {self.reset_timeout:.0f}s")
+            self.state = 'open'
+            self.opened_at = time.monotonic()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'state': self.state,
+            'consecutive_failures': self.failures,
+            'short_circuited': self.short_circuited
+        }
+
 class CacheManager:
     """
     Gestionnaire de cache Redis pour les résultats de traitement
+    
+    Deux niveaux : un cache en mémoire du processus (lecture et écriture
+    traversantes) devant Redis. Le client asyncio partage un pool de
+    connexions ; les lectures et écritures multiples passent par un pipeline
+    (un aller-retour). Un client compatible redis.asyncio peut être injecté
+    (Redis local, fake en mémoire).
     """
     
-    def __init__(self):
+    def __init__(
+        self,
+        client: Optional[aioredis.Redis] = None,
+        breaker: Optional[CircuitBreaker] = None,
+        memory: Optional[MemoryCache] = None
+    ):
         self.redis_host = os.environ.get('REDIS_HOST', 'redis')
         self.redis_port = int(os.environ.get('REDIS_PORT', 6379))
         self.redis_db = int(os.environ.get('REDIS_DB', 0))
+        self.breaker = breaker or CircuitBreaker()
+        self.memory = memory or MemoryCache()
+        self.redis_hits = 0
+        self.redis_misses = 0
         
-        try:
-            self.redis_client = redis.Redis(
+        # Compteurs de génération par espace de noms, relus périodiquement
+        self._generations: Dict[str, int] = {}
+        self._generations_fetched = 0.0
+        
+        if client is not None:
+            self.redis_client = client
+        else:
+            # Aucune connexion n'est ouverte avant la première commande
+            pool = aioredis.ConnectionPool(
                 host=self.redis_host,
                 port=self.redis_port,
                 db=self.redis_db,
-                decode_responses=False,  # Pour pouvoir stocker des bytes
-                socket_timeout=5,
-                socket_connect_timeout=5
+                max_connections=REDIS_MAX_CONNECTIONS,
+                socket_timeout=REDIS_SOCKET_TIMEOUT,
+                socket_connect_timeout=REDIS_CONNECT_TIMEOUT
             )
-            
-            # Test de connexion
-            self.redis_client.ping()
-            logger.info(f"Connexion Redis établie: {self.redis_host}:{self.redis_port}")
-            
-        except Exception as e:
-            logger.warning(f"Impossible de se connecter à Redis: {e}")
-            self.redis_client = None
+            # decode_responses=False pour pouvoir stocker des bytes
+            self.redis_client = aioredis.Redis(connection_pool=pool)
+    
+    def _available(self) -> bool:
+        return self.redis_client is not None and self.breaker.allow()
+    
+    def _failed(self, message: str, error: Exception):
+        self.breaker.record_failure()
+        logger.error(f"{message}: {error}")
+    
+    def _encode_entries(self, values: Dict[str, Any]) -> Tuple[Dict[str, bytes], Dict[str, int]]:
+        """
+        Encode les valeurs et leurs textes volumineux en entrées Redis
+
+        Retourne aussi la taille estimée en mémoire de chaque valeur.
+        """
+        entries: Dict[str, bytes] = {}
+        sizes: Dict[str, int] = {}
+        texts: Dict[str, str] = {}
+        for key, value in values.items():
+            value_texts: Dict[str, str] = {}
+            entries[key] = encode_value(value, value_texts)
+            sizes[key] = len(entries[key]) + sum(len(text) for text in value_texts.values())
+            texts.update(value_texts)
+        for digest, text in texts.items():
+            entries[text_key(digest)] = encode_value(text)
+        return entries, sizes
     
     async def get(self, key: str) -> Optional[Any]:
         """
         Récupère une valeur du cache
         """
-        if not self.redis_client:
-            return None
+        return (await self.get_many([key])).get(key)
+    
+    async def get_many(self, keys: List[str]) -> Dict[str, Any]:
+        """
+        Récupère plusieurs valeurs (clés absentes omises)
+        
+        Le cache en mémoire est consulté d'abord ; pour Redis, un aller-retour
+        pour les valeurs, plus un seul pour l'ensemble des textes volumineux
+        qu'elles référencent. Les valeurs lues dans Redis alimentent le cache
+        en mémoire.
+        """
+        results: Dict[str, Any] = {}
+        for key in keys:
+            value = self.memory.get(key)
+            if value is not None:
+                results[key] = value
+        
+        keys = [key for key in keys if key not in results]
+        if not keys or not self._available():
+            return results
         
         try:
-            cached_data = self.redis_client.get(key)
-            if cached_data:
-                # Tentative de désérialisation JSON d'abord
-                try:
-                    return json.loads(cached_data.decode('utf-8'))
-                except (json.JSONDecodeError, UnicodeDecodeError):
-                    # Fallback vers pickle
-                    return pickle.loads(cached_data)
-            
-            return None
-            
+            values = await self.redis_client.mget(keys)
+            self.breaker.record_success()
         except Exception as e:
-            logger.error(f"Erreur lecture cache pour {key}: {e}")
-            return None
+            self._failed(f"Erreur lecture cache ({len(keys)} clés)", e)
+            return results
+        
+        decoded: Dict[str, Tuple[Any, Set[str]]] = {}
+        sizes: Dict[str, int] = {}
+        for key, cached_data in zip(keys, values):
+            if not cached_data:
+                continue
+            try:
+                decoded[key] = decode_value(cached_data)
+                sizes[key] = len(cached_data)
+            except Exception as e:
+                logger.debug(f"Entrée de cache ignorée pour {key}: {e}")
+        
+        digests = sorted({digest for _, refs in decoded.values() for digest in refs})
+        texts: Dict[str, str] = {}
+        if digests:
+            try:
+                blobs = await self.redis_client.mget([text_key(digest) for digest in digests])
+                self.breaker.record_success()
+            except Exception as e:
+                self._failed(f"Erreur lecture des textes en cache ({len(digests)} clés)", e)
+                return results
+            for digest, blob in zip(digests, blobs):
+                if not blob:
+                    continue
+                try:
+                    text, _ = decode_value(blob)
+                    if not isinstance(text, str):
+                        raise ValueError("Texte en cache de type inattendu")
+                    texts[digest] = text
+                except Exception as e:
+                    # Texte illisible : les entrées qui le référencent sont absentes
+                    logger.debug(f"Texte en cache ignoré pour {digest}: {e}")
+        
+        for key, (value, refs) in decoded.items():
+            # Texte expiré, évincé ou illisible : l'entrée est considérée comme absente
+            if refs - texts.keys():
+                continue
+            if refs:
+                value = resolve_texts(value, texts)
+                sizes[key] += sum(len(texts[digest]) for digest in refs)
+            results[key] = value
+            self.memory.set(key, value, sizes[key])
+        
+        found = sum(1 for key in keys if key in results)
+        self.redis_hits += found
+        self.redis_misses += len(keys) - found
+        return results
     
     async def set(self, key: str, value: Any, expire: int = 3600) -> bool:
         """
         Stocke une valeur dans le cache
         """
-        if not self.redis_client:
+        return await self.set_many({key: value}, expire=expire)
+    
+    async def set_many(self, values: Dict[str, Any], expire: int = 3600) -> bool:
+        """
+        Stocke plusieurs valeurs en un seul aller-retour (pipeline sans transaction)
+        
+        Les textes volumineux sont stockés une seule fois sous une clé
+        adressée par leur contenu, partagée entre les entrées qui les citent.
+        Les valeurs sont aussi écrites dans le cache en mémoire.
+        """
+        if not values:
             return False
         
         try:
-            # Tentative de sérialisation JSON d'abord
-            try:
-                serialized_data = json.dumps(value, ensure_ascii=False)
-            except (TypeError, ValueError):
-                # Fallback vers pickle pour les objets complexes
-                serialized_data = pickle.dumps(value)
-            
-            result = self.redis_client.setex(key, expire, serialized_data)
-            return bool(result)
-            
+            entries, sizes = self._encode_entries(values)
+        except Exception as e:
+            logger.error(f"Valeur non sérialisable pour le cache: {e}")
+            return False
+        
+        for key, value in values.items():
+            self.memory.set(key, value, sizes[key], ttl=expire)
+        
+        if not self._available():
+            return False
+        
+        try:
+            async with self.redis_client.pipeline(transaction=False) as pipe:
+                for key, data in entries.items():
+                    pipe.set(key, data, ex=expire)
+                results = await pipe.execute()
+            self.breaker.record_success()
+            return all(results)
+        
         except Exception as e:
-            logger.error(f"Erreur écriture cache pour {key}: {e}")
+            self._failed(f"Erreur écriture cache ({len(values)} clés)", e)
             return False
     
     async def delete(self, key: str) -> bool:
         """
         Supprime une clé du cache
         """
-        if not self.redis_client:
+        self.memory.delete(key)
+        if not self._available():
             return False
         
         try:
-            result = self.redis_client.delete(key)
+            result = await self.redis_client.delete(key)
+            self.breaker.record_success()
             return bool(result)
-            
+        
         except Exception as e:
-            logger.error(f"Erreur suppression cache pour {key}: {e}")
+            self._failed(f"Erreur suppression cache pour {key}", e)
             return False
     
     async def exists(self, key: str) -> bool:
         """
         Vérifie si une clé existe dans le cache
         """
-        if not self.redis_client:
+        if self.memory.get(key) is not None:
+            return True
+        if not self._available():
             return False
         
         try:
-            return bool(self.redis_client.exists(key))
-            
+            result = await self.redis_client.exists(key)
+            self.breaker.record_success()
+            return bool(result)
+        
         except Exception as e:
-            logger.error(f"Erreur vérification existence cache pour {key}: {e}")
+            self._failed(f"Erreur vérification existence cache pour {key}", e)
             return False
     
-    def get_stats(self) -> dict:
+    def get_tier_stats(self) -> Dict[str, Dict[str, Any]]:
         """
-        Retourne des statistiques sur le cache
+        Succès, échecs et évictions par niveau de cache
         """
-        if not self.redis_client:
-            return {'status': 'disconnected'}
+        return {
+            'memory': self.memory.get_stats(),
+            'redis': {'hits': self.redis_hits, 'misses': self.redis_misses}
+        }
+    
+    async def get_stats(self) -> dict:
+        """
+        Retourne des statistiques sur le cache, dont les compteurs par niveau
+        """
+        tiers = self.get_tier_stats()
+        if not self._available():
+            return {'status': 'disconnected', 'breaker': self.breaker.get_stats(), 'tiers': tiers}
         
         try:
-            info = self.redis_client.info()
+            info = await self.redis_client.info()
+            self.breaker.record_success()
             return {
                 'status': 'connected',
                 'used_memory': info.get('used_memory_human', 'unknown'),
                 'connected_clients': info.get('connected_clients', 0),
                 'total_commands_processed': info.get('total_commands_processed', 0),
                 'keyspace_hits': info.get('keyspace_hits', 0),
-                'keyspace_misses': info.get('keyspace_misses', 0)
+                'keyspace_misses': info.get('keyspace_misses', 0),
+                'breaker': self.breaker.get_stats(),
+                'tiers': tiers
             }
-            
+        
         except Exception as e:
-            logger.error(f"Erreur récupération stats Redis: {e}")
-            return {'status': 'error', 'error': str(e)}
+            self._failed("Erreur récupération stats Redis", e)
+            return {'status': 'error', 'error': str(e), 'breaker': self.breaker.get_stats(), 'tiers': tiers}
     
-    async def clear_cache(self, pattern: str = "*") -> int:
+    async def get_generations(self, namespaces: List[str]) -> Dict[str, int]:
         """
-        Vide le cache selon un pattern
+        Compteurs de génération des espaces de noms (0 si jamais incrémentés)
+        
+        Relus dans Redis au plus toutes les CACHE_GENERATION_REFRESH secondes ;
+        en cas d'indisponibilité, les dernières valeurs connues sont conservées.
         """
-        if not self.redis_client:
-            return 0
+        stale = time.monotonic() - self._generations_fetched >= CACHE_GENERATION_REFRESH
+        if stale and self._available():
+            try:
+                values = await self.redis_client.mget([generation_key(namespace) for namespace in namespaces])
+                self.breaker.record_success()
+                for namespace, value in zip(namespaces, values):
+                    self._generations[namespace] = int(value) if value else 0
+                self._generations_fetched = time.monotonic()
+            except Exception as e:
+                self._failed("Erreur lecture des générations du cache", e)
+        
+        return {namespace: self._generations.get(namespace, 0) for namespace in namespaces}
+    
+    async def bump_generation(self, namespace: str) -> Optional[int]:
+        """
+        Invalide logiquement un espace de noms en O(1)
+        
+        Les clés de l'ancienne génération ne sont plus lues et expirent
+        d'elles-mêmes. Retourne la nouvelle génération, None si Redis est
+        indisponible.
+        """
+        if not self._available():
+            return None
         
         try:
-            keys = self.redis_client.keys(pattern)
-            if keys:
-                deleted = self.redis_client.delete(*keys)
-                logger.info(f"Suppression de {deleted} clés du cache")
-                return deleted
+            generation = int(await self.redis_client.incr(generation_key(namespace)))
+            self.breaker.record_success()
+        except Exception as e:
+            self._failed(f"Erreur incrément de génération pour {namespace}", e)
+            return None
+        
+        self._generations[namespace] = generation
+        logger.info(f"Cache '{namespace}' invalidé (génération {generation})")
+        return generation
+    
+    async def clear_cache(
+        self,
+        pattern: str = "*",
+        batch_size: Optional[int] = None,
+        rate: Optional[int] = None
+    ) -> int:
+        """
+        Vide le cache selon un pattern, sans bloquer Redis
+        
+        Les clés sont parcourues par SCAN incrémental et supprimées par lots
+        avec UNLINK (libération mémoire en arrière-plan côté Redis), à un
+        débit limité à `rate` clés par seconde. Les compteurs de génération
+        ne sont jamais supprimés.
+        """
+        batch_size = batch_size or CACHE_SCAN_BATCH
+        rate = rate or CACHE_UNLINK_RATE
+        self.memory.clear(pattern)
+        if not self._available():
             return 0
-            
+        
+        deleted = 0
+        cursor = 0
+        try:
+            while True:
+                cursor, keys = await self.redis_client.scan(cursor=cursor, match=pattern, count=batch_size)
+                # Les compteurs de génération sont conservés
+                keys = [key for key in keys if not _is_generation_key(key)]
+                if keys:
+                    deleted += await self.redis_client.unlink(*keys)
+                    # Limitation du débit pour ne pas pénaliser les autres clients
+                    await asyncio.sleep(len(keys) / rate)
+                if not cursor:
+                    break
+            self.breaker.record_success()
+        
         except Exception as e:
-            logger.error(f"Erreur vidage cache: {e}")
-            return 0
\ No newline at end of file
+            self._failed("Erreur vidage cache", e)
+        
+        logger.info(f"Suppression de {deleted} clés du cache ({pattern})")
+        return deleted
+    
+    async def close(self):
+        """
+        Ferme les connexions du pool
+        """
+        if self.redis_client is None:
+            return
+        close = getattr(self.redis_client, 'aclose', None) or self.redis_client.close
+        await close()
@@ -0,0 +1,270 @@
+import os
+import queue
+import asyncio
+import functools
+import importlib
+import threading
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+from loguru import logger
+
+# Mode d'exécution : 'process' (pools de processus) ou 'thread' (développement)
+EXECUTOR_MODE = os.environ.get('EXECUTOR_MODE', 'process')
+
+# Méthode de démarrage des workers ('forkserver' ou 'spawn')
+EXECUTOR_START_METHOD = os.environ.get('EXECUTOR_START_METHOD', 'forkserver')
+
+# Taille par défaut d'un pool, surchargée par pool via EXECUTOR_POOL_SIZES ("ocr=4,pdf=2")
+EXECUTOR_DEFAULT_POOL_SIZE = int(os.environ.get(
+    'EXECUTOR_DEFAULT_POOL_SIZE',
+    max(1, (os.cpu_count() or 2) // 2)
+))
+EXECUTOR_POOL_SIZES = os.environ.get('EXECUTOR_POOL_SIZES', '')
+
+# Recyclage des workers après N tâches (en moyenne par worker) pour contenir
+# les fuites mémoire des bibliothèques natives
+EXECUTOR_MAX_TASKS_PER_CHILD = int(os.environ.get('EXECUTOR_MAX_TASKS_PER_CHILD', 100))
+
+# Bibliothèques pré-importées dans les workers de chaque pool
+POOL_PRELOAD_MODULES = {
+    'pdf': ['PyPDF2', 'pdfplumber', 'processors.extractors'],
+    'office': ['docx', 'pptx', 'openpyxl', 'chardet', 'processors.extractors'],
+    'ocr': ['pytesseract', 'cv2', 'numpy', 'PIL.Image', 'processors.extractors'],
+    'ml': ['sklearn', 'nltk', 'processors.classifier_tasks'],
+}
+
+# Modules hérités par tous les workers via le forkserver
+FORKSERVER_PRELOAD_MODULES = ['processors.extractors', 'processors.classifier_tasks']
+
+# Unités en attente entre un worker diffusant et la boucle asyncio : le worker
+# est suspendu quand la file est pleine (consommateur lent)
+STREAM_QUEUE_SIZE = int(os.environ.get('STREAM_QUEUE_SIZE', 8))
+
+# Intervalle de vérification de l'arrêt demandé / de la fin du worker (secondes)
+STREAM_POLL_INTERVAL = 0.1
+
+def parse_pool_sizes(spec: str) -> Dict[str, int]:
+    """
+    Analyse une spécification de tailles de pools de la forme "ocr=4,pdf=2"
+    """
+    sizes = {}
+    for item in spec.split(','):
+        if '=' not in item:
+            continue
+        name, size = item.split('=', 1)
+        try:
+            sizes[name.strip()] = max(1, int(size))
+        except ValueError:
+            logger.warning(f"Taille de pool invalide ignorée: {item}")
+    return sizes
+
+def _preload_modules(modules: List[str]):
+    """
+    Initialisation d'un worker : import des bibliothèques lourdes du pool
+    """
+    for module in modules:
+        try:
+            importlib.import_module(module)
+        except ImportError as e:
+            logger.warning(f"Pré-import impossible de {module}: {e}")
+
+def _feed_queue(fn: Callable, items: Any, stop: Any, args: tuple, kwargs: dict) -> int:
+    """
+    Worker de diffusion : place dans la file chaque élément produit par le
+    générateur fn(*args, **kwargs), jusqu'à épuisement ou arrêt demandé
+    """
+    count = 0
+    generator = fn(*args, **kwargs)
+    try:
+        for item in generator:
+            while True:
+                if stop.is_set():
+                    return count
+                try:
+                    items.put(item, timeout=STREAM_POLL_INTERVAL)
+                    break
+                except queue.Full:
+                    continue
+            count += 1
+    finally:
+        generator.close()
+    return count
+
+class ExecutionEngine:
+    """
+    Exécute les traitements CPU (extraction, OCR, classification) hors de la
+    boucle asyncio, dans des pools de processus dimensionnés par famille
+    """
+
+    def __init__(
+        self,
+        pool_sizes: Optional[Dict[str, int]] = None,
+        max_tasks_per_child: Optional[int] = None,
+        mode: Optional[str] = None,
+        start_method: Optional[str] = None
+    ):
+        self.mode = mode or EXECUTOR_MODE
+        self.pool_sizes = pool_sizes if pool_sizes is not None else parse_pool_sizes(EXECUTOR_POOL_SIZES)
+        self.max_tasks_per_child = max_tasks_per_child or EXECUTOR_MAX_TASKS_PER_CHILD
+        self.start_method = start_method or EXECUTOR_START_METHOD
+        self._pools: Dict[str, Executor] = {}
+        self._pool_tasks: Dict[str, int] = {}
+        self._task_counts: Dict[str, int] = {}
+        self._recycle_counts: Dict[str, int] = {}
+        self._mp_context = None
+        self._manager = None
+
+    def _get_context(self):
+        """
+        Contexte multiprocessing partagé par tous les pools
+        """
+        if self._mp_context is None:
+            self._mp_context = multiprocessing.get_context(self.start_method)
+            if self.start_method == 'forkserver':
+                # Seuls les modules de tâches (légers) sont chargés dans le forkserver :
+                # les bibliothèques lourdes sont importées par l'initialiseur de chaque
+                # pool, au premier usage de l'étape correspondante
+                self._mp_context.set_forkserver_preload(FORKSERVER_PRELOAD_MODULES)
+        return self._mp_context
+
+    def pool_size(self, pool_name: str) -> int:
+        return self.pool_sizes.get(pool_name, EXECUTOR_DEFAULT_POOL_SIZE)
+
+    def _get_pool(self, pool_name: str) -> Executor:
+        pool = self._pools.get(pool_name)
+        if pool is not None:
+            return pool
+
+        size = self.pool_size(pool_name)
+        if self.mode == 'thread':
+            pool = ThreadPoolExecutor(max_workers=size, thread_name_prefix=f"exec-{pool_name}")
+        else:
+            pool = ProcessPoolExecutor(
+                max_workers=size,
+                mp_context=self._get_context(),
+                initializer=_preload_modules,
+                initargs=(POOL_PRELOAD_MODULES.get(pool_name, []),)
+            )
+
+        logger.info(f"Pool d'exécution '{pool_name}' démarré ({self.mode}, {size} workers)")
+        self._pools[pool_name] = pool
+        self._pool_tasks[pool_name] = 0
+        return pool
+
+    def _recycle_if_needed(self, pool_name: str):
+        """
+        Remplace un pool de processus ayant traité son quota de tâches
+
+        Le recyclage se fait au niveau du pool : max_tasks_per_child de
+        ProcessPoolExecutor peut bloquer indéfiniment sous Python 3.11. Les
+        tâches en cours sur l'ancien pool se terminent normalement.
+        """
+        if self.mode != 'process' or pool_name not in self._pools:
+            return
+
+        if self._pool_tasks[pool_name] >= self.max_tasks_per_child * self.pool_size(pool_name):
+            pool = self._pools.pop(pool_name)
+            pool.shutdown(wait=False)
+            self._recycle_counts[pool_name] = self._recycle_counts.get(pool_name, 0) + 1
+            logger.info(f"Recyclage du pool d'exécution '{pool_name}'")
+
+    async def run(self, pool_name: str, fn: Callable, *args, **kwargs) -> Any:
+        """
+        Exécute une fonction dans le pool demandé et attend son résultat
+        """
+        loop = asyncio.get_running_loop()
+        self._recycle_if_needed(pool_name)
+        pool = self._get_pool(pool_name)
+        self._pool_tasks[pool_name] += 1
+        self._task_counts[pool_name] = self._task_counts.get(pool_name, 0) + 1
+
+        try:
+            return await loop.run_in_executor(pool, functools.partial(fn, *args, **kwargs))
+        except BrokenProcessPool:
+            # Un worker a planté (ex. segfault natif) : le pool est recréé au prochain appel
+            logger.error(f"Pool d'exécution '{pool_name}' cassé, redémarrage")
+            if self._pools.get(pool_name) is pool:
+                del self._pools[pool_name]
+                pool.shutdown(wait=False, cancel_futures=True)
+            raise
+
+    def _stream_channel(self):
+        """
+        File bornée et signal d'arrêt partagés avec un worker de diffusion
+        """
+        if self.mode == 'thread':
+            return queue.Queue(maxsize=STREAM_QUEUE_SIZE), threading.Event()
+
+        # Les files multiprocessing ne peuvent pas être transmises aux tâches
+        # d'un ProcessPoolExecutor : elles passent par un Manager partagé
+        if self._manager is None:
+            self._manager = self._get_context().Manager()
+        return self._manager.Queue(maxsize=STREAM_QUEUE_SIZE), self._manager.Event()
+
+    async def stream(self, pool_name: str, fn: Callable, *args, **kwargs) -> AsyncIterator[Any]:
+        """
+        Exécute un générateur dans le pool demandé et diffuse ses éléments au
+        fur et à mesure de leur production
+
+        Le worker reste occupé pendant toute la diffusion ; si le consommateur
+        s'arrête avant la fin, le worker est interrompu à l'élément suivant.
+        """
+        items, stop = self._stream_channel()
+        task = asyncio.ensure_future(self.run(pool_name, _feed_queue, fn, items, stop, args, kwargs))
+
+        try:
+            while True:
+                try:
+                    yield await asyncio.to_thread(items.get, True, STREAM_POLL_INTERVAL)
+                    continue
+                except queue.Empty:
+                    pass
+
+                if task.done():
+                    # Erreur du worker propagée ici ; sinon, derniers éléments
+                    # placés dans la file avant la fin de la tâche
+                    task.result()
+                    while True:
+                        try:
+                            yield items.get_nowait()
+                        except queue.Empty:
+                            return
+        finally:
+            stop.set()
+            if not task.done():
+                await asyncio.wait({task})
+            if not task.cancelled():
+                # Erreur déjà propagée, ou sans objet si le consommateur a abandonné
+                task.exception()
+
+    def shutdown(self, wait: bool = True):
+        """
+        Arrête tous les pools
+        """
+        for pool_name, pool in list(self._pools.items()):
+            pool.shutdown(wait=wait, cancel_futures=True)
+            logger.info(f"Pool d'exécution '{pool_name}' arrêté")
+        self._pools.clear()
+
+        if self._manager is not None:
+            self._manager.shutdown()
+            self._manager = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Retourne l'état des pools
+        """
+        return {
+            'mode': self.mode,
+            'max_tasks_per_child': self.max_tasks_per_child,
+            'pools': {
+                name: {
+                    'workers': self.pool_size(name),
+                    'tasks_submitted': self._task_counts.get(name, 0),
+                    'recycled': self._recycle_counts.get(name, 0)
+                }
+                for name in self._pools
+            }
+        }
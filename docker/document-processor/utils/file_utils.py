@@ -1,16 +1,46 @@
 import os
 import magic
 import re
+import hashlib
+import tempfile
+import aiofiles
 from pathlib import Path
-from typing import Optional
+from typing import Optional, NamedTuple
 
-def get_file_type(file_path: str) -> str:
+# Taille maximale acceptée pour un fichier uploadé
+MAX_UPLOAD_SIZE_MB = int(os.environ.get('MAX_UPLOAD_SIZE_MB', 100))
+
+# Taille des blocs lus lors de la copie d'un upload sur disque
+UPLOAD_CHUNK_SIZE = int(os.environ.get('UPLOAD_CHUNK_SIZE', 1024 * 1024))
+
+# Nombre d'octets examinés pour la détection du type MIME
+MIME_SNIFF_BYTES = 8192
+
+class FileTooLargeError(ValueError):
+    """
+    Levée lorsqu'un fichier dépasse la taille maximale autorisée
+    """
+
+class SpooledUpload(NamedTuple):
+    """
+    Fichier uploadé copié sur disque, avec son empreinte et son type MIME
+    """
+    path: str
+    size: int
+    digest: str
+    mime_type: Optional[str]
+
+def get_file_type(file_path: str, mime_type: Optional[str] = None) -> str:
     """
     Détermine le type de fichier basé sur son contenu et son extension
+
+    Si le type MIME a déjà été détecté (ex. pendant l'upload), le fichier
+    n'est pas relu.
     """
     try:
         # Détection par contenu avec python-magic
-        mime_type = magic.from_file(file_path, mime=True)
+        if mime_type is None:
+            mime_type = magic.from_file(file_path, mime=True)
         
         # Mapping des types MIME vers nos types internes
         mime_to_type = {
@@ -76,6 +106,69 @@ def sanitize_filename(filename: str) -> str:
     
     return safe_filename
 
+def compute_file_digest(file_path: str, chunk_size: int = 1024 * 1024) -> str:
+    """
+    Calcule l'empreinte SHA-256 du contenu d'un fichier
+    """
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+async def spool_upload(
+    upload,
+    dest_dir: Optional[str] = None,
+    max_size_mb: Optional[int] = None,
+    chunk_size: Optional[int] = None
+) -> SpooledUpload:
+    """
+    Copie un upload sur disque par blocs de taille bornée
+
+    L'empreinte SHA-256 et le type MIME sont calculés au fil de l'eau, et la
+    copie s'interrompt dès que la taille maximale est dépassée.
+    """
+    dest_dir = dest_dir or os.environ.get('TEMP_DIR', tempfile.gettempdir())
+    max_size_mb = max_size_mb if max_size_mb is not None else MAX_UPLOAD_SIZE_MB
+    chunk_size = chunk_size or UPLOAD_CHUNK_SIZE
+    max_bytes = max_size_mb * 1024 * 1024
+    
+    fd, path = tempfile.mkstemp(dir=dest_dir, suffix=f"_{sanitize_filename(upload.filename)}")
+    os.close(fd)
+    
+    digest = hashlib.sha256()
+    size = 0
+    mime_type = None
+    
+    try:
+        async with aiofiles.open(path, 'wb') as out:
+            while True:
+                chunk = await upload.read(chunk_size)
+                if not chunk:
+                    break
+                
+                size += len(chunk)
+                if size > max_bytes:
+                    raise FileTooLargeError(
+                        f"Fichier trop volumineux: plus de {max_size_mb} MB"
+                    )
+                
+                if mime_type is None:
+                    try:
+                        mime_type = magic.from_buffer(chunk[:MIME_SNIFF_BYTES], mime=True)
+                    except Exception:
+                        mime_type = None
+                
+                digest.update(chunk)
+                await out.write(chunk)
+    except BaseException:
+        # Suppression de la copie partielle
+        if os.path.exists(path):
+            os.unlink(path)
+        raise
+    
+    return SpooledUpload(path=path, size=size, digest=digest.hexdigest(), mime_type=mime_type)
+
 def get_file_size_mb(file_path: str) -> float:
     """
     Retourne la taille du fichier en MB
@@ -89,32 +182,26 @@ def is_file_too_large(file_path: str, max_size_mb: int = 100) -> bool:
     """
     return get_file_size_mb(file_path) > max_size_mb
 
-def validate_file_path(file_path: str) -> bool:
+def validate_file_path(file_path: str, root_dir: str) -> bool:
     """
-    Valide qu'un chemin de fichier est sûr et accessible
+    Valide qu'un chemin désigne un fichier lisible situé sous root_dir
+
+    Les liens symboliques et les « .. » sont résolus avant la comparaison.
+    Sans root_dir, tout chemin est refusé.
     """
+    if not root_dir:
+        return False
+    
     try:
-        # Vérification de l'existence
-        if not os.path.exists(file_path):
-            return False
+        root = os.path.realpath(root_dir)
+        real_path = os.path.realpath(os.path.join(root, file_path))
         
-        # Vérification que c'est bien un fichier
-        if not os.path.isfile(file_path):
+        # Vérification contre les chemins hors du répertoire autorisé
+        if os.path.commonpath([root, real_path]) != root:
             return False
         
-        # Vérification des permissions de lecture
-        if not os.access(file_path, os.R_OK):
-            return False
-        
-        # Vérification contre les chemins dangereux
-        real_path = os.path.realpath(file_path)
-        if '..' in real_path or real_path.startswith('/'):
-            # Autoriser seulement les chemins dans le répertoire de travail
-            work_dir = os.path.realpath('/app')
-            if not real_path.startswith(work_dir):
-                return False
-        
-        return True
+        # Vérification que c'est bien un fichier lisible
+        return os.path.isfile(real_path) and os.access(real_path, os.R_OK)
         
     except Exception:
         return False
\ No newline at end of file
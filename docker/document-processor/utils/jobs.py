@@ -0,0 +1,193 @@
+import os
+import time
+import uuid
+import asyncio
+import itertools
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+from loguru import logger
+
+# Nombre de jobs traités simultanément
+JOB_WORKERS = int(os.environ.get('JOB_WORKERS', 2))
+
+# Nombre maximal de jobs en attente
+JOB_QUEUE_SIZE = int(os.environ.get('JOB_QUEUE_SIZE', 1000))
+
+# Durée de conservation des jobs terminés (secondes)
+JOB_RETENTION = int(os.environ.get('JOB_RETENTION', 3600))
+
+# Délai maximal d'appel d'une URL de callback (secondes)
+JOB_CALLBACK_TIMEOUT = int(os.environ.get('JOB_CALLBACK_TIMEOUT', 10))
+
+# Niveaux de priorité : les plus petites valeurs passent en premier
+JOB_PRIORITIES = {
+    'interactive': 0,
+    'normal': 5,
+    'bulk': 10
+}
+
+class QueueFullError(Exception):
+    """
+    Levée lorsque la file des jobs est pleine
+    """
+
+class Job:
+    """
+    Traitement asynchrone d'un document et son état
+    """
+
+    def __init__(self, payload: Dict[str, Any], priority: str = 'normal', callback_url: Optional[str] = None):
+        self.id = uuid.uuid4().hex
+        self.payload = payload
+        self.priority = priority
+        self.callback_url = callback_url
+        self.status = 'queued'
+        self.stage: Optional[str] = None
+        self.progress = 0.0
+        self.result: Optional[Any] = None
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ('completed', 'failed')
+
+    def update_progress(self, stage: str, progress: float):
+        self.stage = stage
+        self.progress = round(progress, 2)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'job_id': self.id,
+            'status': self.status,
+            'priority': self.priority,
+            'stage': self.stage,
+            'progress': self.progress,
+            'result': self.result,
+            'error': self.error,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at
+        }
+
+class JobManager:
+    """
+    File de jobs bornée avec priorités, traitée par des workers asyncio
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[Job], Awaitable[Any]],
+        workers: Optional[int] = None,
+        max_queue: Optional[int] = None,
+        retention: Optional[int] = None
+    ):
+        self.handler = handler
+        self.workers = workers or JOB_WORKERS
+        self.max_queue = max_queue or JOB_QUEUE_SIZE
+        self.retention = retention or JOB_RETENTION
+        self.jobs: Dict[str, Job] = {}
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._sequence = itertools.count()
+        self._tasks: List[asyncio.Task] = []
+
+    async def start(self):
+        """
+        Démarre les workers
+        """
+        self._queue = asyncio.PriorityQueue(maxsize=self.max_queue)
+        self._tasks = [asyncio.create_task(self._worker(index)) for index in range(self.workers)]
+        logger.info(f"File de jobs démarrée ({self.workers} workers)")
+
+    async def stop(self):
+        """
+        Arrête les workers
+        """
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def submit(self, payload: Dict[str, Any], priority: str = 'normal', callback_url: Optional[str] = None) -> Job:
+        """
+        Ajoute un job à la file et le retourne immédiatement
+        """
+        if priority not in JOB_PRIORITIES:
+            raise ValueError(f"Priorité inconnue: {priority}")
+
+        self._purge_expired()
+
+        job = Job(payload, priority=priority, callback_url=callback_url)
+        try:
+            # Le numéro de séquence garantit l'ordre FIFO à priorité égale
+            self._queue.put_nowait((JOB_PRIORITIES[priority], next(self._sequence), job))
+        except asyncio.QueueFull:
+            raise QueueFullError("File de traitement pleine")
+
+        self.jobs[job.id] = job
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self.jobs.get(job_id)
+
+    def queue_depth(self) -> int:
+        return self._queue.qsize() if self._queue else 0
+
+    async def _worker(self, index: int):
+        while True:
+            _, _, job = await self._queue.get()
+            job.status = 'running'
+            job.started_at = time.time()
+
+            try:
+                job.result = await self.handler(job)
+                job.status = 'completed'
+                job.progress = 1.0
+            except Exception as e:
+                logger.error(f"Erreur du job {job.id}: {e}")
+                job.status = 'failed'
+                job.error = str(e)
+            finally:
+                job.finished_at = time.time()
+                job.payload = None
+                self._queue.task_done()
+
+            if job.callback_url:
+                await self._send_callback(job)
+
+    async def _send_callback(self, job: Job):
+        """
+        Notifie l'URL de callback de la fin du job
+        """
+        import requests
+
+        try:
+            response = await asyncio.to_thread(
+                requests.post,
+                job.callback_url,
+                json=job.to_dict(),
+                timeout=JOB_CALLBACK_TIMEOUT
+            )
+            response.raise_for_status()
+        except Exception as e:
+            logger.warning(f"Échec du callback pour le job {job.id}: {e}")
+
+    def _purge_expired(self):
+        """
+        Supprime les jobs terminés depuis plus longtemps que la rétention
+        """
+        limit = time.time() - self.retention
+        expired = [job_id for job_id, job in self.jobs.items() if job.finished and job.finished_at < limit]
+        for job_id in expired:
+            del self.jobs[job_id]
+
+    def get_stats(self) -> Dict[str, Any]:
+        statuses: Dict[str, int] = {}
+        for job in self.jobs.values():
+            statuses[job.status] = statuses.get(job.status, 0) + 1
+        return {
+            'workers': self.workers,
+            'queue_depth': self.queue_depth(),
+            'jobs': statuses
+        }
@@ -0,0 +1,219 @@
+"""
+Métriques Prometheus du service
+
+Les durées des étapes sont mesurées dans le processus principal, autour des
+appels aux pools d'exécution : elles incluent l'attente d'un worker libre.
+Les compteurs déjà tenus par les composants (cache, jobs, pools) sont lus au
+moment de la collecte par ServiceCollector.
+
+Les mêmes mesures alimentent, si elle est activée pour la requête en cours,
+une trace des étapes renvoyée avec la réponse (StageTrace).
+"""
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional
+
+from prometheus_client import Gauge, Histogram, REGISTRY
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+# Tranches des histogrammes de latence (secondes), du cache au gros OCR
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+# Étapes mesurées : upload, type_detection, extraction, ocr, ocr_page,
+# pdf_render, libreoffice_conversion, classification, content_analysis,
+# ml_classification, entities, summary, summary_model
+STAGE_DURATION = Histogram(
+    'docproc_stage_duration_seconds',
+    "Durée des étapes de traitement",
+    ['stage', 'file_type'],
+    buckets=LATENCY_BUCKETS
+)
+
+STAGE_IN_FLIGHT = Gauge(
+    'docproc_stage_in_flight',
+    "Traitements en cours par étape",
+    ['stage']
+)
+
+class StageTrace:
+    """
+    Durées des étapes d'une requête, dans l'ordre de leur fin
+    """
+
+    def __init__(self):
+        self.start_time = time.perf_counter()
+        self.stages: List[Dict[str, Any]] = []
+
+    def record(self, stage: str, seconds: float, file_type: str = ''):
+        entry = {
+            'stage': stage,
+            'start': round(time.perf_counter() - self.start_time - seconds, 4),
+            'duration': round(seconds, 4)
+        }
+        if file_type:
+            entry['file_type'] = file_type
+        self.stages.append(entry)
+
+    def totals(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Nombre d'occurrences et durée cumulée par étape (les pages OCR d'un PDF
+        se chevauchent : le cumul peut dépasser la durée de la requête)
+        """
+        totals: Dict[str, Dict[str, Any]] = {}
+        for entry in self.stages:
+            total = totals.setdefault(entry['stage'], {'count': 0, 'duration': 0.0})
+            total['count'] += 1
+            total['duration'] = round(total['duration'] + entry['duration'], 4)
+        return totals
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'elapsed': round(time.perf_counter() - self.start_time, 4),
+            'totals': self.totals(),
+            'stages': self.stages
+        }
+
+# Trace de la requête en cours, héritée par les tâches asyncio qu'elle crée
+_current_trace: ContextVar[Optional[StageTrace]] = ContextVar('stage_trace', default=None)
+
+@contextmanager
+def stage_trace(enabled: bool = True) -> Iterator[Optional[StageTrace]]:
+    """
+    Active la trace des étapes pour le code exécuté dans le bloc
+
+    Désactivée, ne fait rien : track_stage ne coûte alors qu'une lecture de
+    variable de contexte.
+    """
+    if not enabled:
+        yield None
+        return
+
+    trace = StageTrace()
+    token = _current_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        _current_trace.reset(token)
+
+def observe_stage(stage: str, seconds: float, file_type: str = ''):
+    """
+    Enregistre une durée déjà mesurée (ex. OCR d'une page dans un worker)
+    """
+    STAGE_DURATION.labels(stage, file_type).observe(seconds)
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.record(stage, seconds, file_type)
+
+@contextmanager
+def track_stage(stage: str, file_type: str = '') -> Iterator[None]:
+    """
+    Mesure la durée d'une étape et la compte comme en cours pendant son exécution
+    """
+    in_flight = STAGE_IN_FLIGHT.labels(stage)
+    in_flight.inc()
+    start_time = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe_stage(stage, time.perf_counter() - start_time, file_type)
+        in_flight.dec()
+
+class ServiceCollector:
+    """
+    Expose à chaque collecte les statistiques internes des composants
+    """
+
+    def __init__(
+        self,
+        cache_manager: Any = None,
+        job_manager: Any = None,
+        execution_engine: Any = None,
+        libreoffice_pool: Any = None,
+        batchers: Optional[dict] = None
+    ):
+        self.cache_manager = cache_manager
+        self.job_manager = job_manager
+        self.execution_engine = execution_engine
+        self.libreoffice_pool = libreoffice_pool
+        self.batchers = batchers or {}
+
+    def collect(self):
+        if self.cache_manager is not None:
+            yield from self._collect_cache()
+        if self.job_manager is not None:
+            yield from self._collect_jobs()
+        if self.execution_engine is not None:
+            yield from self._collect_execution()
+        if self.libreoffice_pool is not None:
+            yield from self._collect_libreoffice()
+        if self.batchers:
+            yield from self._collect_batchers()
+
+    def _collect_cache(self):
+        tiers = self.cache_manager.get_tier_stats()
+        hits = CounterMetricFamily('docproc_cache_hits', "Lectures de cache réussies", labels=['tier'])
+        misses = CounterMetricFamily('docproc_cache_misses', "Lectures de cache manquées", labels=['tier'])
+        ratio = GaugeMetricFamily('docproc_cache_hit_ratio', "Taux de succès du cache", labels=['tier'])
+        for tier, stats in tiers.items():
+            lookups = stats['hits'] + stats['misses']
+            hits.add_metric([tier], stats['hits'])
+            misses.add_metric([tier], stats['misses'])
+            ratio.add_metric([tier], stats['hits'] / lookups if lookups else 0)
+        yield hits
+        yield misses
+        yield ratio
+
+        memory = tiers['memory']
+        yield CounterMetricFamily('docproc_cache_evictions', "Évictions du cache en mémoire", value=memory['evictions'])
+        yield GaugeMetricFamily('docproc_cache_memory_bytes', "Taille du cache en mémoire", value=memory['size_bytes'])
+
+        breaker = GaugeMetricFamily('docproc_cache_breaker_open', "Disjoncteur Redis ouvert (1) ou fermé (0)")
+        breaker.add_metric([], 0 if self.cache_manager.breaker.state == 'closed' else 1)
+        yield breaker
+
+    def _collect_jobs(self):
+        yield GaugeMetricFamily('docproc_job_queue_depth', "Jobs en attente", value=self.job_manager.queue_depth())
+        jobs = GaugeMetricFamily('docproc_jobs', "Jobs conservés par statut", labels=['status'])
+        for status, count in self.job_manager.get_stats()['jobs'].items():
+            jobs.add_metric([status], count)
+        yield jobs
+
+    def _collect_execution(self):
+        pools = self.execution_engine.get_stats()['pools']
+        workers = GaugeMetricFamily('docproc_pool_workers', "Workers par pool d'exécution", labels=['pool'])
+        tasks = CounterMetricFamily('docproc_pool_tasks', "Tâches soumises par pool d'exécution", labels=['pool'])
+        for name, stats in pools.items():
+            workers.add_metric([name], stats['workers'])
+            tasks.add_metric([name], stats['tasks_submitted'])
+        yield workers
+        yield tasks
+
+    def _collect_libreoffice(self):
+        stats = self.libreoffice_pool.get_stats()
+        yield GaugeMetricFamily('docproc_libreoffice_idle', "Instances LibreOffice libres", value=stats['idle'])
+        healthy = sum(1 for instance in stats['instances'] if instance['healthy'])
+        yield GaugeMetricFamily('docproc_libreoffice_healthy', "Instances LibreOffice ayant réussi leur dernière conversion de contrôle", value=healthy)
+        restarts = sum(instance['restarts'] for instance in stats['instances'])
+        yield CounterMetricFamily('docproc_libreoffice_restarts', "Redémarrages d'instances LibreOffice", value=restarts)
+
+    def _collect_batchers(self):
+        pending = GaugeMetricFamily('docproc_batch_pending', "Éléments en attente de lot", labels=['model'])
+        batches = CounterMetricFamily('docproc_batches', "Lots exécutés", labels=['model'])
+        items = CounterMetricFamily('docproc_batch_items', "Éléments traités par lots", labels=['model'])
+        for name, batcher in self.batchers.items():
+            stats = batcher.get_stats()
+            pending.add_metric([name], batcher.pending())
+            batches.add_metric([name], stats['batches'])
+            items.add_metric([name], stats['items'])
+        yield pending
+        yield batches
+        yield items
+
+def register_service_collector(**components) -> ServiceCollector:
+    """
+    Enregistre le collecteur des composants du service dans le registre par défaut
+    """
+    collector = ServiceCollector(**components)
+    REGISTRY.register(collector)
+    return collector
@@ -0,0 +1,163 @@
+"""
+Profilage par échantillonnage, à la demande pour une requête
+
+Un thread relève à intervalle fixe les piles d'appels de tous les threads du
+processus principal (sys._current_frames) et compte les piles identiques. Le
+résultat est au format « collapsed stacks » (une pile par ligne, frames
+séparées par ';', suivie du nombre d'échantillons), lu directement par
+flamegraph.pl, speedscope ou inferno.
+
+Le profileur voit tout le processus : les requêtes concurrentes apparaissent
+dans le même profil, et le code exécuté dans les pools de processus n'est
+visible que comme une attente (EXECUTOR_MODE=thread pour l'inclure).
+"""
+import os
+import sys
+import time
+import uuid
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+# Autorise le paramètre profile=true des requêtes (0 : désactivé)
+PROFILING_ENABLED = int(os.environ.get('PROFILING_ENABLED', 0))
+
+# Intervalle entre deux échantillons, en millisecondes
+PROFILING_INTERVAL_MS = float(os.environ.get('PROFILING_INTERVAL_MS', 5))
+
+# Répertoire des profils enregistrés
+PROFILES_DIR = os.environ.get(
+    'PROFILES_DIR',
+    os.path.join(os.environ.get('OUTPUT_DIR', '/tmp'), 'profiles')
+)
+
+# Nombre de profils conservés sur disque (les plus anciens sont supprimés)
+PROFILES_KEEP = int(os.environ.get('PROFILES_KEEP', 50))
+
+# Frames les plus internes d'un thread en attente, ignorées à l'échantillonnage
+IDLE_FRAMES = {
+    ('threading.py', 'wait'),
+    ('threading.py', '_wait_for_tstate_lock'),
+    ('selectors.py', 'select'),
+    ('queue.py', 'get'),
+    ('connection.py', '_recv_bytes'),
+    ('connection.py', 'wait'),
+}
+
+# Un seul profil à la fois : deux profileurs se verraient mutuellement
+_profiler_lock = threading.Lock()
+
+class ProfilerBusyError(Exception):
+    """
+    Un profil est déjà en cours dans ce processus
+    """
+    pass
+
+class SamplingProfiler:
+    """
+    Échantillonne les piles d'appels du processus jusqu'à stop()
+    """
+
+    def __init__(self, interval: float = PROFILING_INTERVAL_MS / 1000):
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.duration = 0.0
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._start_time = 0.0
+
+    def start(self):
+        self._start_time = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name='sampling-profiler', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join()
+        self.duration = time.perf_counter() - self._start_time
+
+    def _run(self):
+        own_id = threading.get_ident()
+        while not self._stop_event.wait(self.interval):
+            thread_names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                code = frame.f_code
+                if (os.path.basename(code.co_filename), code.co_name) in IDLE_FRAMES:
+                    continue
+
+                frames = []
+                while frame is not None:
+                    code = frame.f_code
+                    frames.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                frames.append(thread_names.get(thread_id, str(thread_id)))
+                self.stacks[';'.join(reversed(frames))] += 1
+            self.samples += 1
+
+    def collapsed(self) -> str:
+        """
+        Profil au format « collapsed stacks »
+        """
+        return ''.join(f"{stack} {count}\n" for stack, count in sorted(self.stacks.items()))
+
+    def save(self) -> Dict[str, Any]:
+        """
+        Enregistre le profil dans PROFILES_DIR et retourne sa description
+        """
+        profile_id = uuid.uuid4().hex
+        os.makedirs(PROFILES_DIR, exist_ok=True)
+        with open(profile_path(profile_id), 'w') as f:
+            f.write(self.collapsed())
+        prune_profiles()
+
+        return {
+            'id': profile_id,
+            'format': 'collapsed',
+            'url': f"/profiles/{profile_id}",
+            'samples': self.samples,
+            'interval_ms': round(self.interval * 1000, 1),
+            'duration': round(self.duration, 4)
+        }
+
+def profile_path(profile_id: str) -> str:
+    return os.path.join(PROFILES_DIR, f"{profile_id}.folded")
+
+def prune_profiles(keep: int = PROFILES_KEEP):
+    """
+    Supprime les profils les plus anciens au-delà de `keep`
+    """
+    try:
+        entries = [entry for entry in os.scandir(PROFILES_DIR) if entry.name.endswith('.folded')]
+    except FileNotFoundError:
+        return
+    entries.sort(key=lambda entry: entry.stat().st_mtime, reverse=True)
+    for entry in entries[keep:]:
+        try:
+            os.unlink(entry.path)
+        except OSError:
+            pass
+
+@contextmanager
+def sampling_profile(enabled: bool = True) -> Iterator[Optional[SamplingProfiler]]:
+    """
+    Profile le code exécuté dans le bloc ; ne fait rien si désactivé
+    """
+    if not enabled:
+        yield None
+        return
+
+    if not _profiler_lock.acquire(blocking=False):
+        raise ProfilerBusyError("Un profil est déjà en cours")
+
+    profiler = SamplingProfiler()
+    profiler.start()
+    try:
+        yield profiler
+    finally:
+        profiler.stop()
+        _profiler_lock.release()
@@ -0,0 +1,207 @@
+"""
+Stockage sur disque des textes extraits, consultables par plage
+
+Avec store_text=true, /process et /jobs enregistrent le texte extrait dans
+TEXT_STORE_DIR et retournent une référence (text_ref) au lieu du texte : le
+client lit ensuite seulement les pages ou la plage d'octets dont il a besoin
+(GET /texts/{handle}). Les fichiers sont adressés par l'empreinte SHA-256
+du texte (un texte identique n'est stocké qu'une fois) et lus par mmap.
+
+Chaque texte est accompagné d'un index des pages (décalages en octets des
+marqueurs « --- Page N --- » et « --- OCR Page N --- »). La taille totale est
+bornée par TEXT_STORE_MAX_MB : les textes les moins récemment lus ou écrits
+sont supprimés au-delà.
+"""
+import os
+import re
+import json
+import mmap
+import hashlib
+import tempfile
+from typing import Any, Dict, List, Optional, Tuple
+from loguru import logger
+
+# Répertoire des textes enregistrés
+TEXT_STORE_DIR = os.environ.get(
+    'TEXT_STORE_DIR',
+    os.path.join(os.environ.get('OUTPUT_DIR', '/tmp'), 'texts')
+)
+
+# Espace disque maximal des textes (Mo) ; les moins récemment utilisés sont supprimés au-delà
+TEXT_STORE_MAX_MB = float(os.environ.get('TEXT_STORE_MAX_MB', 1024))
+
+# Marqueurs de début de page insérés par les extracteurs PDF
+PAGE_MARKER = re.compile(rb'^--- (?:OCR )?Page (\d+) ---$', re.MULTILINE)
+
+HANDLE_PATTERN = re.compile(r'[0-9a-f]{64}')
+
+class TextNotFoundError(Exception):
+    """
+    Référence inconnue ou texte supprimé par l'éviction
+    """
+    pass
+
+class TextRangeError(Exception):
+    """
+    Plage de pages ou d'octets hors du texte
+    """
+    pass
+
+def build_page_index(data: bytes) -> List[Tuple[int, int, int]]:
+    """
+    Pages d'un texte encodé : (numéro, début, fin) en octets
+
+    Un texte sans marqueur de page forme une seule page 1. Le texte précédant
+    le premier marqueur est rattaché à la première page.
+    """
+    markers = [(int(match.group(1)), match.start()) for match in PAGE_MARKER.finditer(data)]
+    if not markers:
+        return [(1, 0, len(data))]
+
+    index = []
+    for position, (page_num, start) in enumerate(markers):
+        end = markers[position + 1][1] if position + 1 < len(markers) else len(data)
+        index.append((page_num, 0 if position == 0 else start, end))
+    return index
+
+class TextStore:
+    """
+    Textes extraits enregistrés sur disque, avec éviction LRU par taille
+    """
+
+    def __init__(self, directory: str = TEXT_STORE_DIR, max_bytes: int = int(TEXT_STORE_MAX_MB * 1024 * 1024)):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.evicted = 0
+
+    def _path(self, handle: str, suffix: str) -> str:
+        if not HANDLE_PATTERN.fullmatch(handle):
+            raise TextNotFoundError(f"Référence de texte invalide: {handle}")
+        return os.path.join(self.directory, f"{handle}{suffix}")
+
+    def _write_atomic(self, path: str, data: bytes):
+        descriptor, temp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(descriptor, 'wb') as f:
+                f.write(data)
+            os.replace(temp_path, path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+
+    def put(self, text: str) -> Dict[str, Any]:
+        """
+        Enregistre un texte et retourne sa référence
+        """
+        data = text.encode('utf-8')
+        handle = hashlib.sha256(data).hexdigest()
+        text_path = self._path(handle, '.txt')
+        index = build_page_index(data)
+        os.makedirs(self.directory, exist_ok=True)
+
+        if os.path.exists(text_path):
+            # Texte déjà présent : simple mise à jour de son rang LRU
+            os.utime(text_path)
+        else:
+            self._write_atomic(self._path(handle, '.idx'), json.dumps(index).encode())
+            self._write_atomic(text_path, data)
+            self.prune(keep=handle)
+
+        return {
+            'handle': handle,
+            'size': len(data),
+            'pages': [page_num for page_num, _, _ in index],
+            'url': f"/texts/{handle}"
+        }
+
+    def page_index(self, handle: str) -> List[Tuple[int, int, int]]:
+        try:
+            with open(self._path(handle, '.idx')) as f:
+                return [tuple(entry) for entry in json.load(f)]
+        except FileNotFoundError:
+            raise TextNotFoundError(f"Texte non trouvé: {handle}")
+
+    def read(self, handle: str, start: int = 0, end: Optional[int] = None) -> bytes:
+        """
+        Octets [start, end) d'un texte (end exclu, None : jusqu'à la fin)
+        """
+        text_path = self._path(handle, '.txt')
+        try:
+            with open(text_path, 'rb') as f:
+                size = os.fstat(f.fileno()).st_size
+                end = size if end is None else min(end, size)
+                if start < 0 or start > end:
+                    raise TextRangeError(f"Plage d'octets invalide: {start}-{end} (taille {size})")
+                if start == end:
+                    data = b''
+                else:
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                        data = mapped[start:end]
+        except FileNotFoundError:
+            raise TextNotFoundError(f"Texte non trouvé: {handle}")
+
+        # Lecture = utilisation récente pour l'éviction
+        os.utime(text_path)
+        return data
+
+    def read_pages(self, handle: str, first: int, last: int) -> bytes:
+        """
+        Texte des pages first à last (incluses)
+        """
+        spans = [(start, end) for page_num, start, end in self.page_index(handle) if first <= page_num <= last]
+        if not spans:
+            raise TextRangeError(f"Pages {first}-{last} absentes du texte")
+        # Les pages sont contiguës dans le fichier : une seule lecture
+        return self.read(handle, min(start for start, _ in spans), max(end for _, end in spans))
+
+    def prune(self, keep: Optional[str] = None):
+        """
+        Supprime les textes les moins récemment utilisés au-delà du budget
+        disque, sauf `keep` (texte qui vient d'être enregistré)
+        """
+        if self.max_bytes <= 0:
+            return
+
+        entries = []
+        total = 0
+        try:
+            for entry in os.scandir(self.directory):
+                if entry.name.endswith('.txt'):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.name[:-4]))
+                    total += stat.st_size
+        except FileNotFoundError:
+            return
+
+        entries.sort()
+        for _, size, handle in entries:
+            if total <= self.max_bytes:
+                break
+            if handle == keep:
+                continue
+            for suffix in ('.txt', '.idx'):
+                try:
+                    os.unlink(os.path.join(self.directory, f"{handle}{suffix}"))
+                except FileNotFoundError:
+                    pass
+            total -= size
+            self.evicted += 1
+            logger.info(f"Texte {handle} supprimé (budget disque de {self.max_bytes} octets)")
+
+    def get_stats(self) -> Dict[str, Any]:
+        texts = 0
+        total = 0
+        try:
+            for entry in os.scandir(self.directory):
+                if entry.name.endswith('.txt'):
+                    texts += 1
+                    total += entry.stat().st_size
+        except FileNotFoundError:
+            pass
+        return {
+            'directory': self.directory,
+            'texts': texts,
+            'bytes': total,
+            'max_bytes': self.max_bytes,
+            'evicted': self.evicted
+        }